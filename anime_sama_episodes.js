@@ -0,0 +1,39 @@
+/* Lecteurs saison 1 — relevé du site */
+var eps1 = [
+  'https://video.sibnet.ru/shell.php?videoid=4660001',
+  'https://video.sibnet.ru/shell.php?videoid=4660002',
+  'https://video.sibnet.ru/shell.php?videoid=4660003',
+  'https://video.sibnet.ru/shell.php?videoid=4660004',
+  'https://video.sibnet.ru/shell.php?videoid=4660005',
+  'https://video.sibnet.ru/shell.php?videoid=4660006',
+  'https://video.sibnet.ru/shell.php?videoid=4660007',
+  'https://video.sibnet.ru/shell.php?videoid=4660008',
+  'https://video.sibnet.ru/shell.php?videoid=4660009',
+  'https://video.sibnet.ru/shell.php?videoid=4660010',
+  'https://video.sibnet.ru/shell.php?videoid=4660011',
+  'https://video.sibnet.ru/shell.php?videoid=4660012',
+  'https://video.sibnet.ru/shell.php?videoid=4660013',
+  'https://video.sibnet.ru/shell.php?videoid=4660014',
+  'https://video.sibnet.ru/shell.php?videoid=4660015',
+];
+// lecteur de secours, incomplet
+var eps2 = ["https://vidmoly.to/embed-01ab.html", "https://vidmoly.to/embed-02ab.html", "https://vidmoly.to/embed-03ab.html", "https://vidmoly.to/embed-04ab.html", "https://vidmoly.to/embed-05ab.html", "https://vidmoly.to/embed-06ab.html", "https://vidmoly.to/embed-07ab.html", "https://vidmoly.to/embed-08ab.html", "https://vidmoly.to/embed-09ab.html", "https://vidmoly.to/embed-10ab.html", "https://vidmoly.to/embed-11ab.html", "https://vidmoly.to/embed-12ab.html", "https://vidmoly.to/embed-13ab.html"];
+var eps3 = [
+  'https://sendvid.com/embed/x1',
+  'https://sendvid.com/embed/x2',
+  'https://sendvid.com/embed/x3',
+  'https://sendvid.com/embed/x4',
+  '',
+  'https://sendvid.com/embed/x6',
+  'https://sendvid.com/embed/x7',
+  'https://sendvid.com/embed/x8',
+  'https://sendvid.com/embed/x9',
+  'https://sendvid.com/embed/x10',
+  'https://sendvid.com/embed/x11',
+  'https://sendvid.com/embed/x12',
+  'https://sendvid.com/embed/x13',
+  'https://sendvid.com/embed/x14',
+  'https://sendvid.com/embed/x15',
+  // 'https://sendvid.com/embed/retiré',
+]
+/* var eps9 = ['https://exemple.invalid/commenté']; */
@@ -1,72 +1,65 @@
 # pip install playwright python-telegram-bot==21.6
 # playwright install
 
-import re
-import difflib
 import os
+import sys
+from contextlib import asynccontextmanager
 from typing import List, Dict
 from urllib.parse import urljoin, urlparse
-from playwright.async_api import async_playwright
 from telegram import Update
 from telegram.ext import ApplicationBuilder, CommandHandler, MessageHandler, ContextTypes, filters
 
+sys.path.append(os.path.join(os.path.dirname(__file__), 'linkfinderbot', 'src'))
+from bot.utils.browser_pool import browser_pool
+from bot.utils.fetch_tier import fetch_page, TIER_HTTP
+from bot.utils.dom_extract import extract_dom
+from bot.utils.readiness import (
+    NetworkWatcher,
+    current_iframe_src,
+    first_ready,
+    wait_for_iframe_src_change,
+    wait_for_selector,
+)
+from bot.utils.http_client import close_http_client
+from bot.utils.scoring import SEARCH_HIT_ESTIMATE, link_estimates, similarity_scores
+from bot.utils.search_registry import KIND_SELECTOR, search_registry
+from bot.utils.stream_capture import StreamCapture
+
+# Similarité minimale d'un lien pour qu'une recherche interne compte comme réussie
+HTTP_TIER_MIN_SIMILARITY = 0.5
+
 # Token de ton bot Telegram
 BOT_TOKEN = os.getenv("BOT_TOKEN", "")
 
-def normalize_text(text: str) -> str:
-    """Normalise le texte pour le matching fuzzy"""
-    text = text.lower()
-    text = re.sub(r'[^\w\s]', ' ', text)
-    text = re.sub(r'\s+', ' ', text).strip()
-    return text
-
 def calculate_similarity(keyword: str, title: str) -> float:
     """Calcule la similarité entre le mot-clé et le titre"""
-    kw_norm = normalize_text(keyword)
-    title_norm = normalize_text(title)
-    
-    if not kw_norm or not title_norm:
-        return 0.0
-    
-    # Similarité de caractères
-    char_sim = difflib.SequenceMatcher(None, kw_norm, title_norm).ratio()
-    
-    # Similarité de tokens (mots)
-    kw_tokens = set(kw_norm.split())
-    title_tokens = set(title_norm.split())
-    
-    if kw_tokens and title_tokens:
-        token_sim = len(kw_tokens & title_tokens) / len(kw_tokens | title_tokens)
+    return float(similarity_scores(keyword, [title])[0])
+
+@asynccontextmanager
+async def _stream_page(context=None):
+    """Nouvelle page dans le contexte fourni, sinon dans un contexte du pool"""
+    if context is not None:
+        page = await context.new_page()
+        try:
+            yield page
+        finally:
+            await page.close()
     else:
-        token_sim = 0.0
-    
-    # Bonus si le titre commence par le mot-clé
-    prefix_bonus = 0.1 if title_norm.startswith(kw_norm) else 0.0
-    
-    # Score final (pondéré)
-    return 0.6 * char_sim + 0.3 * token_sim + prefix_bonus
+        async with browser_pool.page(blocking="stream") as page:
+            yield page
 
-async def extract_stream_links_from_page(page_url: str) -> List[str]:
+async def extract_stream_links_from_page(page_url: str, context=None) -> List[Dict]:
     """
-    Extrait les liens de streaming depuis une page de contenu
+    Extrait les liens de streaming depuis une page de contenu.
+    Si `context` est fourni (appel depuis find_links_on_page), la page est
+    ouverte dans ce contexte pour ne pas prendre un deuxième slot du pool.
+    Les flux sont reconnus sur les réponses réseau (type MIME, playlists
+    HLS / manifestes DASH) et l'extraction s'arrête au premier flux sûr.
+    Retourne les flux {url, kind, mime, variants} (variantes d'une maître HLS).
     """
-    stream_links = []
-    
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        page = await browser.new_page()
-        
-        # Capturer les requêtes réseau pour les fichiers vidéo
-        captured_urls = []
-        
-        def handle_request(request):
-            url = request.url
-            # Chercher les fichiers vidéo/streaming
-            if any(ext in url.lower() for ext in ['.mp4', '.m3u8', '.mpd', '.avi', '.mkv', '.webm']):
-                if url not in captured_urls:
-                    captured_urls.append(url)
-        
-        page.on("request", handle_request)
+    async with _stream_page(context) as page:
+        capture = await StreamCapture(page).start()
+        network = NetworkWatcher(page)
         
         try:
             # Headers pour éviter la détection de bot
@@ -74,9 +67,6 @@ async def extract_stream_links_from_page(page_url: str) -> List[str]:
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
             })
             
-            await page.goto(page_url, timeout=60000, wait_until="domcontentloaded")
-            await page.wait_for_timeout(3000)  # Attendre le JS au lieu de networkidle
-            
             # Chercher et cliquer sur les boutons de lecture
             play_selectors = [
                 ".play-button", ".vjs-big-play-button", "[aria-label*='play' i]",
@@ -84,243 +74,327 @@ async def extract_stream_links_from_page(page_url: str) -> List[str]:
                 "iframe", "[src*='player']", "[src*='embed']"
             ]
             
+            await page.goto(page_url, timeout=60000, wait_until="domcontentloaded")
+            # Attendre le JS: un flux, un lecteur présent ou le réseau calme (3 s max)
+            await first_ready({
+                "media": capture.wait(3000),
+                "player": wait_for_selector(page, ", ".join(play_selectors), 3000),
+                "quiet": network.wait_quiet(500, 3000),
+            }, timeout_ms=3000)
+            
             for selector in play_selectors:
+                if capture.streams:
+                    # Flux déjà vu au chargement: pas besoin de cliquer
+                    break
                 try:
                     if await page.locator(selector).count() > 0:
+                        previous_src = await current_iframe_src(page)
                         await page.click(selector, timeout=5000)
-                        await page.wait_for_timeout(3000)
+                        await first_ready({
+                            "media": capture.wait(3000),
+                            "iframe": wait_for_iframe_src_change(page, previous_src, 3000),
+                            "quiet": network.wait_quiet(500, 3000),
+                        }, timeout_ms=3000)
                         break
                 except:
                     continue
             
-            # Attendre que les requêtes vidéo se déclenchent
-            await page.wait_for_timeout(5000)
+            # Attendre que les requêtes vidéo se déclenchent (ou que plus rien ne bouge)
+            if not capture.streams:
+                await first_ready({
+                    "media": capture.wait(5000),
+                    "quiet": network.wait_quiet(1000, 5000),
+                }, timeout_ms=5000)
             
             # Chercher des liens dans le DOM aussi
             video_elements = await page.locator("video[src], source[src], a[href*='.mp4'], a[href*='.m3u8']").all()
             for elem in video_elements:
                 try:
                     src = await elem.get_attribute("src") or await elem.get_attribute("href")
-                    if src and src not in captured_urls:
-                        captured_urls.append(src)
+                    if src:
+                        capture.add_dom_source(src)
                 except:
                     continue
                     
         except Exception as e:
             print(f"Erreur extraction streaming: {e}")
         finally:
-            await browser.close()
+            await capture.close()
+            network.close()
     
-    return captured_urls
+    return capture.results()
 
-async def find_links_on_page(site_url: str, keyword: str, max_results: int = 3) -> List[Dict[str, str]]:
+async def _collect_links_http(site_url: str, keyword: str) -> List[Dict[str, str]]:
     """
-    Trouve les liens de fichiers les plus pertinents sur une page web
+    Niveau HTTP: récupère la page sans navigateur. Si elle est rendue côté
+    serveur et contient déjà un lien sûr (même seuil qu'une page de recherche
+    du crawl), on évite Chromium; une ressemblance vague sur la page
+    d'accueil ne remplace pas la recherche interne.
+    """
+    snap = await fetch_page(site_url)
+    if not snap or snap.get("tier") != TIER_HTTP or snap.get("escalate"):
+        return []
+    base_url = snap.get("final_url") or site_url
+    links = []
+    for a in snap["anchors"]:
+        title = (a["title"] or a["alt"] or a["text"]).strip()
+        if a["href"] and title:
+            links.append({"title": title, "url": urljoin(base_url, a["href"])})
+    if not links:
+        return []
+    estimates = link_estimates([l["title"] for l in links], [l["url"] for l in links], keyword)
+    if estimates.max() < SEARCH_HIT_ESTIMATE:
+        return []
+    print(f"⚡ Liens servis en HTTP simple: {site_url}")
+    return links
+
+async def _collect_links_browser(page, site_url: str, keyword: str) -> List[Dict[str, str]]:
+    """Niveau navigateur: recherche interne puis collecte des liens dans le DOM rendu"""
+    # Configurer le navigateur pour éviter la détection
+    await page.set_extra_http_headers({
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+        'Accept-Language': 'fr-FR,fr;q=0.9,en;q=0.8'
+    })
+
+    network = NetworkWatcher(page)
+    try:
+        return await _search_and_collect(page, network, site_url, keyword)
+    finally:
+        network.close()
+
+async def _search_and_collect(page, network, site_url: str, keyword: str) -> List[Dict[str, str]]:
+    """Navigation + recherche; les attentes suivent l'activité réseau de la page"""
+    # Aller sur le site avec timeout plus long
+    await page.goto(site_url, timeout=60000, wait_until="domcontentloaded")
+    await network.wait_quiet(500, 4000)  # Laisser le JS se charger (4 s max)
+
+    # Stratégies de recherche multiples
+    search_attempted = False
+
+    # 1) Stratégie spéciale pour anime-sama.fr
+    if "anime-sama" in site_url.lower():
+        # Aller directement à la page de catalogue/recherche
+        if "/catalogue/" not in site_url:
+            search_url = site_url.rstrip('/') + '/catalogue/'
+            await page.goto(search_url, timeout=60000, wait_until="domcontentloaded")
+            await first_ready({
+                "search": wait_for_selector(page, "#search-anime, input[placeholder*='recherche' i]", 3000),
+                "quiet": network.wait_quiet(500, 3000),
+            }, timeout_ms=3000)
+
+        # Utiliser la barre de recherche d'anime-sama
+        search_selectors = [
+            "#search-anime", 
+            "input[placeholder*='recherche' i]",
+            ".search-input",
+            "input[type='text']"
+        ]
+    else:
+        # Sélecteurs génériques
+        search_selectors = [
+            "input[type='search']",
+            "input[name*='search']", 
+            "input[placeholder*='search' i]",
+            "input[placeholder*='chercher' i]",
+            "#search",
+            ".search-input",
+            "[data-testid*='search']"
+        ]
+
+    # Sélecteurs qui ont déjà marché sur ce domaine d'abord
+    used_selector = None
+    for selector in search_registry.search_selectors(site_url, search_selectors):
+        try:
+            if await page.locator(selector).count() > 0:
+                await page.fill(selector, keyword)
+                await page.keyboard.press("Enter")
+                await network.wait_quiet(500, 3000)  # Attendre le chargement (3 s max)
+                search_attempted = True
+                used_selector = selector
+                break
+        except:
+            continue
+
+    # 2) Si pas de recherche, essayer les boutons/liens de navigation
+    if not search_attempted:
+        nav_selectors = [
+            f"a:has-text('{keyword}')",
+            f"[title*='{keyword}' i]",
+            f"[alt*='{keyword}' i]"
+        ]
+
+        for selector in nav_selectors:
+            try:
+                if await page.locator(selector).count() > 0:
+                    await page.click(selector)
+                    await network.wait_quiet(500, 2000)
+                    break
+            except:
+                continue
+
+    # 3) Extraire tous les liens pertinents (spécialisé par site)
+    if "anime-sama" in site_url.lower():
+        link_selectors = [
+            ".anime a", ".anime-card a", ".episode-link a",
+            "a[href*='/catalogue/']", "a[href*='/episode/']",
+            ".card-anime a", ".episode a", "a[href]"
+        ]
+    else:
+        link_selectors = [
+            "a[href]",
+            "[onclick*='http']",
+            ".link",
+            ".result a",
+            ".item a", 
+            ".video a",
+            ".movie a",
+            ".episode a"
+        ]
+
+    # Un seul evaluate pour tous les sélecteurs (50 éléments max par sélecteur)
+    dom = await extract_dom(page, selectors=link_selectors, limit_per_selector=50)
+    all_links = []
+    for elem in dom["anchors"]:
+        href = elem["href"]
+        title = (elem["title"] or elem["alt"] or elem["text"] or "").strip()
+
+        if href and title:
+            # Convertir en URL absolue si nécessaire
+            if href.startswith("/"):
+                base_url = f"{urlparse(site_url).scheme}://{urlparse(site_url).netloc}"
+                href = urljoin(base_url, href)
+            elif not href.startswith("http"):
+                href = urljoin(site_url, href)
+
+            all_links.append({"title": title, "url": href})
+
+    # Noter si le champ utilisé a ramené des liens pertinents (sans lien du tout = échec;
+    # des liens sans le mot-clé = requête absente du site, rien à noter)
+    if used_selector:
+        found = bool(all_links) and similarity_scores(keyword, [l["title"] for l in all_links]).max() >= HTTP_TIER_MIN_SIMILARITY
+        if found or not all_links:
+            search_registry.record(site_url, KIND_SELECTOR, used_selector, found)
+    return all_links
+
+async def _streams_from_links(keyword: str, all_links: List[Dict[str, str]], max_results: int, context=None) -> List[Dict[str, str]]:
+    """
+    Score les liens collectés puis extrait les flux des meilleures pages.
+    Sans `context`, chaque extraction prend une page du pool le temps de l'appel.
     """
     results = []
     
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        page = await browser.new_page()
-        
-        try:
-            # Configurer le navigateur pour éviter la détection
-            await page.set_extra_http_headers({
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-                'Accept-Language': 'fr-FR,fr;q=0.9,en;q=0.8'
+    # 4) Scorer et trier les résultats des pages
+    scores = similarity_scores(keyword, [link["title"] for link in all_links])
+    scored_links = []
+    for link, score in zip(all_links, scores):
+        if score > 0.1:  # Seuil minimal de pertinence
+            scored_links.append({
+                "title": link["title"],
+                "url": link["url"],
+                "score": float(score)
             })
+    
+    # Trier par score décroissant
+    scored_links.sort(key=lambda x: x["score"], reverse=True)
+    
+    # 5) Extraire les vrais liens de streaming depuis les meilleures pages
+    top_pages = scored_links[:max_results * 2]  # Prendre plus de pages pour avoir plus de chances
+    
+    for page_info in top_pages:
+        try:
+            print(f"🔍 Extraction streaming de: {page_info['title']}")
+            streams = await extract_stream_links_from_page(page_info['url'], context=context)
             
-            # Aller sur le site avec timeout plus long
-            await page.goto(site_url, timeout=60000, wait_until="domcontentloaded")
-            await page.wait_for_timeout(4000)  # Laisser le JS se charger
-            
-            # Stratégies de recherche multiples
-            search_attempted = False
-            
-            # 1) Stratégie spéciale pour anime-sama.fr
-            if "anime-sama" in site_url.lower():
-                # Aller directement à la page de catalogue/recherche
-                if "/catalogue/" not in site_url:
-                    search_url = site_url.rstrip('/') + '/catalogue/'
-                    await page.goto(search_url, timeout=60000, wait_until="domcontentloaded")
-                    await page.wait_for_timeout(3000)
+            for stream in streams:
+                results.append({
+                    "title": page_info['title'],
+                    "url": stream["url"],
+                    "score": page_info['score'],
+                    "page_url": page_info['url'],
+                    "kind": stream["kind"],
+                    "variants": stream["variants"]
+                })
                 
-                # Utiliser la barre de recherche d'anime-sama
-                search_selectors = [
-                    "#search-anime", 
-                    "input[placeholder*='recherche' i]",
-                    ".search-input",
-                    "input[type='text']"
-                ]
-            else:
-                # Sélecteurs génériques
-                search_selectors = [
-                    "input[type='search']",
-                    "input[name*='search']", 
-                    "input[placeholder*='search' i]",
-                    "input[placeholder*='chercher' i]",
-                    "#search",
-                    ".search-input",
-                    "[data-testid*='search']"
-                ]
-            
-            for selector in search_selectors:
-                try:
-                    if await page.locator(selector).count() > 0:
-                        await page.fill(selector, keyword)
-                        await page.keyboard.press("Enter")
-                        await page.wait_for_timeout(3000)  # Attendre le chargement
-                        search_attempted = True
-                        break
-                except:
-                    continue
+                # Arrêter si on a assez de résultats
+                if len(results) >= max_results:
+                    break
             
-            # 2) Si pas de recherche, essayer les boutons/liens de navigation
-            if not search_attempted:
-                nav_selectors = [
-                    f"a:has-text('{keyword}')",
-                    f"[title*='{keyword}' i]",
-                    f"[alt*='{keyword}' i]"
-                ]
+            if len(results) >= max_results:
+                break
                 
-                for selector in nav_selectors:
-                    try:
-                        if await page.locator(selector).count() > 0:
-                            await page.click(selector)
-                            await page.wait_for_timeout(2000)
-                            break
-                    except:
-                        continue
-            
-            # 3) Extraire tous les liens pertinents (spécialisé par site)
-            if "anime-sama" in site_url.lower():
-                link_selectors = [
-                    ".anime a", ".anime-card a", ".episode-link a",
-                    "a[href*='/catalogue/']", "a[href*='/episode/']",
-                    ".card-anime a", ".episode a", "a[href]"
-                ]
-            else:
-                link_selectors = [
-                    "a[href]",
-                    "[onclick*='http']",
-                    ".link",
-                    ".result a",
-                    ".item a", 
-                    ".video a",
-                    ".movie a",
-                    ".episode a"
-                ]
-            
-            all_links = []
-            
-            for selector in link_selectors:
-                try:
-                    elements = await page.locator(selector).all()
-                    for elem in elements[:50]:  # Limiter pour éviter trop de liens
-                        try:
-                            href = await elem.get_attribute("href")
-                            title = (await elem.get_attribute("title") or 
-                                   await elem.get_attribute("alt") or 
-                                   await elem.inner_text() or "").strip()
-                            
-                            if href and title:
-                                # Convertir en URL absolue si nécessaire
-                                if href.startswith("/"):
-                                    base_url = f"{urlparse(site_url).scheme}://{urlparse(site_url).netloc}"
-                                    href = urljoin(base_url, href)
-                                elif not href.startswith("http"):
-                                    href = urljoin(site_url, href)
-                                
-                                all_links.append({"title": title, "url": href})
-                        except:
-                            continue
-                except:
-                    continue
-            
-            # 4) Scorer et trier les résultats des pages
-            scored_links = []
-            for link in all_links:
-                score = calculate_similarity(keyword, link["title"])
-                if score > 0.1:  # Seuil minimal de pertinence
-                    scored_links.append({
-                        "title": link["title"],
-                        "url": link["url"],
-                        "score": score
-                    })
-            
-            # Trier par score décroissant
-            scored_links.sort(key=lambda x: x["score"], reverse=True)
-            
-            # 5) Extraire les vrais liens de streaming depuis les meilleures pages
-            top_pages = scored_links[:max_results * 2]  # Prendre plus de pages pour avoir plus de chances
-            
-            for page_info in top_pages:
-                try:
-                    print(f"🔍 Extraction streaming de: {page_info['title']}")
-                    stream_urls = await extract_stream_links_from_page(page_info['url'])
-                    
-                    for stream_url in stream_urls:
-                        results.append({
-                            "title": page_info['title'],
-                            "url": stream_url,
-                            "score": page_info['score'],
-                            "page_url": page_info['url']
-                        })
-                        
-                        # Arrêter si on a assez de résultats
-                        if len(results) >= max_results:
-                            break
-                    
-                    if len(results) >= max_results:
-                        break
-                        
-                except Exception as e:
-                    print(f"Erreur extraction {page_info['url']}: {e}")
-                    continue
-            
-            # Si pas de liens de streaming trouvés, retourner les pages originales
-            if not results:
-                results = [{
-                    "title": link["title"],
-                    "url": link["url"], 
-                    "score": link["score"]
-                } for link in scored_links[:max_results]]
+        except Exception as e:
+            print(f"Erreur extraction {page_info['url']}: {e}")
+            continue
+    
+    # Si pas de liens de streaming trouvés, retourner les pages originales
+    if not results:
+        results = [{
+            "title": link["title"],
+            "url": link["url"], 
+            "score": link["score"]
+        } for link in scored_links[:max_results]]
+    
+    return results
+
+async def find_links_on_page(site_url: str, keyword: str, max_results: int = 3) -> List[Dict[str, str]]:
+    """
+    Trouve les liens de fichiers les plus pertinents sur une page web
+    """
+    # Page servie en HTTP simple: pas de contexte navigateur pendant la collecte
+    try:
+        all_links = await _collect_links_http(site_url, keyword)
+    except Exception as e:
+        print(f"Erreur collecte HTTP de {site_url}: {e}")
+        all_links = []
+    if all_links:
+        return await _streams_from_links(keyword, all_links, max_results)
+    
+    results = []
+    
+    # Profil "stream": iframes et médias passent pour extract_stream_links_from_page
+    async with browser_pool.context(blocking="stream") as context:
+        page = await context.new_page()
+        
+        try:
+            all_links = await _collect_links_browser(page, site_url, keyword)
+            results = await _streams_from_links(keyword, all_links, max_results, context=context)
             
         except Exception as e:
             print(f"Erreur lors du scraping de {site_url}: {e}")
             # En cas d'erreur, essayer une approche plus simple
             try:
                 await page.goto(site_url, timeout=30000, wait_until="load")
-                await page.wait_for_timeout(2000)
+                try:
+                    await page.wait_for_load_state("networkidle", timeout=2000)
+                except Exception:
+                    pass
                 
                 # Extraire tous les liens visibles
-                simple_links = await page.locator("a[href]").all()
-                for elem in simple_links[:20]:
-                    try:
-                        href = await elem.get_attribute("href")
-                        title = await elem.inner_text() or "Lien trouvé"
-                        
-                        if href and keyword.lower() in title.lower():
-                            if href.startswith("/"):
-                                base_url = f"{urlparse(site_url).scheme}://{urlparse(site_url).netloc}"
-                                href = urljoin(base_url, href)
-                            elif not href.startswith("http"):
-                                href = urljoin(site_url, href)
-                            
-                            score = calculate_similarity(keyword, title)
-                            if score > 0.1:
-                                results.append({
-                                    "title": title.strip(),
-                                    "url": href,
-                                    "score": score
-                                })
-                    except:
-                        continue
+                dom = await extract_dom(page, limit_per_selector=20)
+                candidates = []
+                for elem in dom["anchors"]:
+                    href = elem["href"]
+                    title = elem["text"] or "Lien trouvé"
+                    
+                    if href and keyword.lower() in title.lower():
+                        if href.startswith("/"):
+                            base_url = f"{urlparse(site_url).scheme}://{urlparse(site_url).netloc}"
+                            href = urljoin(base_url, href)
+                        elif not href.startswith("http"):
+                            href = urljoin(site_url, href)
+                        candidates.append((title, href))
+                
+                scores = similarity_scores(keyword, [title for title, _ in candidates])
+                for (title, href), score in zip(candidates, scores):
+                    if score > 0.1:
+                        results.append({
+                            "title": title.strip(),
+                            "url": href,
+                            "score": float(score)
+                        })
                         
             except Exception as e2:
                 print(f"Erreur fallback: {e2}")
-        finally:
-            await browser.close()
     
     return results
 
@@ -381,11 +455,15 @@ async def handle_find_command(update: Update, context: ContextTypes.DEFAULT_TYPE
         
         for i, result in enumerate(results, 1):
             url = result['url']
-            # Détecter si c'est un lien de streaming direct
-            is_streaming = any(ext in url.lower() for ext in ['.mp4', '.m3u8', '.mpd', '.avi', '.mkv', '.webm'])
+            # Détecter si c'est un lien de streaming direct (type vu sur le réseau, sinon extension)
+            is_streaming = bool(result.get('kind')) or any(ext in url.lower() for ext in ['.mp4', '.m3u8', '.mpd', '.avi', '.mkv', '.webm'])
             
             if is_streaming:
                 response_lines.append(f"🎬 {url}")
+                # Qualités d'une playlist HLS maître, meilleure d'abord
+                qualities = [v['resolution'] for v in result.get('variants') or [] if v['resolution']]
+                if qualities:
+                    response_lines.append(f"   🎚️ {' / '.join(qualities)}")
                 streaming_found = True
             else:
                 response_lines.append(f"📄 {url}")
@@ -413,6 +491,12 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
             "Ou tape /start pour plus d'infos"
         )
 
+async def _stop_browser_pool(app):
+    """Ferme le navigateur et le client HTTP partagés à l'arrêt du bot"""
+    await browser_pool.stop()
+    await close_http_client()
+    search_registry.close()
+
 def main():
     """Fonction principale"""
     if not BOT_TOKEN or BOT_TOKEN == "TON_TOKEN_ICI":
@@ -420,8 +504,8 @@ def main():
         print("Crée une variable d'environnement BOT_TOKEN ou modifie le code.")
         return
     
-    # Créer l'application
-    app = ApplicationBuilder().token(BOT_TOKEN).build()
+    # Créer l'application (le pool navigateur est fermé avec elle)
+    app = ApplicationBuilder().token(BOT_TOKEN).post_shutdown(_stop_browser_pool).build()
     
     # Ajouter les handlers
     app.add_handler(CommandHandler("start", start))
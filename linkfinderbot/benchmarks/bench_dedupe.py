@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de la déduplication: ancienne boucle O(n²) contre bot.utils.dedupe.
+
+Vérifie d'abord que les résultats gardés sont identiques sur les liens des
+pages HTML sauvegardées à la racine du dépôt, puis mesure les deux versions
+sur 100, 1 000 et 10 000 résultats synthétiques (graine fixe).
+
+Usage: python linkfinderbot/benchmarks/bench_dedupe.py [--sizes 100 1000 10000]
+"""
+import argparse
+import glob
+import os
+import random
+import sys
+import time
+import urllib.parse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(ROOT, "linkfinderbot", "src"))
+
+from rapidfuzz import fuzz
+from bot.utils import dedupe as dedupe_module
+from bot.utils.dedupe import dedupe_results
+from bot.utils.precise_playwright_adapter import normalize_url
+from bot.utils.fetch_tier import parse_html
+
+TITLES = [
+    "One Piece", "Naruto Shippuden", "Attack on Titan", "Jujutsu Kaisen",
+    "Demon Slayer Kimetsu no Yaiba", "Boruto", "Bleach Thousand-Year Blood War",
+    "Dr. Stone", "Chainsaw Man", "Spy x Family", "Frieren Beyond Journey's End",
+]
+FILLER = "alpha beta gamma delta epsilon zeta eta theta iota kappa lambda mu nu xi omicron pi rho sigma tau".split()
+
+
+def legacy_dedupe(results):
+    """Copie de l'ancienne implémentation (référence)"""
+    kept = []
+    seen_urls = set()
+    for r in results:
+        key = normalize_url(r["url"])
+        if not key or key in seen_urls:
+            continue
+        if any(fuzz.token_set_ratio(k["title"], r["title"]) >= 95 for k in kept):
+            continue
+        seen_urls.add(key)
+        kept.append(r)
+    return kept
+
+
+def typo(text):
+    i = random.randrange(len(text))
+    return text[:i] + random.choice("aeiou") + text[i + 1:]
+
+
+def synthetic_results(n, seed=3):
+    """Titres de pages d'anime: épisodes, saisons, variantes de casse et coquilles"""
+    random.seed(seed)
+    out = []
+    for _ in range(n):
+        name = random.choice(TITLES)
+        roll = random.random()
+        if roll < 0.3:
+            title = f"{name} Episode {random.randint(1, n)} VOSTFR"
+        elif roll < 0.5:
+            title = f"{name} Saison {random.randint(1, 5)} Épisode {random.randint(1, n)}"
+        elif roll < 0.6:
+            title = typo(name)
+        elif roll < 0.7:
+            title = name.upper()
+        elif roll < 0.8:
+            title = f"Regarder {name} {random.randint(1, n)} en streaming VF HD gratuit"
+        else:
+            words = random.sample(FILLER, random.randint(1, 6))
+            title = " ".join(words) + f" {random.randint(1, n * 3)}"
+        out.append({"title": title, "url": f"https://example.org/{random.randint(1, n * 2)}"})
+    return out
+
+
+def fixture_results():
+    """Liens (texte, URL absolue) des pages HTML sauvegardées"""
+    results = []
+    for path in sorted(glob.glob(os.path.join(ROOT, "*.html"))):
+        with open(path, encoding="utf-8", errors="ignore") as f:
+            snap = parse_html(f.read(), "https://video.sibnet.ru/")
+        for a in snap["anchors"]:
+            if a["text"].strip():
+                results.append({"title": a["text"], "url": urllib.parse.urljoin("https://video.sibnet.ru/", a["href"])})
+    return results
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    value = fn(*args, **kwargs)
+    return value, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    args = parser.parse_args()
+
+    fixtures = fixture_results()
+    # Forcer les index même sur ce petit lot (sinon balayage direct)
+    min_results, dedupe_module.INDEX_MIN_RESULTS = dedupe_module.INDEX_MIN_RESULTS, 0
+    same = legacy_dedupe(fixtures) == dedupe_results(fixtures, normalize_url)
+    dedupe_module.INDEX_MIN_RESULTS = min_results
+    print(f"📁 Fixtures HTML: {len(fixtures)} liens, identiques: {'✅' if same else '❌'}")
+
+    print(f"\n{'n':>7} {'gardés':>7} {'ancien':>9} {'nouveau':>9} {'gain':>6} {'comparaisons':>13}  identiques")
+    for n in args.sizes:
+        data = synthetic_results(n)
+        old, old_time = timed(legacy_dedupe, data)
+        stats = {}
+        new, new_time = timed(dedupe_results, data, normalize_url, stats=stats)
+        print(
+            f"{n:>7} {len(new):>7} {old_time:>8.2f}s {new_time:>8.2f}s {old_time / new_time:>5.1f}x "
+            f"{stats['comparisons']:>13}  {'✅' if old == new else '❌'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
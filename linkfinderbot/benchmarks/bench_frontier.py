@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark rejouable de la frontière du crawl: FIFO (largeur d'abord)
+contre « meilleur d'abord » (PriorityFrontier + link_priority).
+
+Le crawl est rejoué hors ligne sur des pages HTML enregistrées avec le
+même visit() que crawl_site; on mesure le nombre de pages chargées avant
+le premier résultat pertinent, les résultats trouvés dans le budget et
+les pages consommées en mode "fast".
+
+Corpus:
+  - par défaut, un site de catalogue d'anime SYNTHÉTIQUE généré à la volée
+    (déterministe, aucune page réelle);
+  - --corpus DIR rejoue un corpus enregistré;
+  - --record URL --query Q --out DIR enregistre un vrai site (HTTP simple).
+
+Usage:
+  python linkfinderbot/benchmarks/bench_frontier.py
+  python linkfinderbot/benchmarks/bench_frontier.py --record https://anime-sama.fr --query "One Piece" --out corpus/anime-sama
+  python linkfinderbot/benchmarks/bench_frontier.py --corpus corpus/anime-sama
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import urllib.parse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(ROOT, "linkfinderbot", "src"))
+
+from bot.utils.crawler import CrawlEngine, Frontier, HostLimiter, PriorityFrontier, TopKStop, MODE_EXHAUSTIVE, MODE_FAST
+from bot.utils.fetch_tier import parse_html
+from bot.utils.precise_playwright_adapter import (
+    CONFIDENT_SCORE,
+    build_entrypoints,
+    link_priority,
+    make_visitor,
+    normalize_url,
+    same_domain,
+)
+
+MANIFEST = "pages.json"
+
+
+# --- Corpus ------------------------------------------------------------------
+
+def save_corpus(out_dir, base, query, pages):
+    """pages: {url: html}"""
+    os.makedirs(out_dir, exist_ok=True)
+    index = {}
+    for i, (url, html) in enumerate(sorted(pages.items())):
+        name = f"page_{i:05d}.html"
+        with open(os.path.join(out_dir, name), "w", encoding="utf-8") as f:
+            f.write(html)
+        index[url] = name
+    with open(os.path.join(out_dir, MANIFEST), "w", encoding="utf-8") as f:
+        json.dump({"base": base, "query": query, "pages": index}, f, ensure_ascii=False, indent=1)
+
+
+def load_corpus(corpus_dir):
+    with open(os.path.join(corpus_dir, MANIFEST), encoding="utf-8") as f:
+        manifest = json.load(f)
+    return manifest["base"], manifest["query"], {normalize_url(u): os.path.join(corpus_dir, n) for u, n in manifest["pages"].items()}
+
+
+def synthetic_site(seed=7):
+    """
+    Site de catalogue d'anime fictif: navigation abondante (rubriques,
+    genres, articles, catalogue alphabétique), la cible n'est liée que depuis
+    le bloc « Populaires » de l'accueil et depuis sa lettre du catalogue.
+    """
+    random.seed(seed)
+    base = "https://anime.example"
+    syllables = ["ka", "ri", "mo", "to", "na", "shi", "ya", "ru", "ze", "ko", "hi", "mi"]
+    names = sorted({" ".join("".join(random.choice(syllables) for _ in range(3)).title() for _ in range(2)) for _ in range(300)})
+    names += ["One Piece", "One Punch Man", "Piece of Cake"]
+    pages = {}
+
+    def page(title, links, h1="", desc=""):
+        anchors = "\n".join(f'<a href="{href}">{text}</a>' for href, text in links)
+        return (f"<html><head><title>{title}</title><meta name=\"description\" content=\"{desc}\"></head>"
+                f"<body><h1>{h1}</h1><nav>{anchors}</nav><p>{'Lorem ipsum ' * 40}</p></body></html>")
+
+    nav = [(f"/rubrique/{r}", r.title()) for r in ("planning", "actualites", "top", "nouveautes", "forum", "faq", "contact", "partenaires")]
+    nav += [(f"/genre/{g}", g.title()) for g in ("action", "aventure", "comedie", "drame", "fantasy", "horreur", "romance", "sport")]
+    letters = sorted({n[0].upper() for n in names})
+    catalogue = [(f"/catalogue/{l.lower()}", f"Catalogue {l}") for l in letters]
+
+    # Bloc « Populaires » de l'accueil, après la navigation (comme sur les vrais sites)
+    popular = random.sample(names[:-3], 11) + ["One Piece"]
+    random.shuffle(popular)
+    popular_links = [(f"/anime/{urllib.parse.quote(n.lower().replace(' ', '-'))}", n) for n in popular]
+    pages[base] = page("Anime Example - Accueil", nav + catalogue + popular_links)
+    for href, text in nav:
+        filler = [(f"/news/{href.split('/')[-1]}-{i}", f"Article {i}") for i in range(15)]
+        pages[base + href] = page(f"{text} - Anime Example", nav + filler)
+        for link, label in filler:
+            pages[base + link] = page(f"{label} - Anime Example", nav)
+    for l in letters:
+        listed = [n for n in names if n[0].upper() == l]
+        links = [(f"/anime/{urllib.parse.quote(n.lower().replace(' ', '-'))}", n) for n in listed]
+        pages[f"{base}/catalogue/{l.lower()}"] = page(f"Catalogue {l} - Anime Example", nav + links)
+        for (href, name) in links:
+            seasons = [(f"{href}/saison-{s}", f"{name} Saison {s}") for s in range(1, 4)]
+            pages[base + href] = page(f"{name} - Anime Example", nav + seasons, h1=name, desc=f"Regarder {name} en streaming")
+            for s_href, s_title in seasons:
+                pages[base + s_href] = page(f"{s_title} - Anime Example", nav, h1=s_title, desc=f"{s_title} VF et VOSTFR")
+    return base, "One Piece", pages
+
+
+async def record_site(base, query, out_dir, max_pages):
+    """Enregistre un site en largeur d'abord via le client HTTP partagé"""
+    from bot.utils.http_client import close_http_client, get_http_client
+
+    base = normalize_url(base)
+    domain = urllib.parse.urlsplit(base).netloc
+    queue, seen, pages = list(build_entrypoints(base, query)), set(), {}
+    client = get_http_client()
+    try:
+        while queue and len(pages) < max_pages:
+            url = queue.pop(0)
+            if url in seen:
+                continue
+            seen.add(url)
+            try:
+                resp = await client.get(url, timeout=15)
+            except Exception as e:
+                print(f"⚠️ {url}: {type(e).__name__}")
+                continue
+            if resp.status_code != 200 or "html" not in resp.headers.get("content-type", ""):
+                continue
+            pages[url] = resp.text
+            for a in parse_html(resp.text, str(resp.url))["anchors"]:
+                link = normalize_url(urllib.parse.urljoin(str(resp.url), a["href"]))
+                if link and same_domain(link, domain) and link not in seen:
+                    queue.append(link)
+            print(f"📥 {len(pages)}/{max_pages} {url}")
+    finally:
+        await close_http_client()
+    save_corpus(out_dir, base, query, pages)
+    print(f"💾 {len(pages)} pages enregistrées dans {out_dir}")
+
+
+# --- Rejeu -------------------------------------------------------------------
+
+class _FakePage:
+    async def close(self):
+        pass
+
+
+class _FakeContext:
+    async def new_page(self):
+        return _FakePage()
+
+
+class _RecordingStop(TopKStop):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.engine = None
+        self.first_hit = None
+
+    def offer(self, key, score):
+        if self.first_hit is None:
+            self.first_hit = self.engine.pages_fetched
+        super().offer(key, score)
+
+
+async def replay(base, query, files, frontier, mode, max_pages, max_depth, top_k):
+    domain = urllib.parse.urlsplit(normalize_url(base)).netloc
+    results = []
+    stopper = _RecordingStop(top_k, CONFIDENT_SCORE, mode)
+
+    async def fetch(page, url):
+        path = files.get(normalize_url(url))
+        if not path:
+            return None
+        with open(path, encoding="utf-8", errors="ignore") as f:
+            snap = parse_html(f.read(), url)
+        snap["final_url"] = url
+        return snap
+
+    engine = CrawlEngine(
+        make_visitor(fetch, query, domain, results, stopper),
+        max_pages=max_pages,
+        max_depth=max_depth,
+        accept=lambda url: same_domain(url, domain),
+        workers=1,  # ordre de visite déterministe
+        limiter=HostLimiter(1, 0),
+        frontier=frontier,
+        should_stop=stopper,
+    )
+    stopper.engine = engine
+    # Ordre stable des points d'entrée (build_entrypoints part d'un set)
+    engine.add_seeds(sorted(build_entrypoints(base, query)))
+    await engine.run(_FakeContext())
+    return {
+        "pages_fetched": engine.pages_fetched,
+        "first_hit": stopper.first_hit,
+        "hits": len(results),
+        "stopped_early": engine.stopped_early,
+    }
+
+
+async def run_benchmark(base, query, files, max_pages, max_depth, top_k):
+    print(f"🌐 {base} — requête « {query} » — {len(files)} pages enregistrées, budget {max_pages}\n")
+    print(f"{'frontière':<12} {'1er résultat':>13} {'résultats':>10} {'pages (fast)':>13}")
+    for name, make_frontier in (("FIFO", Frontier), ("priorité", lambda: PriorityFrontier(link_priority))):
+        full = await replay(base, query, files, make_frontier(), MODE_EXHAUSTIVE, max_pages, max_depth, top_k)
+        fast = await replay(base, query, files, make_frontier(), MODE_FAST, max_pages, max_depth, top_k)
+        first = full["first_hit"] if full["first_hit"] is not None else "—"
+        print(f"{name:<12} {first:>13} {full['hits']:>10} {fast['pages_fetched']:>13}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--corpus", help="dossier d'un corpus enregistré")
+    parser.add_argument("--record", metavar="URL", help="enregistrer ce site au lieu de rejouer")
+    parser.add_argument("--query", default="One Piece")
+    parser.add_argument("--out", help="dossier de sortie pour --record")
+    parser.add_argument("--max-pages", type=int, default=60)
+    parser.add_argument("--max-depth", type=int, default=2)
+    parser.add_argument("--top-k", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.record:
+        if not args.out:
+            parser.error("--record nécessite --out")
+        asyncio.run(record_site(args.record, args.query, args.out, max_pages=300))
+        return
+
+    if args.corpus:
+        base, query, files = load_corpus(args.corpus)
+        asyncio.run(run_benchmark(base, query, files, args.max_pages, args.max_depth, args.top_k))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        base, query, pages = synthetic_site()
+        save_corpus(tmp, base, query, pages)
+        base, query, files = load_corpus(tmp)
+        asyncio.run(run_benchmark(base, query, files, args.max_pages, args.max_depth, args.top_k))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Suite de rejeu hors ligne: les pages HTML capturées (racine du dépôt,
+corpus enregistrés avec bench_frontier.py --record, site synthétique) sont
+servies par un serveur HTTP local, et les vrais chemins du bot tournent
+dessus: récupération HTTP + parsing, résultats DuckDuckGo/Sibnet,
+classement, déduplication, sitemap et crawl complet.
+
+Par étape: percentiles de latence, éléments/s, temps CPU et pic de RSS.
+Le rapport JSON (un par commit) permet de comparer deux versions:
+
+Usage:
+  python linkfinderbot/benchmarks/bench_replay.py
+  python linkfinderbot/benchmarks/bench_replay.py --corpus corpus/anime-sama --iterations 20
+  python linkfinderbot/benchmarks/bench_replay.py --compare linkfinderbot/benchmarks/results/replay-abc1234.json
+"""
+import argparse
+import asyncio
+import glob
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(os.path.dirname(HERE))
+sys.path.append(os.path.join(ROOT, "linkfinderbot", "src"))
+
+from bench_frontier import load_corpus, synthetic_site
+from bot.utils.crawler import CrawlEngine, HostLimiter, PriorityFrontier, TopKStop, MODE_EXHAUSTIVE
+from bot.utils.dedupe import dedupe_results
+from bot.utils.fetch_tier import fetch_http, parse_html
+from bot.utils.http_client import close_http_client
+from bot.utils.precise_playwright_adapter import CONFIDENT_SCORE, link_priority, make_visitor, normalize_url, same_domain
+from bot.utils.search_engine import parse_duckduckgo_candidates, rank_candidates
+from bot.utils.sibnet_simple import sibnet_results_from_html
+from bot.utils.sitemap_discovery import collect_sitemap_urls, rank_sitemap_urls
+
+RESULTS_DIR = os.path.join(HERE, "results")
+
+
+# --- Serveur local -------------------------------------------------------------
+
+class FixtureServer:
+    """Serveur HTTP local (thread) servant {chemin+requête: (octets, content-type)}"""
+
+    def __init__(self, routes):
+        self.routes = routes
+
+    def __enter__(self):
+        routes = self.routes
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = routes.get(self.path) or routes.get(self.path.rstrip("/"))
+                if body is None:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                content, ctype = body
+                self.send_response(200)
+                self.send_header("Content-Type", ctype)
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.root = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def _route(url: str) -> str:
+    u = urllib.parse.urlsplit(url)
+    return (u.path or "/") + (f"?{u.query}" if u.query else "")
+
+
+def site_routes(pages):
+    """{url: html} → routes du serveur, avec un sitemap.xml de toutes les pages"""
+    routes = {_route(url): (html.encode("utf-8"), "text/html; charset=utf-8") for url, html in pages.items()}
+    locs = "".join(f"<url><loc>{{root}}{urllib.parse.quote(_route(u), safe='/?=&')}</loc></url>" for u in pages)
+    routes["/sitemap.xml"] = (
+        ('<?xml version="1.0"?><urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+         f"{locs}</urlset>").encode("utf-8"),
+        "application/xml",
+    )
+    return routes
+
+
+def root_fixtures():
+    """Pages capturées à la racine du dépôt: {nom: html}"""
+    out = {}
+    for path in sorted(glob.glob(os.path.join(ROOT, "*.html"))):
+        with open(path, encoding="utf-8", errors="ignore") as f:
+            out[os.path.basename(path)] = f.read()
+    return out
+
+
+# --- Mesure --------------------------------------------------------------------
+
+def _current_rss_mb() -> float:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss: Ko sous Linux, octets sous macOS (pic du processus, pas instantané)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class RssSampler:
+    """Pic de RSS pendant une étape (échantillonné toutes les 5 ms)"""
+
+    def __enter__(self):
+        self.peak = _current_rss_mb()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(0.005):
+            self.peak = max(self.peak, _current_rss_mb())
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, _current_rss_mb())
+
+
+async def measure(name, run, iterations, items):
+    """`run()` (coroutine) exécuté `iterations` fois; `items` éléments traités par passe"""
+    await run()  # chauffe (imports, caches, connexions)
+    samples = []
+    with RssSampler() as rss:
+        cpu, wall = time.process_time(), time.perf_counter()
+        for _ in range(iterations):
+            start = time.perf_counter()
+            await run()
+            samples.append((time.perf_counter() - start) * 1000)
+        cpu, wall = time.process_time() - cpu, time.perf_counter() - wall
+    p50, p90, p99 = np.percentile(samples, [50, 90, 99])
+    stage = {
+        "iterations": iterations,
+        "items": items,
+        "p50_ms": round(float(p50), 3),
+        "p90_ms": round(float(p90), 3),
+        "p99_ms": round(float(p99), 3),
+        "mean_ms": round(float(np.mean(samples)), 3),
+        "items_per_sec": round(items * iterations / wall, 1) if wall else None,
+        "cpu_s": round(cpu, 3),
+        "peak_rss_mb": round(rss.peak, 1),
+    }
+    print(f"{name:<18} {stage['p50_ms']:>9.2f} {stage['p90_ms']:>9.2f} {stage['p99_ms']:>9.2f} "
+          f"{stage['items_per_sec'] or 0:>10.1f} {stage['cpu_s']:>7.2f} {stage['peak_rss_mb']:>8.1f}")
+    return stage
+
+
+# --- Étapes --------------------------------------------------------------------
+
+class _FakePage:
+    async def close(self):
+        pass
+
+
+class _FakeContext:
+    async def new_page(self):
+        return _FakePage()
+
+
+async def crawl_once(root, query, max_pages):
+    """Crawl complet du site local (chemin HTTP réel de crawl_site, sans navigateur)"""
+    domain = urllib.parse.urlsplit(root).netloc
+    results = []
+    stopper = TopKStop(3, CONFIDENT_SCORE, MODE_EXHAUSTIVE)
+
+    async def fetch(page, url):
+        snap = await fetch_http(url)
+        return snap if snap.get("tier") else None
+
+    engine = CrawlEngine(
+        make_visitor(fetch, query, domain, results, stopper),
+        max_pages=max_pages,
+        max_depth=2,
+        accept=lambda url: same_domain(url, domain),
+        limiter=HostLimiter(4, 0),
+        frontier=PriorityFrontier(link_priority),
+        should_stop=stopper,
+    )
+    engine.add_seeds([normalize_url(root)])
+    await engine.run(_FakeContext())
+    return engine.pages_fetched
+
+
+async def run_suite(args):
+    fixtures = root_fixtures()
+    query = args.query
+    report = {}
+    print(f"{'étape':<18} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'élém./s':>10} {'CPU s':>7} {'RSS Mo':>8}")
+
+    # Pages capturées: récupération HTTP locale + parsing lxml
+    routes = {f"/fixtures/{name}": (html.encode("utf-8"), "text/html; charset=utf-8") for name, html in fixtures.items()}
+    with FixtureServer(routes) as server:
+        urls = [server.root + path for path in routes]
+
+        async def fetch_all():
+            await asyncio.gather(*(fetch_http(u) for u in urls))
+
+        report["fetch_parse"] = await measure("fetch_parse", fetch_all, args.iterations, len(urls))
+
+    # Résultats de recherche DuckDuckGo / Sibnet (parsing pur)
+    ddg = [html for name, html in fixtures.items() if name.startswith("ddg_")]
+    sibnet = [html for name, html in fixtures.items() if name.startswith("sibnet_")]
+
+    async def parse_results():
+        for html in ddg + sibnet:
+            parse_duckduckgo_candidates(html)
+            sibnet_results_from_html(html, query)
+
+    report["search_parse"] = await measure("search_parse", parse_results, args.iterations, len(ddg) + len(sibnet))
+
+    # Classement et déduplication sur tous les liens des pages capturées
+    anchors = []
+    for html in fixtures.values():
+        for a in parse_html(html, "https://video.sibnet.ru/")["anchors"]:
+            if a["text"].strip():
+                anchors.append({
+                    "title": a["text"],
+                    "url": urllib.parse.urljoin("https://video.sibnet.ru/", a["href"]),
+                    "snippet": a["title"] or "",
+                })
+
+    async def rank():
+        rank_candidates([dict(a) for a in anchors], query, k=10)
+
+    async def dedupe():
+        dedupe_results(anchors, normalize_url)
+
+    report["rank"] = await measure("rank", rank, args.iterations, len(anchors))
+    report["dedupe"] = await measure("dedupe", dedupe, args.iterations, len(anchors))
+
+    # Sites complets: synthétique + corpus enregistrés
+    sites = [("synthetic", *synthetic_site())]
+    for corpus in args.corpus:
+        base, corpus_query, files = load_corpus(corpus)
+        pages = {}
+        for url, path in files.items():
+            with open(path, encoding="utf-8", errors="ignore") as f:
+                pages[url] = f.read()
+        sites.append((os.path.basename(os.path.normpath(corpus)), base, corpus_query, pages))
+
+    for label, base, site_query, pages in sites:
+        routes = site_routes(pages)
+        with FixtureServer(routes) as server:
+            # Les <loc> du sitemap pointent sur le serveur local
+            content, ctype = routes["/sitemap.xml"]
+            routes["/sitemap.xml"] = (content.replace(b"{root}", server.root.encode()), ctype)
+
+            async def sitemap():
+                urls = await collect_sitemap_urls(server.root)
+                rank_sitemap_urls(urls, site_query)
+
+            report[f"sitemap:{label}"] = await measure(f"sitemap:{label}", sitemap, args.iterations, len(pages))
+
+            pages_fetched = await crawl_once(server.root, site_query, args.max_pages)
+
+            async def crawl():
+                await crawl_once(server.root, site_query, args.max_pages)
+
+            report[f"crawl:{label}"] = await measure(
+                f"crawl:{label}", crawl, max(1, args.iterations // 5), pages_fetched
+            )
+
+    await close_http_client()
+    return report
+
+
+# --- Rapport -------------------------------------------------------------------
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except Exception:
+        return "unknown"
+
+
+def compare(base_path, stages):
+    with open(base_path, encoding="utf-8") as f:
+        base = json.load(f)
+    print(f"\n🔍 Comparaison avec {base.get('commit')} ({base_path})")
+    print(f"{'étape':<20} {'p50 avant':>10} {'p50 après':>10} {'écart':>8}")
+    for name, stage in stages.items():
+        old = base.get("stages", {}).get(name)
+        if not old:
+            print(f"{name:<20} {'—':>10} {stage['p50_ms']:>10.2f}")
+            continue
+        delta = (stage["p50_ms"] - old["p50_ms"]) / old["p50_ms"] * 100 if old["p50_ms"] else 0.0
+        flag = "⚠️" if delta > 10 else ""
+        print(f"{name:<20} {old['p50_ms']:>10.2f} {stage['p50_ms']:>10.2f} {delta:>+7.1f}% {flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--corpus", action="append", default=[], help="corpus enregistré (bench_frontier.py --record)")
+    parser.add_argument("--query", default="One Piece")
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--max-pages", type=int, default=60)
+    parser.add_argument("--out", help="fichier JSON (défaut: results/replay-<commit>.json)")
+    parser.add_argument("--compare", help="rapport JSON de référence")
+    args = parser.parse_args()
+
+    stages = asyncio.run(run_suite(args))
+    commit = git_commit()
+    out = args.out or os.path.join(RESULTS_DIR, f"replay-{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump({
+            "commit": commit,
+            "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "iterations": args.iterations,
+            "stages": stages,
+        }, f, ensure_ascii=False, indent=1)
+    print(f"\n💾 Rapport: {out}")
+    if args.compare:
+        compare(args.compare, stages)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,8 +5,15 @@ Handler pour la commande /fast - Raccourci turbo pour anime-sama.fr
 import asyncio
 from telegram import Update
 from telegram.ext import ContextTypes
-from ..utils.fast_jump import episode_from_text, ddg_first_site
+from ..utils.fast_jump import episode_from_text
+from ..utils.search_client import ddg_first_site
 from ..utils.anime_sama_extractor import extract_anime_sama
+from ..utils.catalogue_index import catalogue_index
+from ..utils.metrics import set_command, set_source
+from ..utils.sibnet_resolver import format_duration
+from ..utils.result_cache import result_cache, make_key, ttl_for_source, STATUS_MISS
+from ..utils.job_scheduler import PRIORITY_FAST
+from .queueing import enqueue_job
 
 HELP_FAST = '''
 ⚡ **Commande /fast** - Raccourci turbo pour anime-sama.fr
@@ -19,7 +26,7 @@ HELP_FAST = '''
 • `/fast Attack on Titan saison 4` → Va à la page de l'anime
 
 **Comment ça marche:**
-1. 🦆 Recherche directe sur DuckDuckGo avec `site:anime-sama.fr`
+1. 📚 Cherche la série dans l'index local du catalogue (DuckDuckGo `site:anime-sama.fr` sinon)
 2. 📖 Ouvre directement la page de l'anime trouvée
 3. 🎯 Sélectionne automatiquement l'épisode s'il y a un nombre
 4. 🎬 Teste les lecteurs et priorise Sibnet
@@ -32,6 +39,51 @@ HELP_FAST = '''
 • Fonctionne avec VF/VOSTFR
 '''
 
+async def _resolve_fast(query: str, episode_num, on_stage=None) -> dict:
+    """
+    Index local du catalogue (DuckDuckGo en secours) + extraction anime-sama.
+    `on_stage` reçoit les étapes pour le message de statut (absent lors d'un
+    rafraîchissement de cache).
+    """
+    entry = await catalogue_index.resolve(query)
+    if entry:
+        direct_url = entry["page_url"]
+        print(f"📚 Index catalogue: {entry['title']} ({entry['score']:.0f}) → {direct_url}")
+        if on_stage:
+            await on_stage(f"\n📚 Trouvé dans le catalogue: {entry['title']}")
+    else:
+        if on_stage:
+            await on_stage(f"\n🦆 Recherche sur anime-sama.fr...")
+        direct_url = await ddg_first_site("anime-sama.fr", query)
+    if not direct_url:
+        return {"direct_url": None}
+    
+    if on_stage:
+        await on_stage(f"\n✅ Page trouvée, extraction en cours...")
+    
+    try:
+        result = await extract_anime_sama(
+            "anime-sama.fr",
+            query,
+            episode=episode_num,
+            headless=True,
+            direct_url=direct_url,      # Utiliser l'URL directe
+            use_ddg_backup=False,       # Pas besoin, déjà fait
+            on_stage=on_stage,
+        )
+    except Exception as e:
+        return {"direct_url": direct_url, "error": str(e)}
+    return {"direct_url": direct_url, "result": result}
+
+def _fast_ttl(outcome: dict) -> float:
+    """Court pour les échecs, long pour un lien Sibnet résolu"""
+    result = outcome.get("result") or {}
+    if outcome.get("error") or not result.get("matched"):
+        return ttl_for_source(None, negative=True)
+    if "sibnet" in (result.get("final_url") or "").lower():
+        return ttl_for_source("sibnet-share")
+    return ttl_for_source("anime-sama")
+
 async def handle_fast_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handler pour /fast"""
     try:
@@ -52,16 +104,27 @@ async def handle_fast_command(update: Update, context: ContextTypes.DEFAULT_TYPE
         
         message = await update.message.reply_text(status_msg, parse_mode='Markdown')
         
-        # Recherche directe via DuckDuckGo
-        await message.edit_text(
-            status_msg + f"\n🦆 Recherche sur anime-sama.fr...", 
-            parse_mode='Markdown'
-        )
+        # Priorité haute: /fast passe devant find/link dans la file
+        await enqueue_job(update, message, status_msg, PRIORITY_FAST, lambda job, status: _run_fast(update, status, query, episode_num, job))
         
-        direct_url = ddg_first_site("anime-sama.fr", query)
+    except Exception as e:
+        await update.message.reply_text(f"❌ **Erreur inattendue**\n`{str(e)}`", parse_mode='Markdown')
+
+async def _run_fast(update: Update, status, query: str, episode_num, job):
+    """Job /fast: résolution (ou cache) puis édition du message de statut"""
+    set_command("fast")
+    set_source("anime-sama")
+    try:
+        outcome, cache_status = await result_cache.get_or_compute(
+            make_key("fast", "anime-sama.fr", query, episode_num),
+            lambda: _resolve_fast(query, episode_num, job.report),
+            _fast_ttl,
+            refresh=lambda: _resolve_fast(query, episode_num),
+        )
+        direct_url = outcome.get("direct_url")
         
         if not direct_url:
-            await message.edit_text(
+            await status.edit(
                 f"❌ **Aucun résultat trouvé**\n"
                 f"Recherche: `{query}`\n"
                 f"Essayez avec des mots-clés différents.",
@@ -69,33 +132,20 @@ async def handle_fast_command(update: Update, context: ContextTypes.DEFAULT_TYPE
             )
             return
         
-        # Extraction avec anime_sama_extractor
-        await message.edit_text(
-            status_msg + f"\n✅ Page trouvée, extraction en cours...", 
-            parse_mode='Markdown'
-        )
-        
-        try:
-            result = await extract_anime_sama(
-                "anime-sama.fr",
-                query,
-                episode=episode_num,
-                headless=True,
-                direct_url=direct_url,      # Utiliser l'URL directe
-                use_ddg_backup=False,       # Pas besoin, déjà fait
-            )
-        except Exception as e:
-            await message.edit_text(
+        if outcome.get("error"):
+            await status.edit(
                 f"❌ **Erreur d'extraction**\n"
-                f"Erreur: `{str(e)}`\n"
+                f"Erreur: `{outcome['error']}`\n"
                 f"Page: {direct_url}",
                 parse_mode='Markdown'
             )
             return
         
+        result = outcome["result"]
+        
         # Construire la réponse finale
         if not result.get("matched"):
-            await message.edit_text(
+            await status.edit(
                 f"⚠️ **Pas de lecteur fiable trouvé**\n"
                 f"📖 **Page:** [Lien]({result.get('page_url', direct_url)})\n"
                 f"ℹ️ **Raison:** {result.get('why', 'Inconnue')}\n"
@@ -114,10 +164,14 @@ async def handle_fast_command(update: Update, context: ContextTypes.DEFAULT_TYPE
             f"📖 **Page:** [Voir sur anime-sama.fr]({result.get('page_url', direct_url)})",
             f"ℹ️ {result.get('why', '')}"
         ]
+        if result.get("duree"):
+            lines.insert(3, f"⏱️ **Durée:** {format_duration(result['duree'])}")
+        if cache_status != STATUS_MISS:
+            lines.append("♻️ _Résultat en cache_")
         
         final_text = "\n".join(lines)
         
-        await message.edit_text(
+        await status.edit(
             final_text,
             parse_mode='Markdown',
             disable_web_page_preview=False
@@ -127,7 +181,7 @@ async def handle_fast_command(update: Update, context: ContextTypes.DEFAULT_TYPE
         error_msg = f"❌ **Erreur inattendue**\n`{str(e)}`"
         
         try:
-            await message.edit_text(error_msg, parse_mode='Markdown')
+            await status.edit(error_msg, parse_mode='Markdown')
         except:
             await update.message.reply_text(error_msg, parse_mode='Markdown')
 
@@ -2,7 +2,25 @@ import urllib.parse
 from telegram import Update
 from telegram.ext import ContextTypes
 from ..utils.precise_playwright_adapter import precise_site_search
+from ..utils.crawler import MODE_FAST, MODE_EXHAUSTIVE
 from ..utils.media_link_resolver import resolve_media_link
+from ..utils.metrics import set_command, set_source, span
+from ..utils.result_cache import result_cache, make_key, ttl_for_source, STATUS_MISS
+from ..utils.job_scheduler import PRIORITY_FIND, PRIORITY_LINK
+from .queueing import enqueue_job
+
+# Étapes du crawl affichées dans le message de chargement
+CRAWL_STAGES = {
+    "sitemap": "🗺️ Lecture du sitemap",
+    "crawl": "🕷️ Exploration",
+    "rank": "📊 Classement des résultats",
+}
+
+def _crawl_progress_text(info: dict) -> str:
+    line = f"\n{CRAWL_STAGES.get(info['stage'], info['stage'])}"
+    if info["stage"] != "sitemap":
+        line += f"\n📄 {info['pages']}/{info['max_pages']} pages · 🎯 {info['candidates']} candidat(s)"
+    return line
 
 async def handle_find_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Traite les commandes de recherche 'find'"""
@@ -15,34 +33,62 @@ async def handle_find_command(update: Update, context: ContextTypes.DEFAULT_TYPE
         help_msg = """
 ❌ **Format incorrect**
 
-**Usage:** `find <site-ou-URL> <mot-clé>`
+**Usage:** `find <site-ou-URL> <mot-clé> [--exhaustive]`
 
 **Exemples:**
 • `find anime-sama.fr One Piece`
 • `find https://youtube.com drake`
+• `find anime-sama.fr One Piece --exhaustive` (crawl complet, sans arrêt anticipé)
         """
         await update.message.reply_text(help_msg, parse_mode='Markdown')
         return
     
     _, site_url, keyword = parts
     
+    # Mode de crawl: arrêt anticipé par défaut, --exhaustive pour tout parcourir
+    mode = MODE_FAST
+    if "--exhaustive" in keyword.split():
+        mode = MODE_EXHAUSTIVE
+        keyword = " ".join(w for w in keyword.split() if w != "--exhaustive")
+        if not keyword:
+            await update.message.reply_text("❌ Mot-clé manquant", parse_mode='Markdown')
+            return
+    
     # Validation URL
     if not site_url.startswith(("http://", "https://")) and "." not in site_url:
         await update.message.reply_text("❌ URL invalide. Utilise un format comme `site.com` ou `https://site.com`")
         return
     
     # Message de chargement
-    loading_msg = await update.message.reply_text(f"🔍 Recherche en cours sur **{site_url}** pour « **{keyword}** »...", parse_mode='Markdown')
+    loading_text = f"🔍 Recherche en cours sur **{site_url}** pour « **{keyword}** »..."
+    loading_msg = await update.message.reply_text(loading_text, parse_mode='Markdown')
     
+    # Le scraping tourne dans l'ordonnanceur, le handler rend la main
+    await enqueue_job(update, loading_msg, loading_text, PRIORITY_FIND, lambda job, status: _run_find(update, status, job, site_url, keyword, mode))
+
+async def _run_find(update: Update, status, job, site_url: str, keyword: str, mode: str = MODE_FAST):
+    """Job 'find': recherche (progression du crawl en direct), puis réponse à l'utilisateur"""
     try:
-        # Lancer la recherche
-        results = await precise_site_search(site_url, keyword, top_k=3)
+        # Lancer la recherche (ou réponse instantanée depuis le cache)
+        report = {}
+        command = "find" if mode == MODE_FAST else f"find-{mode}"
+        set_command(command)
+        set_source("site-search")
+        results, cache_status = await result_cache.get_or_compute(
+            make_key(command, site_url, keyword),
+            lambda: precise_site_search(
+                site_url, keyword, top_k=3, mode=mode, report=report,
+                progress=lambda info: job.report(_crawl_progress_text(info)),
+            ),
+            lambda r: ttl_for_source("site-search", negative=not r),
+        )
         
         # Supprimer le message de chargement
-        await loading_msg.delete()
+        await status.delete()
         
         if not results:
-            await update.message.reply_text(f"❌ Aucun résultat suffisamment précis trouvé pour « **{keyword}** » sur {site_url}", parse_mode='Markdown')
+            with span("telegram_reply"):
+                await update.message.reply_text(f"❌ Aucun résultat suffisamment précis trouvé pour « **{keyword}** » sur {site_url}", parse_mode='Markdown')
             return
         
         # Formater les résultats
@@ -66,15 +112,20 @@ async def handle_find_command(update: Update, context: ContextTypes.DEFAULT_TYPE
             response_lines.append(f"{emoji} **{title}** `({score})`\n{url}\n")
         
         response_lines.append("_Score = pertinence (100 = parfait)_")
+        if report.get("stopped_early"):
+            response_lines.append(f"⏱️ _Arrêt anticipé: {report['pages_saved']} pages économisées_")
+        if cache_status != STATUS_MISS:
+            response_lines.append("♻️ _Résultat en cache_")
         
-        await update.message.reply_text(
-            "\n".join(response_lines), 
-            parse_mode='Markdown',
-            disable_web_page_preview=True
-        )
+        with span("telegram_reply"):
+            await update.message.reply_text(
+                "\n".join(response_lines), 
+                parse_mode='Markdown',
+                disable_web_page_preview=True
+            )
         
     except Exception as e:
-        await loading_msg.delete()
+        await status.delete()
         error_msg = f"❌ **Erreur lors de la recherche:**\n`{str(e)}`"
         await update.message.reply_text(error_msg, parse_mode='Markdown')
 
@@ -132,20 +183,34 @@ async def handle_link_command(update: Update, context: ContextTypes.DEFAULT_TYPE
     
     # Message de chargement
     episode_text = f" (épisode {episode})" if episode else ""
-    loading_msg = await update.message.reply_text(
-        f"🔎 Recherche sur **{display_name}** → « **{query}** »{episode_text}...", 
-        parse_mode='Markdown'
-    )
+    loading_text = f"🔎 Recherche sur **{display_name}** → « **{query}** »{episode_text}..."
+    loading_msg = await update.message.reply_text(loading_text, parse_mode='Markdown')
     
+    await enqueue_job(update, loading_msg, loading_text, PRIORITY_LINK, lambda job, status: _run_link(update, status, site, query, episode))
+
+async def _run_link(update: Update, status, site: str, query: str, episode):
+    """Job 'link': résolution, puis réponse à l'utilisateur"""
+    set_command("link")
     try:
-        # Résolution intelligente
-        res = await resolve_media_link(site, query, episode=episode)
+        # Résolution intelligente (ou réponse instantanée depuis le cache)
+        res, cache_status = await result_cache.get_or_compute(
+            make_key("link", site, query, episode),
+            lambda: resolve_media_link(site, query, episode=episode),
+            lambda r: ttl_for_source(r.get("source"), negative=not r.get("link")),
+        )
+        # Source réelle (y compris pour une réponse en cache) pour la réponse et le total
+        set_source(res.get("source") or "none")
         
         # Supprimer le message de chargement
-        await loading_msg.delete()
+        await status.delete()
         
         if not res["link"]:
-            await update.message.reply_text("⚠️ Aucun lien fiable trouvé.", parse_mode='Markdown')
+            if res.get("source") == "sibnet-dead":
+                text = "💀 Vidéo Sibnet supprimée ou introuvable."
+            else:
+                text = "⚠️ Aucun lien fiable trouvé."
+            with span("telegram_reply"):
+                await update.message.reply_text(text, parse_mode='Markdown')
             return
         
         # Formater la réponse selon la source
@@ -169,17 +234,22 @@ async def handle_link_command(update: Update, context: ContextTypes.DEFAULT_TYPE
             f"� **Lien:** {res['link']}",
         ]
         
+        if res.get("duration"):
+            response_lines.append(f"⏱️ **Durée:** {res['duration']}")
         if res.get("page") and res["page"] != res["link"]:
             response_lines.append(f"📄 **Page:** {res['page']}")
+        if cache_status != STATUS_MISS:
+            response_lines.append("♻️ _Résultat en cache_")
         
-        await update.message.reply_text(
-            "\n".join(response_lines),
-            parse_mode='Markdown',
-            disable_web_page_preview=True
-        )
+        with span("telegram_reply"):
+            await update.message.reply_text(
+                "\n".join(response_lines),
+                parse_mode='Markdown',
+                disable_web_page_preview=True
+            )
         
     except Exception as e:
-        await loading_msg.delete()
+        await status.delete()
         error_msg = f"❌ **Erreur lors de la résolution:**\n`{str(e)}`"
         await update.message.reply_text(error_msg, parse_mode='Markdown')
 
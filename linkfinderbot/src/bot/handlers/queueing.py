@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+Soumission des commandes à l'ordonnanceur: le handler rend la main
+immédiatement, le message de chargement affiche la position dans la file
+puis la progression du job (éditions fusionnées par StatusEditor).
+"""
+from telegram import Update
+from ..utils.job_scheduler import job_scheduler, QueueFullError
+from ..utils.metrics import span
+from .status_editor import StatusEditor
+
+async def enqueue_job(update: Update, loading_msg, base_text: str, priority: int, run):
+    """
+    Met `run(job, status)` en file pour l'utilisateur. `base_text` est le
+    texte du message de chargement, complété par la position puis par
+    job.report(); `status` (StatusEditor) sert aux éditions finales.
+    """
+    user = update.effective_user
+    user_id = user.id if user else None
+    status = StatusEditor(loading_msg)
+    state = {"started": False}
+
+    async def on_position(pos):
+        if not state["started"]:
+            status.update(f"{base_text}\n⏳ En file d'attente (position {pos})")
+
+    async def on_progress(text):
+        status.update(base_text + text)
+
+    async def on_cancel():
+        await status.edit("⏹️ Recherche annulée (nouvelle commande reçue)", parse_mode=None)
+        await status.close()
+
+    async def wrapped(job):
+        state["started"] = True
+        if job.position:
+            # Effacer la position affichée
+            await job.report("")
+        try:
+            # `run` pose la commande et la source: l'étape est étiquetée à sa sortie
+            with span("total"):
+                await run(job, status)
+        finally:
+            await status.close()
+
+    try:
+        await job_scheduler.submit(
+            user_id,
+            priority,
+            wrapped,
+            on_position=on_position,
+            on_progress=on_progress,
+            on_cancel=on_cancel,
+        )
+    except QueueFullError:
+        await status.edit("🚦 Trop de recherches en cours, réessaie dans un instant.", parse_mode=None)
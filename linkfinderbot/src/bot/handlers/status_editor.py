@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+Éditeur du message de statut d'une commande.
+
+Les mises à jour de progression sont fusionnées: seul le dernier texte en
+attente part, au plus une édition toutes les `min_interval` secondes par
+chat (Telegram limite les éditions), et un texte identique au dernier
+envoyé est ignoré. Un RetryAfter de Telegram repousse l'édition au lieu de
+la faire échouer.
+"""
+import asyncio
+import time
+from typing import Dict, Optional, Tuple
+
+from telegram.error import BadRequest, RetryAfter
+
+from ..utils.metrics import span
+
+DEFAULT_MIN_INTERVAL = 1.5
+MAX_RETRIES = 3
+
+_min_interval = DEFAULT_MIN_INTERVAL
+# Prochain créneau d'édition libre, par chat
+_next_slot: Dict[Optional[int], float] = {}
+
+
+def configure_status_edits(min_interval: Optional[float] = None):
+    global _min_interval
+    if min_interval is not None:
+        _min_interval = max(0.0, min_interval)
+
+
+def _retry_delay(error: RetryAfter) -> float:
+    delay = error.retry_after
+    return delay.total_seconds() if hasattr(delay, "total_seconds") else float(delay)
+
+
+def _reserve_slot(chat_id: Optional[int]) -> float:
+    """Réserve le prochain créneau du chat; retourne l'attente avant de l'utiliser"""
+    now = time.monotonic()
+    if len(_next_slot) > 1000:
+        for chat in [c for c, t in _next_slot.items() if t < now]:
+            del _next_slot[chat]
+    slot = max(now, _next_slot.get(chat_id, 0.0))
+    _next_slot[chat_id] = slot + _min_interval
+    return slot - now
+
+
+class StatusEditor:
+    """Message de chargement d'une commande, édité sans dépasser les limites Telegram"""
+
+    def __init__(self, message, parse_mode: Optional[str] = "Markdown"):
+        self.message = message
+        self.parse_mode = parse_mode
+        self.chat_id = getattr(message, "chat_id", None)
+        self._last_text: Optional[str] = None
+        self._pending: Optional[Tuple[str, dict]] = None
+        self._task: Optional[asyncio.Task] = None
+        self._send_lock = asyncio.Lock()
+        self._closed = False
+
+    def update(self, text: str, **kwargs):
+        """Progression: remplace le texte en attente, envoyé au prochain créneau"""
+        if self._closed:
+            return
+        if text == self._last_text and self._pending is None:
+            return
+        self._pending = (text, kwargs)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._flush_pending())
+
+    async def edit(self, text: str, **kwargs):
+        """Édition immédiate (résultat final): la progression en attente est abandonnée"""
+        self._cancel_pending()
+        with span("telegram_reply"):
+            await self._send(text, kwargs)
+
+    async def delete(self):
+        await self.close()
+        await self.message.delete()
+
+    async def close(self):
+        """Plus aucune mise à jour de progression ne partira"""
+        self._closed = True
+        self._cancel_pending()
+
+    def _cancel_pending(self):
+        self._pending = None
+        if self._task is not None and self._task is not asyncio.current_task():
+            self._task.cancel()
+        self._task = None
+
+    async def _flush_pending(self):
+        while self._pending is not None:
+            text, kwargs = self._pending
+            self._pending = None
+            try:
+                await self._send(text, kwargs, coalesce=True)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠️ Édition du statut ignorée: {e}")
+
+    async def _send(self, text: str, kwargs: dict, coalesce: bool = False):
+        async with self._send_lock:
+            for attempt in range(MAX_RETRIES):
+                await asyncio.sleep(_reserve_slot(self.chat_id))
+                if coalesce and self._pending is not None:
+                    # Un texte plus récent est arrivé pendant l'attente
+                    text, kwargs = self._pending
+                    self._pending = None
+                if text == self._last_text:
+                    return
+                try:
+                    await self.message.edit_text(text, **{"parse_mode": self.parse_mode, **kwargs})
+                    self._last_text = text
+                    return
+                except RetryAfter as e:
+                    delay = _retry_delay(e)
+                    print(f"🚦 Telegram: édition repoussée de {delay:.0f}s")
+                    _next_slot[self.chat_id] = time.monotonic() + delay
+                    if attempt == MAX_RETRIES - 1:
+                        raise
+                except BadRequest as e:
+                    if "not modified" in str(e).lower():
+                        self._last_text = text
+                        return
+                    raise
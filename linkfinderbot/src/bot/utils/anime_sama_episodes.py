@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""
+Résolution directe épisode → lecteurs d'une page saison anime-sama, sans
+navigateur: la page charge un episodes.js qui déclare un tableau par
+lecteur (`var eps1 = ['https://video.sibnet.ru/shell.php?videoid=…', …]`),
+indexé par position d'épisode. Les numéros affichés viennent des appels
+creerListe(début, fin) / newSP(…) du script de la page.
+"""
+import re
+import urllib.parse
+from typing import Dict, List, Optional, Tuple
+
+from bs4 import BeautifulSoup
+
+from .http_client import get_http_client
+from .metrics import span
+from .player_probe import check_player_url, first_preferred, rank_players
+
+_SCRIPT_RE = re.compile(r"""src\s*=\s*["']([^"']*episodes\.js[^"']*)["']""", re.IGNORECASE)
+_ARRAY_RE = re.compile(r"\bvar\s+eps(\d+)\s*=\s*\[(.*?)\]\s*;?", re.DOTALL)
+_STRING_RE = re.compile(r"""'([^']*)'|"([^"]*)\"""")
+_BLOCK_COMMENT_RE = re.compile(r"/\*.*?\*/", re.DOTALL)
+_HTML_COMMENT_RE = re.compile(r"<!--.*?-->", re.DOTALL)
+_LINE_COMMENT_RE = re.compile(r"^\s*//.*$", re.MULTILINE)
+_LISTING_RE = re.compile(r"\b(creerListe)\(\s*(\d+)\s*,\s*(\d+)\s*\)|\b(newSPF?)\(")
+
+
+def _strip_page_comments(html: str) -> str:
+    """Page sans commentaires HTML ni /* */ (anciens scripts, listes désactivées)"""
+    return _BLOCK_COMMENT_RE.sub("", _HTML_COMMENT_RE.sub("", html or ""))
+
+
+def episodes_script_url(html: str, page_url: str) -> str:
+    """URL du episodes.js de la page (avec son filever), sinon l'emplacement par défaut"""
+    m = _SCRIPT_RE.search(_strip_page_comments(html))
+    if m:
+        return urllib.parse.urljoin(page_url, m.group(1))
+    return urllib.parse.urljoin(page_url.rstrip("/") + "/", "episodes.js")
+
+
+def parse_episode_arrays(js: str) -> Dict[int, List[str]]:
+    """{numéro de lecteur: [URL de l'épisode 1, 2, …]}"""
+    js = _LINE_COMMENT_RE.sub("", _BLOCK_COMMENT_RE.sub("", js or ""))
+    players = {}
+    for num, body in _ARRAY_RE.findall(js):
+        players[int(num)] = [(a or b).strip() for a, b in _STRING_RE.findall(body)]
+    return players
+
+
+def episode_numbers(html: str) -> List[Optional[int]]:
+    """
+    Numéro affiché de chaque position (None pour un spécial), d'après les
+    appels creerListe / newSP de la page; vide si la page n'en déclare pas.
+    """
+    numbers: List[Optional[int]] = []
+    for m in _LISTING_RE.finditer(_strip_page_comments(html)):
+        if m.group(1):
+            numbers.extend(range(int(m.group(2)), int(m.group(3)) + 1))
+        else:
+            numbers.append(None)
+    return numbers
+
+
+def episode_index(numbers: List[Optional[int]], episode: Optional[int]) -> Optional[int]:
+    """Position d'un épisode (la première par défaut), None s'il n'existe pas"""
+    if not episode:
+        return 0
+    if numbers:
+        return numbers.index(episode) if episode in numbers else None
+    return episode - 1
+
+
+def players_for_episode(players: Dict[int, List[str]], index: int) -> List[Tuple[str, str]]:
+    """[(« Lecteur N », URL)] des lecteurs qui ont cet épisode"""
+    return [
+        (f"Lecteur {num}", urls[index])
+        for num, urls in sorted(players.items())
+        if index < len(urls) and urls[index]
+    ]
+
+
+async def pick_live_player(options: List[Tuple[str, str]]) -> Tuple[str, str]:
+    """
+    Lecteur préféré dont l'iframe répond: les URL sont vérifiées en
+    parallèle; si aucune ne répond (site qui filtre les robots), le
+    classement par préférence seul tranche.
+    """
+    ranked = rank_players(options)
+    winner, _ = await first_preferred(ranked, lambda option: check_player_url(option[1]))
+    return winner or ranked[0]
+
+
+async def resolve_episode_direct(page_url: str, episode: Optional[int], timeout: float = 10) -> Optional[Dict]:
+    """
+    Lecteurs de l'épisode en deux requêtes HTTP (page + episodes.js), puis
+    vérification concurrente des iframes candidates.
+    None si la page ou le script ne se lisent pas (le chemin à clics prend
+    alors le relais).
+    """
+    client = get_http_client()
+    try:
+        with span("episode_select"):
+            resp = await client.get(page_url, timeout=timeout)
+            html = resp.text if resp.status_code == 200 else ""
+            script = await client.get(episodes_script_url(html, str(resp.url)), timeout=timeout)
+            players = parse_episode_arrays(script.text) if script.status_code == 200 else {}
+            numbers = episode_numbers(html)
+            index = episode_index(numbers, episode)
+    except Exception as e:
+        print(f"⚠️ episodes.js indisponible ({page_url}): {type(e).__name__}")
+        return None
+    if not players or index is None:
+        return None
+    options = players_for_episode(players, index)
+    if not options:
+        return None
+
+    with span("player_probe"):
+        label, url = await pick_live_player(options)
+    title = ""
+    if html:
+        tag = BeautifulSoup(html, "lxml").title
+        title = tag.get_text(strip=True) if tag else ""
+    shown = numbers[index] if numbers and numbers[index] is not None else index + 1
+    return {
+        "title": title,
+        "episode_label": f"Episode {shown}",
+        "lecteur_label": label,
+        "iframe": url,
+        "players": options,
+    }
@@ -2,10 +2,19 @@
 import re
 import urllib.parse
 from typing import Optional, Dict
-from playwright.async_api import async_playwright
 from bs4 import BeautifulSoup
 import requests
 
+from .browser_pool import browser_pool, DEFAULT_USER_AGENT
+from .catalogue_index import catalogue_index
+from .metrics import span
+from .result_cache import make_key
+from .sibnet_resolver import sibnet_resolver, sibnet_video_id
+from .single_flight import single_flight
+from .anime_sama_episodes import resolve_episode_direct
+from .player_probe import first_preferred
+from .readiness import NetworkWatcher, current_iframe_src, first_ready, wait_for_iframe_src_change
+
 def _normalize_site(site_or_url: str) -> str:
     """Normalise l'URL du site"""
     if site_or_url.startswith("http"):
@@ -32,10 +41,10 @@ def _to_sibnet_share(iframe_url: str) -> str:
     
     return iframe_url
 
-def ddg_first_result_site(domain: str, keyword: str) -> Optional[str]:
+async def ddg_first_result_site(domain: str, keyword: str) -> Optional[str]:
     """Fallback DuckDuckGo pour trouver la page de l'anime"""
-    from .fast_jump import ddg_first_site
-    return ddg_first_site(domain, keyword)
+    from .search_client import ddg_first_site
+    return await ddg_first_site(domain, keyword)
 
 async def _type_search_or_fallback(page, start_url: str, keyword: str, timeout_ms: int) -> bool:
     """Effectue une recherche sur le site"""
@@ -128,6 +137,22 @@ async def _episode_dropdown_locators(page):
         print(f"❌ Erreur localisation dropdowns: {e}")
         return None, None
 
+async def _click_and_wait_player(page, target, timeout_ms: int):
+    """
+    Clique sur une option puis attend que l'iframe lecteur change de src ou
+    que le réseau se calme, avec `timeout_ms` comme deadline stricte.
+    """
+    previous_src = await current_iframe_src(page)
+    network = NetworkWatcher(page)
+    try:
+        await target.click()
+        await first_ready({
+            "iframe": wait_for_iframe_src_change(page, previous_src, timeout_ms),
+            "quiet": network.wait_quiet(300, timeout_ms),
+        }, timeout_ms=timeout_ms)
+    finally:
+        network.close()
+
 async def _select_episode(page, ep_selector: Optional[str], episode: Optional[int]) -> str:
     """Sélectionne un épisode spécifique"""
     if not ep_selector or not episode:
@@ -145,8 +170,7 @@ async def _select_episode(page, ep_selector: Optional[str], episode: Optional[in
             
             # Chercher le numéro d'épisode dans le texte ou la valeur
             if str(episode) in text or str(episode) in (value or ""):
-                await option.click()
-                await page.wait_for_timeout(1000)  # Attendre le chargement
+                await _click_and_wait_player(page, option, 1000)  # Attendre le chargement
                 print(f"✅ Épisode sélectionné: {text}")
                 return text.strip()
         
@@ -157,43 +181,55 @@ async def _select_episode(page, ep_selector: Optional[str], episode: Optional[in
         print(f"❌ Erreur sélection épisode: {e}")
         return "(erreur sélection épisode)"
 
-async def _try_each_player_until_sibnet(page, lecteur_selector: Optional[str]):
-    """Teste chaque lecteur jusqu'à trouver Sibnet"""
+async def _probe_player_option(context, page_url: str, ep_selector: Optional[str], episode: Optional[int],
+                               lecteur_selector: str, index: int, timeout_ms: int) -> str:
+    """Iframe du lecteur n° `index`, dans un onglet à part du même contexte"""
+    page = await context.new_page()
+    try:
+        with span("goto"):
+            await page.goto(page_url, wait_until="domcontentloaded", timeout=timeout_ms)
+        await _select_episode(page, ep_selector, episode)
+        await _click_and_wait_player(page, page.locator(f"{lecteur_selector} option").nth(index), 2000)
+        return await _extract_iframe_from_page(page)
+    finally:
+        await page.close()
+
+async def _probe_players(page, context, page_url: str, ep_selector: Optional[str], episode: Optional[int],
+                         lecteur_selector: Optional[str], timeout_ms: int):
+    """
+    Sonde tous les lecteurs en parallèle et garde le préféré (Sibnet par
+    défaut). Le lecteur déjà affiché est lu sur la page courante, les
+    autres dans des onglets séparés; retourne (label, iframe).
+    """
     if not lecteur_selector:
         # Pas de sélecteur de lecteur, chercher directement les iframes
-        return await _extract_iframe_from_page(page)
-    
+        return "(lecteur par défaut)", await _extract_iframe_from_page(page)
+
     try:
         options = page.locator(f"{lecteur_selector} option")
-        count = await options.count()
-        
-        for i in range(count):
-            option = options.nth(i)
-            text = await option.text_content()
-            
-            # Sélectionner ce lecteur
-            await option.click()
-            await page.wait_for_timeout(2000)  # Attendre le chargement
-            
-            # Extraire l'iframe
-            iframe_url = await _extract_iframe_from_page(page)
-            
-            if _is_sibnet(iframe_url):
-                print(f"🎯 Sibnet trouvé avec lecteur: {text}")
-                return text.strip(), iframe_url
-        
-        # Si aucun Sibnet trouvé, retourner le premier lecteur
-        if count > 0:
-            first_option = options.first
-            await first_option.click()
-            await page.wait_for_timeout(2000)
-            iframe_url = await _extract_iframe_from_page(page)
-            text = await first_option.text_content()
-            print(f"⚠️ Sibnet non trouvé, utilisation du premier lecteur: {text}")
-            return text.strip(), iframe_url
-        
-        return "(aucun lecteur)", ""
-        
+        labels = [t.strip() for t in await options.all_text_contents()]
+        if not labels:
+            return "(aucun lecteur)", ""
+        # Option affichée (la première si aucune n'est marquée selected)
+        selected = max(0, await options.evaluate_all("els => els.findIndex(o => o.selected)"))
+
+        async def probe(index: int) -> str:
+            if index == selected:
+                iframe = await _extract_iframe_from_page(page)
+            else:
+                iframe = await _probe_player_option(context, page_url, ep_selector, episode, lecteur_selector, index, timeout_ms)
+            # Une vidéo Sibnet supprimée ne doit pas gagner sur un autre hébergeur
+            if sibnet_video_id(iframe) and not await sibnet_resolver.is_alive(iframe):
+                print(f"💀 Vidéo Sibnet indisponible: {iframe}")
+                return ""
+            return iframe
+
+        index, iframe_url = await first_preferred(list(range(len(labels))), probe)
+        if index is None:
+            return "(aucun lecteur)", ""
+        print(f"🎯 Lecteur retenu: {labels[index]} → {iframe_url}")
+        return labels[index], iframe_url
+
     except Exception as e:
         print(f"❌ Erreur test lecteurs: {e}")
         return "(erreur lecteurs)", ""
@@ -227,6 +263,37 @@ async def _extract_iframe_from_page(page) -> str:
         print(f"❌ Erreur extraction iframe: {e}")
         return ""
 
+async def _final_link(raw_iframe: str):
+    """
+    (lien final, explication, matched, durée en secondes) à partir de
+    l'iframe du lecteur; un lien Sibnet est vérifié avant d'être rendu.
+    """
+    if _is_sibnet(raw_iframe):
+        info = await sibnet_resolver.resolve(raw_iframe)
+        if info and info["available"] is False:
+            return "", "vidéo sibnet supprimée ou introuvable", False, None
+        return _to_sibnet_share(raw_iframe), "sibnet détecté → lien partage normalisé", True, info and info["duration"]
+    return raw_iframe or "", "sibnet absent → lien du 1er lecteur", bool(raw_iframe), None
+
+async def _extract_from_episodes_js(page_url: str, episode: Optional[int], searched: bool) -> Optional[Dict]:
+    """Mode sans clic: lecteurs lus dans episodes.js (None si illisible)"""
+    direct = await resolve_episode_direct(page_url, episode)
+    if not direct:
+        return None
+    final_url, why, matched, duration = await _final_link(direct["iframe"])
+    print(f"⚡ episodes.js: {direct['episode_label']} / {direct['lecteur_label']} → {final_url}")
+    return {
+        "matched": matched,
+        "page_url": page_url,
+        "titre": direct["title"],
+        "episode_selected": direct["episode_label"] if episode else "(aucun épisode sélectionné)",
+        "lecteur_label": direct["lecteur_label"],
+        "raw_iframe": direct["iframe"],
+        "final_url": final_url,
+        "duree": duration,
+        "why": why + " (episodes.js)" + (" (recherche)" if searched else ""),
+    }
+
 async def extract_anime_sama(
     site_or_url: str,
     keyword: str,
@@ -236,6 +303,8 @@ async def extract_anime_sama(
     timeout_ms: int = 15000,
     use_ddg_backup: bool = True,
     direct_url: Optional[str] = None,  # NEW: passer une URL directe si on l'a
+    parse_episodes: bool = True,
+    on_stage=None,
 ) -> Dict:
     """
     Extrait les informations d'un anime depuis anime-sama.fr
@@ -244,30 +313,67 @@ async def extract_anime_sama(
         site_or_url: URL du site ou nom de domaine
         keyword: Mot-clé de recherche
         episode: Numéro d'épisode à sélectionner
-        headless: Mode navigateur invisible
+        headless: Conservé pour compatibilité (le mode est fixé par le pool)
         timeout_ms: Timeout en millisecondes
         use_ddg_backup: Utiliser DuckDuckGo en fallback
         direct_url: URL directe vers la page de l'anime (skip recherche)
+        parse_episodes: Lire episodes.js plutôt que cliquer les listes
+            (le chemin à clics ne sert que si la lecture échoue)
+        on_stage: Coroutine recevant l'étape en cours (message de statut)
     
     Returns:
         Dict avec les résultats de l'extraction
+
+    Les appels concurrents identiques (site ou page, mot-clé, épisode)
+    partagent une seule extraction; seul le premier reçoit les étapes.
     """
+    key = make_key("anime-sama", direct_url or site_or_url, keyword, episode) + f"|{use_ddg_backup}|{parse_episodes}"
+    return await single_flight.run(key, lambda: _extract_anime_sama(
+        site_or_url, keyword, episode=episode, timeout_ms=timeout_ms, use_ddg_backup=use_ddg_backup,
+        direct_url=direct_url, parse_episodes=parse_episodes, on_stage=on_stage,
+    ))
+
+async def _extract_anime_sama(
+    site_or_url: str,
+    keyword: str,
+    *,
+    episode: Optional[int] = None,
+    timeout_ms: int = 15000,
+    use_ddg_backup: bool = True,
+    direct_url: Optional[str] = None,
+    parse_episodes: bool = True,
+    on_stage=None,
+) -> Dict:
+    """Extraction proprement dite (voir extract_anime_sama)"""
     start = _normalize_site(site_or_url)
     domain = urllib.parse.urlsplit(start).netloc
 
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(
-            headless=headless,
-            args=["--no-sandbox", "--disable-dev-shm-usage", "--disable-blink-features=AutomationControlled"],
-        )
-        context = await browser.new_context(
-            locale="fr-FR",
-            user_agent=("Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                        "AppleWebKit/537.36 (KHTML, like Gecko) "
-                        "Chrome/124.0.0.0 Safari/537.36"),
-            viewport={"width": 1366, "height": 768},
-            ignore_https_errors=True,
-        )
+    # Index local du catalogue: évite la recherche dans le site
+    if not direct_url and "anime-sama" in domain:
+        entry = await catalogue_index.resolve(keyword)
+        if entry:
+            print(f"📚 Index catalogue: {entry['title']} → {entry['page_url']}")
+            direct_url = entry["page_url"]
+
+    async def stage(text: str):
+        if on_stage:
+            await on_stage(text)
+
+    # Page connue: les lecteurs se lisent sans ouvrir de navigateur
+    if direct_url and parse_episodes:
+        await stage("\n📄 Lecture de la liste des épisodes...")
+        result = await _extract_from_episodes_js(direct_url, episode, searched=False)
+        if result:
+            return result
+
+    await stage("\n🌐 Ouverture de la page dans le navigateur...")
+    async with browser_pool.context(
+        blocking="stream",
+        locale="fr-FR",
+        user_agent=DEFAULT_USER_AGENT,
+        viewport={"width": 1366, "height": 768},
+        ignore_https_errors=True,
+    ) as context:
         page = await context.new_page()
 
         # 0) NEW: si on nous donne déjà l'URL de la fiche → on saute la recherche
@@ -277,7 +383,8 @@ async def extract_anime_sama(
         else:
             # 1) home
             print(f"🏠 Accès à la page d'accueil: {start}")
-            await page.goto(start, wait_until="domcontentloaded", timeout=timeout_ms)
+            with span("goto"):
+                await page.goto(start, wait_until="domcontentloaded", timeout=timeout_ms)
             
             # 2) search interne
             used_internal = await _type_search_or_fallback(page, start, keyword, timeout_ms)
@@ -286,37 +393,36 @@ async def extract_anime_sama(
             # 2bis) fallback DDG site:
             if not first and use_ddg_backup:
                 print("🔄 Fallback DuckDuckGo...")
-                ext = ddg_first_result_site(domain, keyword)
+                ext = await ddg_first_result_site(domain, keyword)
                 if ext:
                     first = ext
             
             if not first:
-                await context.close()
-                await browser.close()
                 return {"matched": False, "why": "Aucun résultat", "page_url": page.url}
 
+            # 2ter) page trouvée: episodes.js avant les clics
+            if parse_episodes:
+                result = await _extract_from_episodes_js(first, episode, searched=True)
+                if result:
+                    return result
+
         # 3) ouvrir la page série / saison (directe ou trouvée)
         print(f"📖 Ouverture de la page: {first}")
-        await page.goto(first, wait_until="domcontentloaded", timeout=timeout_ms)
+        with span("goto"):
+            await page.goto(first, wait_until="domcontentloaded", timeout=timeout_ms)
 
         # 4) EPISODE + LECTEUR
-        ep_sel, lecteur_sel = await _episode_dropdown_locators(page)
-        chosen_episode_label = await _select_episode(page, ep_sel, episode)
-        lecteur_label, raw_iframe = await _try_each_player_until_sibnet(page, lecteur_sel)
+        with span("episode_select"):
+            ep_sel, lecteur_sel = await _episode_dropdown_locators(page)
+            chosen_episode_label = await _select_episode(page, ep_sel, episode)
+        await stage("\n🎬 Test des lecteurs en parallèle...")
+        with span("player_probe"):
+            lecteur_label, raw_iframe = await _probe_players(page, context, first, ep_sel, episode, lecteur_sel, timeout_ms)
 
         # 5) build final link
-        if _is_sibnet(raw_iframe):
-            final_url = _to_sibnet_share(raw_iframe)
-            why = "sibnet détecté → lien partage normalisé"
-            matched = True
-        else:
-            final_url = raw_iframe or ""
-            why = "sibnet absent → lien du 1er lecteur"
-            matched = bool(final_url)
+        final_url, why, matched, duration = await _final_link(raw_iframe)
 
         title = await page.title()
-        await context.close()
-        await browser.close()
 
         return {
             "matched": matched,
@@ -326,5 +432,6 @@ async def extract_anime_sama(
             "lecteur_label": lecteur_label,
             "raw_iframe": raw_iframe,
             "final_url": final_url,
+            "duree": duration,
             "why": why + ("" if direct_url else " (recherche)"),
         }
\ No newline at end of file
@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+"""
+Pool de navigateurs Chromium partagé par tout le process.
+
+Le navigateur est lancé une seule fois (au démarrage de l'application) et
+chaque requête reçoit un BrowserContext neuf, fermé à la fin: rien
+(cookies, localStorage, IndexedDB, cache HTTP, service workers,
+permissions) ne passe d'un utilisateur à l'autre. Chromium est relancé
+quand la mémoire du process grossit.
+"""
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+
+from playwright.async_api import async_playwright
+
+from .metrics import metrics
+from .resource_blocking import apply_blocking
+
+try:
+    import psutil  # optionnel: mesure de la RSS Chromium incluse
+except Exception:
+    psutil = None
+
+DEFAULT_LAUNCH_ARGS = [
+    "--no-sandbox",
+    "--disable-dev-shm-usage",
+    "--disable-blink-features=AutomationControlled",
+]
+
+DEFAULT_USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/124.0.0.0 Safari/537.36"
+)
+
+
+def _rss_mb() -> Optional[float]:
+    """RSS du process et de ses enfants (Chromium) en Mo, None si inconnue"""
+    if psutil is not None:
+        try:
+            proc = psutil.Process(os.getpid())
+            total = proc.memory_info().rss
+            for child in proc.children(recursive=True):
+                try:
+                    total += child.memory_info().rss
+                except Exception:
+                    pass
+            return total / (1024 * 1024)
+        except Exception:
+            return None
+    # Fallback Linux sans psutil: uniquement le process Python
+    try:
+        with open("/proc/self/status", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except Exception:
+        pass
+    return None
+
+
+class BrowserPool:
+    """Pool process-wide: un Chromium, un contexte neuf par requête, concurrence bornée"""
+
+    def __init__(
+        self,
+        *,
+        headless: bool = True,
+        max_concurrency: int = 4,
+        max_memory_mb: Optional[int] = 1500,
+        launch_args: Optional[List[str]] = None,
+    ):
+        self.configure(
+            headless=headless,
+            max_concurrency=max_concurrency,
+            max_memory_mb=max_memory_mb,
+            launch_args=launch_args,
+        )
+        self._playwright = None
+        self._browser = None
+        self._in_use = 0
+        self._block_stats: Dict[int, object] = {}
+        self._start_lock = asyncio.Lock()
+
+    def configure(
+        self,
+        *,
+        headless: Optional[bool] = None,
+        max_concurrency: Optional[int] = None,
+        max_memory_mb: Optional[int] = None,
+        launch_args: Optional[List[str]] = None,
+    ):
+        """Met à jour la configuration (à appeler avant start())"""
+        if headless is not None:
+            self.headless = headless
+        if max_concurrency is not None:
+            self.max_concurrency = max(1, int(max_concurrency))
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        if max_memory_mb is not None:
+            self.max_memory_mb = max_memory_mb or None
+        if launch_args is not None or not hasattr(self, "launch_args"):
+            self.launch_args = list(launch_args or DEFAULT_LAUNCH_ARGS)
+
+    @property
+    def started(self) -> bool:
+        return self._browser is not None and self._browser.is_connected()
+
+    async def start(self):
+        """Lance Playwright et Chromium (idempotent)"""
+        async with self._start_lock:
+            if self.started:
+                return
+            if self._playwright is None:
+                self._playwright = await async_playwright().start()
+            self._browser = await self._playwright.chromium.launch(
+                headless=self.headless,
+                args=self.launch_args,
+            )
+            print(f"🌐 Pool navigateur démarré (concurrence max: {self.max_concurrency})")
+
+    async def stop(self):
+        """Ferme le navigateur (et ses contextes) puis Playwright"""
+        async with self._start_lock:
+            if self._browser is not None:
+                try:
+                    await self._browser.close()
+                except Exception:
+                    pass
+                self._browser = None
+            if self._playwright is not None:
+                try:
+                    await self._playwright.stop()
+                except Exception:
+                    pass
+                self._playwright = None
+            print("🌐 Pool navigateur arrêté")
+
+    async def _restart_browser(self):
+        """Relance Chromium quand la mémoire a trop grossi (aucun contexte actif)"""
+        print("♻️ Mémoire élevée, redémarrage du navigateur")
+        async with self._start_lock:
+            if self._browser is not None:
+                try:
+                    await self._browser.close()
+                except Exception:
+                    pass
+                self._browser = None
+        await self.start()
+
+    async def _release_context(self, context):
+        # Un contexte ne sert qu'une fois: l'état d'un utilisateur ne survit pas à sa requête
+        try:
+            await context.close()
+        except Exception:
+            pass
+
+        rss = _rss_mb()
+        if self.max_memory_mb and rss is not None and rss > self.max_memory_mb and self._in_use == 0:
+            # Plus rien ne tourne: on relance Chromium
+            await self._restart_browser()
+
+    @asynccontextmanager
+    async def context(self, blocking: str = "crawl", **options):
+        """
+        Fournit un BrowserContext neuf, fermé à la sortie. Les options sont
+        celles de browser.new_context(). `blocking` choisit le profil de
+        resource_blocking appliqué ("crawl", "stream" ou "none").
+        """
+        waited = time.perf_counter()
+        async with self._semaphore:
+            if not self.started:
+                await self.start()
+            context = await self._browser.new_context(**options)
+            self._in_use += 1
+            stats = None
+            try:
+                stats = await apply_blocking(context, blocking)
+                self._block_stats[id(context)] = stats
+                # Attente d'un créneau comprise: c'est elle qui grossit sous charge
+                metrics.observe("browser_acquire", time.perf_counter() - waited)
+                yield context
+            finally:
+                self._in_use -= 1
+                self._block_stats.pop(id(context), None)
+                if stats is not None:
+                    print(f"🚫 Blocage ressources: {stats.summary()}")
+                await self._release_context(context)
+
+    def block_stats(self, context):
+        """Compteurs de blocage de la requête en cours sur ce contexte"""
+        return self._block_stats.get(id(context))
+
+    @asynccontextmanager
+    async def page(self, blocking: str = "crawl", **options):
+        """Raccourci: contexte du pool + nouvelle page"""
+        async with self.context(blocking=blocking, **options) as context:
+            page = await context.new_page()
+            yield page
+
+
+# Instance unique partagée par tout le process
+browser_pool = BrowserPool()
+
+
+def get_browser_pool() -> BrowserPool:
+    return browser_pool
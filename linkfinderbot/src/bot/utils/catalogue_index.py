@@ -0,0 +1,381 @@
+# -*- coding: utf-8 -*-
+"""
+Index local du catalogue anime-sama.fr (titre, titres alternatifs, saisons,
+langues VF/VOSTFR, URL de la fiche).
+
+Un rafraîchissement périodique parcourt les pages du catalogue en HTTP
+simple, puis ne recharge que les fiches nouvelles ou trop anciennes
+(rafraîchissement incrémental). La recherche passe par un index FTS5 à
+trigrammes (tolérant aux coquilles) puis un reclassement rapidfuzz:
+/fast trouve la fiche en quelques millisecondes, sans moteur de recherche.
+Une fiche pas encore détaillée voit ses saisons lues à la demande; sans
+saison, resolve() ne renvoie rien et l'appelant repasse par DuckDuckGo.
+"""
+import asyncio
+import json
+import re
+import sqlite3
+import threading
+import time
+import urllib.parse
+from typing import Dict, List, Optional, Tuple
+
+from bs4 import BeautifulSoup
+from rapidfuzz import fuzz
+
+from .http_client import get_http_client
+from .metrics import span
+from .paths import data_path
+from .scoring import fuzz_column, normalize_text
+from .single_flight import SingleFlight
+
+CATALOGUE_BASE = "https://anime-sama.fr"
+CATALOGUE_PATH = "/catalogue/"
+
+MAX_CATALOGUE_PAGES = 200
+DETAILS_TTL = 7 * 24 * 3600
+DETAILS_PER_REFRESH = 40
+DETAILS_CONCURRENCY = 3
+DEFAULT_REFRESH_INTERVAL = 24 * 3600
+
+# Score rapidfuzz minimal pour accepter une fiche sans autre vérification
+MIN_MATCH_SCORE = 85
+FTS_CANDIDATES = 50
+
+LANGUAGES = ("vostfr", "vf")
+
+_SERIES_HREF_RE = re.compile(r"/catalogue/([^/?#]+)/?$")
+_LANG_RE = re.compile(r"\b(VOSTFR|VF)\b", re.IGNORECASE)
+_SEASON_RE = re.compile(r'panneauAnime\(\s*"([^"]+)"\s*,\s*"([^"]+)"\s*\)')
+_QUERY_NOISE_RE = re.compile(
+    r"\b(?:saison|season|s)\s*\d+\b|\b(?:[ée]pisode|ep)\s*\d*\b|\b(?:vostfr|vf)\b|\b\d{1,4}\b",
+    re.IGNORECASE,
+)
+_QUERY_SEASON_RE = re.compile(r"\b(?:saison|season|s)\s*(\d+)\b", re.IGNORECASE)
+
+
+def parse_fast_query(query: str) -> Tuple[str, Optional[int], Optional[str]]:
+    """
+    « One Piece saison 2 100 VF » → ("one piece", 2, "vf"): titre nettoyé,
+    saison demandée, langue demandée.
+    """
+    season = _QUERY_SEASON_RE.search(query or "")
+    lang = _LANG_RE.search(query or "")
+    title = normalize_text(_QUERY_NOISE_RE.sub(" ", query or ""))
+    return title, int(season.group(1)) if season else None, lang.group(1).lower() if lang else None
+
+
+def parse_catalogue_page(html: str, base_url: str = CATALOGUE_BASE) -> List[Dict]:
+    """Cartes d'une page du catalogue: url, titre, titres alternatifs, langues"""
+    soup = BeautifulSoup(html, "lxml")
+    cards = []
+    for a in soup.select("a[href*='/catalogue/']"):
+        url = urllib.parse.urljoin(base_url, a.get("href", ""))
+        if not _SERIES_HREF_RE.search(urllib.parse.urlsplit(url).path):
+            continue
+        heading = a.find(["h1", "h2", "h3"])
+        img = a.find("img")
+        title = (heading.get_text(" ", strip=True) if heading else "") or (img.get("alt", "") if img else "")
+        if not title:
+            continue
+        alt_titles = []
+        for p in a.find_all("p"):
+            if "italic" in (p.get("class") or []):
+                alt_titles += [t.strip() for t in p.get_text(" ", strip=True).split(",") if t.strip()]
+        languages = sorted({m.lower() for m in _LANG_RE.findall(a.get_text(" ", strip=True))})
+        cards.append({
+            "url": url.rstrip("/") + "/",
+            "title": title,
+            "alt_titles": [t for t in alt_titles if t.lower() != title.lower()],
+            "languages": languages,
+        })
+    return cards
+
+
+def parse_series_page(html: str) -> List[Dict[str, str]]:
+    """Saisons déclarées par panneauAnime("Saison 1", "saison1/vostfr")"""
+    seasons = []
+    for name, path in _SEASON_RE.findall(html):
+        # La page contient un exemple commenté panneauAnime("nom", "url")
+        if name == "nom" or path == "url":
+            continue
+        seasons.append({"name": name, "path": path.strip("/")})
+    return seasons
+
+
+def season_page_url(series_url: str, seasons: List[Dict[str, str]], season: Optional[int], lang: Optional[str]) -> str:
+    """URL de la saison (et langue) demandée, sinon de la première saison, sinon la fiche"""
+    if not seasons:
+        return series_url
+    wanted = f"saison{season}" if season else None
+    chosen = next((s["path"] for s in seasons if wanted and s["path"].split("/")[0] == wanted), None)
+    chosen = chosen or seasons[0]["path"]
+    parts = chosen.split("/")
+    if lang and len(parts) == 2 and parts[1] in LANGUAGES and parts[1] != lang:
+        # Même saison dans l'autre langue, si elle existe
+        alt = f"{parts[0]}/{lang}"
+        if any(s["path"] == alt for s in seasons):
+            chosen = alt
+    return series_url.rstrip("/") + "/" + chosen + "/"
+
+
+class CatalogueIndex:
+    """Fiches du catalogue en SQLite + index de noms FTS5 (trigrammes)"""
+
+    def __init__(self, path=None, base: str = CATALOGUE_BASE, interval: float = DEFAULT_REFRESH_INTERVAL):
+        self._path = path
+        self.base = base
+        self.interval = interval
+        self.enabled = True
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self._fts = True
+        self._task: Optional[asyncio.Task] = None
+        self._refresh_lock: Optional[asyncio.Lock] = None
+        self._details_flights = SingleFlight()
+
+    def configure(self, path=None, interval: Optional[float] = None, enabled: Optional[bool] = None):
+        if path is not None and str(path) != str(self._path):
+            self.close()
+            self._path = path
+        if interval is not None:
+            self.interval = max(60.0, interval)
+        if enabled is not None:
+            self.enabled = enabled
+
+    # --- SQLite -----------------------------------------------------------
+
+    def _conn(self) -> sqlite3.Connection:
+        if self._db is None:
+            path = self._path or data_path("anime_sama_catalogue.sqlite3")
+            self._db = sqlite3.connect(str(path), check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS series ("
+                " url TEXT PRIMARY KEY, title TEXT NOT NULL, alt_titles TEXT NOT NULL,"
+                " languages TEXT NOT NULL, seasons TEXT NOT NULL DEFAULT '[]',"
+                " listed_at REAL NOT NULL, details_at REAL NOT NULL DEFAULT 0)"
+            )
+            try:
+                self._db.execute(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS names USING fts5(name, url UNINDEXED, tokenize='trigram')"
+                )
+            except sqlite3.OperationalError:
+                # SQLite sans FTS5 / trigram (< 3.34): balayage complet des noms
+                self._fts = False
+                self._db.execute("CREATE TABLE IF NOT EXISTS names (name TEXT NOT NULL, url TEXT NOT NULL)")
+            self._db.commit()
+        return self._db
+
+    def close(self):
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def _upsert_cards(self, cards: List[Dict], now: float):
+        with self._db_lock:
+            conn = self._conn()
+            for c in cards:
+                conn.execute(
+                    "INSERT INTO series (url, title, alt_titles, languages, listed_at) VALUES (?, ?, ?, ?, ?)"
+                    " ON CONFLICT(url) DO UPDATE SET title = excluded.title, alt_titles = excluded.alt_titles,"
+                    " languages = excluded.languages, listed_at = excluded.listed_at",
+                    (c["url"], c["title"], json.dumps(c["alt_titles"], ensure_ascii=False),
+                     json.dumps(c["languages"]), now),
+                )
+                conn.execute("DELETE FROM names WHERE url = ?", (c["url"],))
+                for name in {normalize_text(n) for n in [c["title"], *c["alt_titles"]]} - {""}:
+                    conn.execute("INSERT INTO names (name, url) VALUES (?, ?)", (name, c["url"]))
+            conn.commit()
+
+    def _set_seasons(self, url: str, seasons: List[Dict], now: float):
+        with self._db_lock:
+            conn = self._conn()
+            languages = sorted({s["path"].split("/")[-1] for s in seasons} & set(LANGUAGES))
+            row = conn.execute("SELECT languages FROM series WHERE url = ?", (url,)).fetchone()
+            if row:
+                languages = sorted(set(languages) | set(json.loads(row[0])))
+            conn.execute(
+                "UPDATE series SET seasons = ?, languages = ?, details_at = ? WHERE url = ?",
+                (json.dumps(seasons, ensure_ascii=False), json.dumps(languages), now, url),
+            )
+            conn.commit()
+
+    def _stale_details(self, older_than: float, limit: int) -> List[str]:
+        with self._db_lock:
+            rows = self._conn().execute(
+                "SELECT url FROM series WHERE details_at < ? ORDER BY details_at LIMIT ?", (older_than, limit)
+            ).fetchall()
+        return [r[0] for r in rows]
+
+    def _drop_unlisted(self, listed_before: float):
+        """Fiches disparues du catalogue lors d'un parcours complet"""
+        with self._db_lock:
+            conn = self._conn()
+            conn.execute("DELETE FROM names WHERE url IN (SELECT url FROM series WHERE listed_at < ?)", (listed_before,))
+            conn.execute("DELETE FROM series WHERE listed_at < ?", (listed_before,))
+            conn.commit()
+
+    def count(self) -> int:
+        with self._db_lock:
+            return self._conn().execute("SELECT COUNT(*) FROM series").fetchone()[0]
+
+    # --- Recherche ----------------------------------------------------------
+
+    def _candidates(self, text: str) -> List[Tuple[str, str]]:
+        """(nom, url) partageant des trigrammes avec la requête"""
+        with self._db_lock:
+            conn = self._conn()
+            if not self._fts or len(text) < 3:
+                return conn.execute("SELECT name, url FROM names").fetchall()
+            grams = {text[i:i + 3] for i in range(len(text) - 2)}
+            match = " OR ".join('"' + g.replace('"', '""') + '"' for g in sorted(grams))
+            return conn.execute(
+                "SELECT name, url FROM names WHERE names MATCH ? ORDER BY rank LIMIT ?", (match, FTS_CANDIDATES)
+            ).fetchall()
+
+    def _series(self, url: str) -> Optional[Dict]:
+        with self._db_lock:
+            row = self._conn().execute(
+                "SELECT url, title, alt_titles, languages, seasons FROM series WHERE url = ?", (url,)
+            ).fetchone()
+        if not row:
+            return None
+        return {
+            "url": row[0],
+            "title": row[1],
+            "alt_titles": json.loads(row[2]),
+            "languages": json.loads(row[3]),
+            "seasons": json.loads(row[4]),
+        }
+
+    def lookup(self, query: str, min_score: float = MIN_MATCH_SCORE) -> Optional[Dict]:
+        """
+        Fiche la plus proche de la requête (nettoyée de l'épisode, de la
+        saison et de la langue), avec `page_url` pointant sur la saison et la
+        langue demandées quand elles sont connues.
+        """
+        text, season, lang = parse_fast_query(query)
+        if not text:
+            return None
+        candidates = self._candidates(text)
+        if not candidates:
+            return None
+        scores = fuzz_column(fuzz.WRatio, [name for name, _ in candidates], text)
+        best = int(scores.argmax())
+        if scores[best] < min_score:
+            return None
+        entry = self._series(candidates[best][1])
+        if entry is None:
+            return None
+        entry["score"] = float(scores[best])
+        entry["page_url"] = season_page_url(entry["url"], entry["seasons"], season, lang)
+        return entry
+
+    async def resolve(self, query: str, min_score: float = MIN_MATCH_SCORE) -> Optional[Dict]:
+        """
+        Comme lookup(), mais une fiche sans saisons connues est détaillée sur
+        le moment. None si la saison reste introuvable: la fiche seule ne
+        suffit ni à episodes.js ni au choix de l'épisode.
+        """
+        if not self.enabled:
+            return None
+        try:
+            with span("catalogue_lookup"):
+                entry = await asyncio.to_thread(self.lookup, query, min_score)
+            if entry is None or entry["seasons"]:
+                return entry
+            with span("catalogue_details"):
+                seasons = await self._details_flights.run(entry["url"], lambda: self._load_details(entry["url"]))
+            if not seasons:
+                print(f"⚠️ Catalogue: aucune saison pour {entry['url']}")
+                return None
+            _, season, lang = parse_fast_query(query)
+            entry["seasons"] = seasons
+            entry["languages"] = sorted(set(entry["languages"]) | ({s["path"].split("/")[-1] for s in seasons} & set(LANGUAGES)))
+            entry["page_url"] = season_page_url(entry["url"], seasons, season, lang)
+            return entry
+        except Exception as e:
+            print(f"⚠️ Index catalogue indisponible: {e}")
+            return None
+
+    # --- Rafraîchissement ------------------------------------------------------
+
+    async def _fetch(self, url: str) -> Optional[str]:
+        try:
+            resp = await get_http_client().get(url, timeout=15)
+        except Exception as e:
+            print(f"⚠️ Catalogue: {url} ({type(e).__name__})")
+            return None
+        return resp.text if resp.status_code == 200 else None
+
+    async def _crawl_listing(self, now: float) -> Tuple[int, bool]:
+        """Toutes les pages du catalogue; retourne (fiches vues, parcours complet)"""
+        seen = set()
+        for n in range(1, MAX_CATALOGUE_PAGES + 1):
+            html = await self._fetch(f"{self.base}{CATALOGUE_PATH}?page={n}")
+            if html is None:
+                return len(seen), False
+            cards = [c for c in parse_catalogue_page(html, self.base) if c["url"] not in seen]
+            if not cards:
+                # Au-delà de la dernière page, le site renvoie une page vide ou déjà vue
+                return len(seen), True
+            seen.update(c["url"] for c in cards)
+            await asyncio.to_thread(self._upsert_cards, cards, now)
+        return len(seen), False
+
+    async def _load_details(self, url: str) -> List[Dict[str, str]]:
+        """Saisons de la fiche, enregistrées (liste vide si la page n'a pas répondu)"""
+        html = await self._fetch(url)
+        if html is None:
+            return []
+        seasons = parse_series_page(html)
+        await asyncio.to_thread(self._set_seasons, url, seasons, time.time())
+        return seasons
+
+    async def _refresh_details(self, url: str, sem: asyncio.Semaphore):
+        async with sem:
+            await self._load_details(url)
+
+    async def refresh(self, details_budget: int = DETAILS_PER_REFRESH) -> Dict[str, int]:
+        """Relit le catalogue puis les fiches nouvelles ou périmées (au plus `details_budget`)"""
+        if self._refresh_lock is None:
+            self._refresh_lock = asyncio.Lock()
+        async with self._refresh_lock:
+            started = time.time()
+            listed, complete = await self._crawl_listing(started)
+            if complete and listed:
+                await asyncio.to_thread(self._drop_unlisted, started)
+            stale = await asyncio.to_thread(self._stale_details, started - DETAILS_TTL, details_budget)
+            sem = asyncio.Semaphore(DETAILS_CONCURRENCY)
+            await asyncio.gather(*(self._refresh_details(url, sem) for url in stale))
+            total = await asyncio.to_thread(self.count)
+            print(f"📚 Catalogue anime-sama: {listed} fiches listées, {len(stale)} détaillées, {total} indexées "
+                  f"({time.time() - started:.1f}s)")
+            return {"listed": listed, "details": len(stale), "total": total}
+
+    async def _loop(self):
+        while True:
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠️ Rafraîchissement du catalogue échoué: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def start(self):
+        if not self.enabled or self._task is not None:
+            return
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        self.close()
+
+
+# Instance partagée (rafraîchie en tâche de fond par main.py)
+catalogue_index = CatalogueIndex()
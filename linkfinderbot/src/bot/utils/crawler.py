@@ -0,0 +1,320 @@
+# -*- coding: utf-8 -*-
+"""
+Moteur de crawl concurrent: plusieurs onglets consomment une frontière
+partagée, avec une limite de politesse par hôte.
+"""
+import asyncio
+import heapq
+import itertools
+import time
+import urllib.parse
+from collections import deque
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_WORKERS = 4
+DEFAULT_PER_HOST_CONCURRENCY = 3
+DEFAULT_PER_HOST_DELAY = 0.2  # secondes minimum entre deux requêtes sur un même hôte
+
+# Modes de crawl: "fast" s'arrête dès que le top-k ne peut plus être battu
+MODE_FAST = "fast"
+MODE_EXHAUSTIVE = "exhaustive"
+
+
+class HostLimiter:
+    """Limite le nombre de requêtes simultanées et leur cadence par hôte"""
+
+    def __init__(self, concurrency: int = DEFAULT_PER_HOST_CONCURRENCY, delay: float = DEFAULT_PER_HOST_DELAY):
+        self.concurrency = max(1, concurrency)
+        self.delay = max(0.0, delay)
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._next_slot: Dict[str, float] = {}
+        self._lock = asyncio.Lock()
+
+    async def _wait_turn(self, host: str):
+        async with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, 0.0))
+            self._next_slot[host] = slot + self.delay
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    def slot(self, url: str):
+        host = urllib.parse.urlsplit(url).netloc.lower()
+        sem = self._semaphores.setdefault(host, asyncio.Semaphore(self.concurrency))
+        limiter = self
+
+        class _Slot:
+            async def __aenter__(self):
+                await sem.acquire()
+                try:
+                    await limiter._wait_turn(host)
+                except BaseException:
+                    sem.release()
+                    raise
+
+            async def __aexit__(self, *exc):
+                sem.release()
+
+        return _Slot()
+
+
+class Frontier:
+    """
+    Frontière FIFO partagée entre les workers (parcours en largeur).
+    Chaque lien porte une estimation optionnelle du score de sa page
+    (None = inconnue, par exemple pour les points d'entrée).
+    """
+
+    def __init__(self, seeds: Iterable[Tuple[str, int]] = ()):
+        self._queue = deque((url, depth, None) for url, depth in seeds)
+
+    def push(self, url: str, depth: int, estimate: Optional[float] = None):
+        self._queue.append((url, depth, estimate))
+
+    def pop(self) -> Tuple[str, int]:
+        url, depth, _ = self._queue.popleft()
+        return url, depth
+
+    def best_estimate(self, seen=()) -> float:
+        """Meilleur score encore atteignable parmi les liens non visités"""
+        best = float("-inf")
+        for url, _, estimate in self._queue:
+            if url in seen:
+                continue
+            if estimate is None:
+                return float("inf")
+            best = max(best, estimate)
+        return best
+
+    def __len__(self):
+        return len(self._queue)
+
+
+# priority(url, depth, estimate) -> plus grand = visité plus tôt
+PriorityFn = Callable[[str, int, Optional[float]], float]
+
+# Pénalité de priorité par niveau de profondeur (échelle des scores 0-112)
+DEFAULT_DEPTH_PENALTY = 5.0
+
+
+def default_priority(url: str, depth: int, estimate: Optional[float]) -> float:
+    if estimate is None:
+        return float("inf")
+    return estimate - DEFAULT_DEPTH_PENALTY * depth
+
+
+class PriorityFrontier(Frontier):
+    """
+    Frontière « meilleur d'abord »: tas trié sur priority(url, depth,
+    estimate), FIFO entre priorités égales. Les liens sans estimation
+    (points d'entrée) passent en premier. Un second tas, trié sur
+    l'estimation seule (la priorité y ajoute des pénalités), donne
+    best_estimate() sans parcourir la frontière.
+    """
+
+    def __init__(self, priority: PriorityFn = default_priority, seeds: Iterable[Tuple[str, int]] = ()):
+        self.priority = priority
+        self._heap = []
+        self._by_estimate = []
+        self._live = set()
+        self._order = itertools.count()
+        for url, depth in seeds:
+            self.push(url, depth)
+
+    def push(self, url: str, depth: int, estimate: Optional[float] = None):
+        order = next(self._order)
+        heapq.heappush(self._heap, (-self.priority(url, depth, estimate), order, url, depth, estimate))
+        # Estimation inconnue en tête: elle peut tout battre
+        heapq.heappush(self._by_estimate, (float("-inf") if estimate is None else -estimate, order, url))
+        self._live.add(order)
+
+    def pop(self) -> Tuple[str, int]:
+        _, order, url, depth, _ = heapq.heappop(self._heap)
+        self._live.discard(order)
+        return url, depth
+
+    def best_estimate(self, seen=()) -> float:
+        """
+        Sommet du tas des estimations, en O(log n) amorti: les liens déjà
+        sortis ou déjà vus y sont retirés au passage (`seen` ne fait que
+        grossir pendant un crawl).
+        """
+        heap = self._by_estimate
+        while heap:
+            key, order, url = heap[0]
+            if order in self._live and url not in seen:
+                return float("inf") if key == float("-inf") else -key
+            heapq.heappop(heap)
+        return float("-inf")
+
+    def __len__(self):
+        return len(self._heap)
+
+
+class TopKStop:
+    """
+    Arrêt anticipé guidé par le classement: le top-k est rempli de résultats
+    sûrs (score ≥ min_score) et aucun lien de la frontière n'a une estimation
+    capable de dépasser le k-ième. Toujours faux en mode exhaustif.
+    """
+
+    def __init__(self, k: int, min_score: float, mode: str = MODE_FAST):
+        self.k = max(1, k)
+        self.min_score = min_score
+        self.mode = mode
+        self._best: Dict[str, float] = {}
+
+    def offer(self, key: str, score: float):
+        """Enregistre un résultat (clé = titre normalisé, pour ignorer les doublons)"""
+        if score > self._best.get(key, float("-inf")):
+            self._best[key] = score
+
+    def kth_score(self) -> Optional[float]:
+        if len(self._best) < self.k:
+            return None
+        return sorted(self._best.values(), reverse=True)[self.k - 1]
+
+    def __call__(self, frontier: Frontier, seen=()) -> bool:
+        if self.mode != MODE_FAST:
+            return False
+        kth = self.kth_score()
+        if kth is None or kth < self.min_score:
+            return False
+        return frontier.best_estimate(seen) <= kth
+
+
+# visit(page, url, depth) -> liste des liens sortants (None si la page a échoué);
+# un lien est une URL ou un tuple (url, score estimé de la page cible)
+VisitFn = Callable[[object, str, int], Awaitable[Optional[List]]]
+
+
+class CrawlEngine:
+    """
+    Crawl concurrent à budget fixe.
+
+    Sémantique identique à l'ancien crawl séquentiel: au plus `max_pages`
+    URLs réclamées (dédupliquées par l'appelant via normalize_url), liens
+    suivis tant que la profondeur est < `max_depth`. `should_stop(frontier,
+    seen)` permet un arrêt anticipé avant chaque nouvelle page;
+    `on_page(engine)` est attendu après chaque page visitée (progression).
+    """
+
+    def __init__(
+        self,
+        visit: VisitFn,
+        *,
+        max_pages: int,
+        max_depth: int,
+        accept: Optional[Callable[[str], bool]] = None,
+        workers: int = DEFAULT_WORKERS,
+        limiter: Optional[HostLimiter] = None,
+        frontier: Optional[Frontier] = None,
+        should_stop: Optional[Callable[[Frontier, set], bool]] = None,
+        on_page: Optional[Callable[["CrawlEngine"], Awaitable]] = None,
+    ):
+        self.visit = visit
+        self.max_pages = max_pages
+        self.max_depth = max_depth
+        self.accept = accept or (lambda url: True)
+        self.workers = max(1, workers)
+        self.limiter = limiter or HostLimiter()
+        self.frontier = frontier if frontier is not None else Frontier()
+        self.should_stop = should_stop
+        self.on_page = on_page
+        self.seen = set()
+        self.pages_fetched = 0
+        self.stopped_early = False
+        self._active = 0
+        self._cond: Optional[asyncio.Condition] = None
+        self._stopped = False
+
+    def add_seeds(self, urls: Iterable, depth: int = 0):
+        """URL seules ou couples (url, estimation), comme les liens de visit()"""
+        for link in urls:
+            url, estimate = link if isinstance(link, tuple) else (link, None)
+            self.frontier.push(url, depth, estimate)
+
+    def stop(self):
+        """Demande l'arrêt: les workers finissent leur page en cours puis sortent"""
+        self._stopped = True
+
+    def _budget_left(self) -> bool:
+        if self._stopped or len(self.seen) >= self.max_pages:
+            return False
+        if self.should_stop and self.should_stop(self.frontier, self.seen):
+            self.stopped_early = True
+            self._stopped = True
+            return False
+        return True
+
+    @property
+    def pages_saved(self) -> int:
+        """Pages du budget non visitées grâce à l'arrêt anticipé"""
+        return max(0, self.max_pages - self.pages_fetched) if self.stopped_early else 0
+
+    async def _next_url(self) -> Optional[Tuple[str, int]]:
+        async with self._cond:
+            while True:
+                if not self._budget_left():
+                    return None
+                while len(self.frontier):
+                    url, depth = self.frontier.pop()
+                    if not url or url in self.seen:
+                        continue
+                    self.seen.add(url)
+                    if not self.accept(url):
+                        if not self._budget_left():
+                            return None
+                        continue
+                    self._active += 1
+                    return url, depth
+                if self._active == 0:
+                    return None
+                # Frontière vide mais d'autres onglets peuvent encore y ajouter des liens
+                await self._cond.wait()
+
+    async def _done(self, links: Optional[List], depth: int):
+        async with self._cond:
+            self._active -= 1
+            if links and depth < self.max_depth:
+                for link in links:
+                    url, estimate = link if isinstance(link, tuple) else (link, None)
+                    if url and url not in self.seen:
+                        self.frontier.push(url, depth + 1, estimate)
+            self._cond.notify_all()
+
+    async def _worker(self, page):
+        while True:
+            item = await self._next_url()
+            if item is None:
+                async with self._cond:
+                    self._cond.notify_all()
+                return
+            url, depth = item
+            links = None
+            try:
+                async with self.limiter.slot(url):
+                    self.pages_fetched += 1
+                    links = await self.visit(page, url, depth)
+            except Exception:
+                links = None
+            finally:
+                await self._done(links, depth)
+            if self.on_page:
+                try:
+                    await self.on_page(self)
+                except Exception:
+                    pass
+
+    async def run(self, context):
+        """Lance `workers` onglets dans le contexte fourni et attend la fin du crawl"""
+        self._cond = asyncio.Condition()
+        pages = [await context.new_page() for _ in range(self.workers)]
+        try:
+            await asyncio.gather(*(self._worker(p) for p in pages))
+        finally:
+            for p in pages:
+                try:
+                    await p.close()
+                except Exception:
+                    pass
@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+"""
+Déduplication sous-quadratique des résultats (URL normalisée + titre flou).
+
+Même règle que l'ancienne boucle O(n²): un résultat est écarté si son URL
+normalisée a déjà été retenue, ou si son titre a un fuzz.token_set_ratio
+≥ seuil avec un titre retenu. La comparaison floue ne tourne plus que sur
+des candidats issus de trois index:
+
+1. signature exacte (ensemble de mots trié) → doublon direct;
+2. index de préfixe sur les mots les plus rares: token_set_ratio ≥ 95 via
+   l'intersection impose que les deux titres partagent presque tous les mots
+   de l'un d'eux (plus de 90 % de ses caractères), donc au moins un mot de
+   son préfixe rare;
+3. MinHash-LSH sur les trigrammes de caractères pour les titres quasi
+   identiques qui ne partagent aucun mot (casse, ponctuation, coquilles).
+"""
+import zlib
+from collections import Counter, defaultdict
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+from rapidfuzz import fuzz
+
+DEFAULT_TITLE_THRESHOLD = 95
+
+# En dessous, le balayage direct coûte moins que la construction des index
+INDEX_MIN_RESULTS = 200
+
+# MinHash: 64 permutations en 32 bandes de 2 lignes (rappel ≈ 99.9 % dès J = 0.45)
+LSH_BANDS = 32
+LSH_ROWS = 2
+SHINGLE_SIZE = 3
+# Jaccard estimé minimal pour comparer une collision LSH (un ratio ≥ 95 donne J ≳ 0.45)
+LSH_MIN_JACCARD = 0.3
+
+_PRIME = (1 << 31) - 1
+_rng = np.random.default_rng(0x5EED)
+_HASH_A = _rng.integers(1, _PRIME, size=LSH_BANDS * LSH_ROWS, dtype=np.uint64)
+_HASH_B = _rng.integers(0, _PRIME, size=LSH_BANDS * LSH_ROWS, dtype=np.uint64)
+
+
+def prefix_fraction(threshold: float) -> float:
+    """
+    Part maximale de caractères non partagés compatible avec le seuil:
+    1 - d / (2s + d) ≥ r  ⇒  d ≤ 2(1 - r) / (2 - r) · longueur (≈ 0.095 pour 95)
+    """
+    r = threshold / 100.0
+    return 2 * (1 - r) / (2 - r)
+
+
+def title_tokens(title: str) -> frozenset:
+    """Mots tels que les voit token_set_ratio (séparés par des espaces, casse conservée)"""
+    return frozenset((title or "").split())
+
+
+def minhash_signature(text: str) -> np.ndarray:
+    if len(text) <= SHINGLE_SIZE:
+        shingles = {text}
+    else:
+        shingles = {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+    x = np.fromiter((zlib.crc32(s.encode("utf-8")) & 0x7FFFFFFF for s in shingles), dtype=np.uint64)
+    return ((np.outer(x, _HASH_A) + _HASH_B) % _PRIME).min(axis=0)
+
+
+def lsh_bands(signature: np.ndarray) -> List[tuple]:
+    return [
+        (band, signature[band * LSH_ROWS:(band + 1) * LSH_ROWS].tobytes())
+        for band in range(LSH_BANDS)
+    ]
+
+
+class TitleIndex:
+    """Titres retenus, interrogeables par candidats plutôt que par balayage complet"""
+
+    def __init__(self, rarity: Counter, threshold: float = DEFAULT_TITLE_THRESHOLD):
+        self.rarity = rarity
+        self.threshold = threshold
+        self.prefix_fraction = prefix_fraction(threshold)
+        self.titles: List[str] = []
+        self.by_signature: Dict[frozenset, int] = {}
+        self.by_token: Dict[str, List[int]] = defaultdict(list)
+        self.by_prefix: Dict[str, List[int]] = defaultdict(list)
+        self.by_band: Dict[tuple, List[int]] = defaultdict(list)
+        self.signatures = np.zeros((0, LSH_BANDS * LSH_ROWS), dtype=np.uint64)
+        self.comparisons = 0
+        self._last_signature = (None, None)
+
+    def _prefix(self, tokens: frozenset) -> List[str]:
+        """Mots les plus rares couvrant plus de prefix_fraction des caractères"""
+        ordered = sorted(tokens, key=lambda t: (self.rarity[t], t))
+        budget = self.prefix_fraction * sum(len(t) + 1 for t in ordered)
+        prefix, weight = [], 0
+        for tok in ordered:
+            prefix.append(tok)
+            weight += len(tok) + 1
+            if weight > budget:
+                break
+        return prefix
+
+    def _candidates(self, tokens: frozenset, prefix: List[str], signature: np.ndarray) -> List[int]:
+        found = set()
+        # Le nouveau titre partage presque tous ses mots avec un titre retenu
+        for tok in prefix:
+            found.update(self.by_token.get(tok, ()))
+        # Un titre retenu partage presque tous ses mots avec le nouveau
+        for tok in tokens:
+            found.update(self.by_prefix.get(tok, ()))
+        # Quasi-identiques au caractère près: collisions LSH, puis Jaccard estimé
+        near = set()
+        for band in lsh_bands(signature):
+            near.update(self.by_band.get(band, ()))
+        near -= found
+        if near:
+            near = np.fromiter(near, dtype=np.int64, count=len(near))
+            agreement = (self.signatures[near] == signature).mean(axis=1)
+            found.update(near[agreement >= LSH_MIN_JACCARD].tolist())
+        return sorted(found)
+
+    def is_duplicate(self, title: str) -> bool:
+        tokens = title_tokens(title)
+        if not tokens:
+            # token_set_ratio vaut 0 pour un titre vide
+            return False
+        if tokens in self.by_signature:
+            return True
+        signature = self._signature(title, tokens)
+        for idx in self._candidates(tokens, self._prefix(tokens), signature):
+            self.comparisons += 1
+            if fuzz.token_set_ratio(self.titles[idx], title) >= self.threshold:
+                return True
+        return False
+
+    def add(self, title: str):
+        idx = len(self.titles)
+        self.titles.append(title)
+        tokens = title_tokens(title)
+        signature = self._signature(title, tokens)
+        self._store_signature(idx, signature)
+        if not tokens:
+            return
+        self.by_signature.setdefault(tokens, idx)
+        for tok in tokens:
+            self.by_token[tok].append(idx)
+        for tok in self._prefix(tokens):
+            self.by_prefix[tok].append(idx)
+        for band in lsh_bands(signature):
+            self.by_band[band].append(idx)
+
+    def _signature(self, title: str, tokens: frozenset) -> np.ndarray:
+        """MinHash du titre, mémorisée entre is_duplicate() et add()"""
+        if self._last_signature[0] != title:
+            if tokens:
+                signature = minhash_signature(" ".join(sorted(tokens)))
+            else:
+                signature = np.zeros(len(_HASH_A), dtype=np.uint64)
+            self._last_signature = (title, signature)
+        return self._last_signature[1]
+
+    def _store_signature(self, idx: int, signature: np.ndarray):
+        if idx >= len(self.signatures):
+            grown = np.zeros((max(64, 2 * len(self.signatures)), len(signature)), dtype=np.uint64)
+            grown[:len(self.signatures)] = self.signatures
+            self.signatures = grown
+        self.signatures[idx] = signature
+
+
+class LinearTitleIndex:
+    """Comparaison avec tous les titres retenus (petits lots)"""
+
+    def __init__(self, threshold: float = DEFAULT_TITLE_THRESHOLD):
+        self.threshold = threshold
+        self.titles: List[str] = []
+        self.comparisons = 0
+
+    def is_duplicate(self, title: str) -> bool:
+        for kept in self.titles:
+            self.comparisons += 1
+            if fuzz.token_set_ratio(kept, title) >= self.threshold:
+                return True
+        return False
+
+    def add(self, title: str):
+        self.titles.append(title)
+
+
+def dedupe_results(
+    results: List[dict],
+    url_key: Callable[[str], str],
+    title_threshold: float = DEFAULT_TITLE_THRESHOLD,
+    skip_empty_keys: bool = True,
+    stats: Optional[dict] = None,
+) -> List[dict]:
+    """
+    Garde l'ordre d'entrée. Un doublon de titre n'enregistre pas son URL
+    (comme l'ancienne boucle). `stats` reçoit le nombre de comparaisons floues.
+    """
+    if len(results) < INDEX_MIN_RESULTS:
+        index = LinearTitleIndex(title_threshold)
+    else:
+        rarity = Counter(tok for r in results for tok in title_tokens(r["title"]))
+        index = TitleIndex(rarity, title_threshold)
+    seen_urls = set()
+    kept = []
+    for r in results:
+        key = url_key(r["url"])
+        if (skip_empty_keys and not key) or key in seen_urls:
+            continue
+        if index.is_duplicate(r["title"]):
+            continue
+        seen_urls.add(key)
+        index.add(r["title"])
+        kept.append(r)
+    if stats is not None:
+        stats["comparisons"] = index.comparisons
+    return kept
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""
+Extraction DOM en un seul aller-retour page.evaluate.
+
+Au lieu d'un await CDP par lien et par attribut, on récupère en une fois
+titre, h1, meta description et tous les liens (href, text, title, alt, rel).
+Le résultat a la même forme que les snapshots HTTP de fetch_tier.
+"""
+from typing import Dict, List, Optional, Sequence
+
+from .metrics import span
+
+DEFAULT_LINK_SELECTORS = ("a[href]",)
+
+_EXTRACT_JS = """
+({selectors, limit}) => {
+  const clean = (s) => (s || "").replace(/\\s+/g, " ").trim();
+  const out = {title: document.title || "", h1: "", description: "", anchors: []};
+  const h1 = document.querySelector("h1");
+  if (h1) out.h1 = clean(h1.textContent);
+  const meta = document.querySelector("meta[name='description']");
+  if (meta) {
+    out.description = clean(meta.getAttribute("content"));
+  } else {
+    const p = document.querySelector("p");
+    if (p) out.description = clean(p.textContent).slice(0, 300);
+  }
+  for (const sel of selectors) {
+    let nodes;
+    try { nodes = document.querySelectorAll(sel); } catch (e) { continue; }
+    const n = limit ? Math.min(nodes.length, limit) : nodes.length;
+    for (let i = 0; i < n; i++) {
+      const el = nodes[i];
+      out.anchors.push([
+        el.getAttribute("href") || "",
+        clean(el.innerText),
+        el.getAttribute("title") || "",
+        el.getAttribute("alt") || "",
+        el.getAttribute("rel") || "",
+      ]);
+    }
+  }
+  return out;
+}
+"""
+
+_ANCHOR_KEYS = ("href", "text", "title", "alt", "rel")
+
+
+async def extract_dom(
+    page,
+    selectors: Sequence[str] = DEFAULT_LINK_SELECTORS,
+    limit_per_selector: Optional[int] = None,
+) -> Dict:
+    """
+    Retourne {title, h1, description, anchors: [{href, text, title, alt, rel}]}.
+    `limit_per_selector` reproduit le `elements[:N]` des anciennes boucles.
+    """
+    with span("dom_extract"):
+        raw = await page.evaluate(_EXTRACT_JS, {"selectors": list(selectors), "limit": limit_per_selector or 0})
+    anchors: List[Dict] = [dict(zip(_ANCHOR_KEYS, a)) for a in raw.get("anchors", [])]
+    return {
+        "title": (raw.get("title") or "").strip(),
+        "h1": raw.get("h1") or "",
+        "description": raw.get("description") or "",
+        "anchors": anchors,
+    }
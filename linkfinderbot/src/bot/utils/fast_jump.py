@@ -1,5 +1,6 @@
 # fast_jump.py
 import re
+import urllib.parse
 from typing import Optional
 from bs4 import BeautifulSoup
 import requests
@@ -27,33 +28,36 @@ def ddg_first_site(domain: str, query: str, timeout: int = 15) -> Optional[str]:
             print(f"❌ DuckDuckGo erreur: {response.status_code}")
             return None
             
-        soup = BeautifulSoup(response.text, "lxml")
-        
-        # Chercher le premier résultat avec différents sélecteurs
-        selectors = [".result .result__a", ".web-result a", ".results_links a"]
-        
-        for selector in selectors:
-            a = soup.select_one(selector)
-            if a and a.get("href"):
-                href = a.get("href")
-                
-                # Gérer les redirects DuckDuckGo
-                if "duckduckgo.com/l/" in href and "uddg=" in href:
-                    import urllib.parse
-                    parsed = urllib.parse.parse_qs(urllib.parse.urlparse(href).query)
-                    if "uddg" in parsed:
-                        actual_url = urllib.parse.unquote(parsed["uddg"][0])
-                        print(f"✅ URL trouvée: {actual_url}")
-                        return actual_url
-                
-                # Lien direct
-                if domain in href:
-                    print(f"✅ URL trouvée: {href}")
-                    return href
-        
-        print("❌ Aucun résultat trouvé")
-        return None
+        return first_site_result(response.text, domain)
         
     except Exception as e:
         print(f"❌ Erreur DuckDuckGo: {e}")
-        return None
\ No newline at end of file
+        return None
+
+def first_site_result(html: str, domain: str) -> Optional[str]:
+    """Premier résultat DuckDuckGo HTML qui pointe vers `domain` (redirects uddg décodés)"""
+    soup = BeautifulSoup(html, "lxml")
+    
+    # Chercher le premier résultat avec différents sélecteurs
+    selectors = [".result .result__a", ".web-result a", ".results_links a"]
+    
+    for selector in selectors:
+        a = soup.select_one(selector)
+        if a and a.get("href"):
+            href = a.get("href")
+            
+            # Gérer les redirects DuckDuckGo
+            if "duckduckgo.com/l/" in href and "uddg=" in href:
+                parsed = urllib.parse.parse_qs(urllib.parse.urlparse(href).query)
+                if "uddg" in parsed:
+                    actual_url = urllib.parse.unquote(parsed["uddg"][0])
+                    print(f"✅ URL trouvée: {actual_url}")
+                    return actual_url
+            
+            # Lien direct
+            if domain in href:
+                print(f"✅ URL trouvée: {href}")
+                return href
+    
+    print("❌ Aucun résultat trouvé")
+    return None
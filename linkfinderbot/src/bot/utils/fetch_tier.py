@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+"""
+Récupération de pages en deux niveaux:
+  1) HTTP simple (client partagé) + parsing lxml
+  2) Playwright, uniquement si la page a besoin de JavaScript
+
+Chaque page renvoie un "snapshot" compact:
+  {url, final_url, status, title, h1, description,
+   anchors: [{href, text, title, alt, rel}], tier}
+"""
+import re
+import urllib.parse
+from collections import Counter, defaultdict
+from typing import Dict, Optional
+
+import httpx
+import lxml.html
+
+from .dom_extract import extract_dom
+from .http_client import get_http_client
+from .metrics import span
+
+TIER_HTTP = "http"
+TIER_BROWSER = "browser"
+TIER_FAILED = "failed"
+
+# Codes pour lesquels on retente avec un vrai navigateur (anti-bot, erreurs transitoires)
+ESCALATE_STATUSES = {403, 429, 503}
+
+MIN_TEXT_CHARS = 200
+
+# Corps HTML lu au plus (octets décompressés); la suite est ignorée
+MAX_HTML_BYTES = 2 * 1024 * 1024
+
+SPA_SHELL_RE = re.compile(
+    r'<div[^>]+id=["\'](?:root|app|__next|__nuxt|svelte)["\'][^>]*>\s*</div>',
+    re.I,
+)
+NOSCRIPT_JS_RE = re.compile(r"javascript", re.I)
+CHALLENGE_MARKERS = ("just a moment...", "cf-browser-verification", "challenge-platform", "ddos-guard")
+
+
+class TierStats:
+    """Compteurs par domaine du niveau qui a servi chaque page"""
+
+    def __init__(self):
+        self.by_domain: Dict[str, Counter] = defaultdict(Counter)
+
+    def record(self, url: str, tier: str):
+        domain = urllib.parse.urlsplit(url).netloc.lower()
+        self.by_domain[domain][tier] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        return {d: dict(c) for d, c in self.by_domain.items()}
+
+    def summary(self, domain: Optional[str] = None) -> str:
+        domains = [domain.lower()] if domain else sorted(self.by_domain)
+        parts = []
+        for d in domains:
+            c = self.by_domain.get(d, Counter())
+            total = sum(c.values()) or 1
+            parts.append(
+                f"{d}: http={c[TIER_HTTP]} browser={c[TIER_BROWSER]} "
+                f"échecs={c[TIER_FAILED]} ({100 * c[TIER_HTTP] // total}% sans navigateur)"
+            )
+        return " | ".join(parts)
+
+
+# Statistiques globales du process
+tier_stats = TierStats()
+
+
+def _text(el) -> str:
+    try:
+        return " ".join(el.text_content().split())
+    except Exception:
+        return ""
+
+
+def parse_html(html: str, url: str) -> Dict:
+    """Parse du HTML brut en snapshot (même structure que l'extraction navigateur)"""
+    snap = {"url": url, "title": "", "h1": "", "description": "", "anchors": [], "text_chars": 0, "noscript_js": False}
+    if not html or not html.strip():
+        return snap
+    try:
+        tree = lxml.html.fromstring(html)
+    except Exception:
+        return snap
+
+    title_el = tree.find(".//title")
+    if title_el is not None:
+        snap["title"] = _text(title_el)
+    h1 = tree.find(".//h1")
+    if h1 is not None:
+        snap["h1"] = _text(h1)
+
+    metas = tree.xpath("//meta[@name='description']/@content")
+    if metas:
+        snap["description"] = metas[0].strip()
+    else:
+        p = tree.find(".//p")
+        if p is not None:
+            snap["description"] = _text(p)[:300]
+
+    for a in tree.xpath("//a[@href]"):
+        snap["anchors"].append({
+            "href": a.get("href", ""),
+            "text": _text(a),
+            "title": a.get("title", "") or "",
+            "alt": a.get("alt", "") or "",
+            "rel": a.get("rel", "") or "",
+        })
+
+    # Indices pour la détection des pages rendues en JS
+    body_text = tree.xpath("//body//text()[not(ancestor::script) and not(ancestor::style) and not(ancestor::noscript)]")
+    snap["text_chars"] = len(" ".join(" ".join(body_text).split()))
+    snap["noscript_js"] = any(NOSCRIPT_JS_RE.search(_text(n)) for n in tree.xpath("//noscript"))
+    return snap
+
+
+def needs_javascript(html: str, snap: Dict) -> Optional[str]:
+    """Retourne la raison si la page semble rendue côté client, sinon None"""
+    if not html or not html.strip():
+        return "corps vide"
+    low = html[:20000].lower()
+    if any(marker in low for marker in CHALLENGE_MARKERS):
+        return "challenge anti-bot"
+    if SPA_SHELL_RE.search(html):
+        return "shell SPA"
+    if not snap["anchors"]:
+        return "aucun lien"
+    if snap["text_chars"] < MIN_TEXT_CHARS:
+        if snap["noscript_js"]:
+            return "noscript JavaScript requis"
+        return "texte quasi vide"
+    return None
+
+
+async def fetch_http(url: str, timeout_ms: int = 15000) -> Dict:
+    """
+    Niveau 1: GET HTTP. Retourne un snapshot avec en plus:
+      status, tier=http, escalate=<raison ou None>
+    """
+    client = get_http_client()
+    try:
+        with span("http_fetch"):
+            async with client.stream("GET", url, timeout=timeout_ms / 1000) as resp:
+                snap = {"url": url, "status": resp.status_code}
+                if resp.status_code in ESCALATE_STATUSES:
+                    snap["escalate"] = f"HTTP {resp.status_code}"
+                    return snap
+                if resp.status_code < 200 or resp.status_code >= 400:
+                    snap["escalate"] = None
+                    return snap
+                ctype = resp.headers.get("content-type", "")
+                if "html" not in ctype and "xml" not in ctype:
+                    snap["escalate"] = None
+                    snap["non_html"] = True
+                    return snap
+                # Lecture bornée: une page énorme (ou sans fin) ne remplit pas la mémoire
+                body = bytearray()
+                async for chunk in resp.aiter_bytes():
+                    body += chunk
+                    if len(body) >= MAX_HTML_BYTES:
+                        del body[MAX_HTML_BYTES:]
+                        snap["truncated"] = True
+                        break
+    except httpx.HTTPError as e:
+        return {"url": url, "status": 0, "escalate": f"erreur réseau ({type(e).__name__})"}
+
+    html = bytes(body).decode(resp.encoding or "utf-8", errors="replace")
+    with span("html_parse"):
+        snap.update(parse_html(html, url))
+    snap["status"] = resp.status_code
+    snap["final_url"] = str(resp.url)
+    snap["tier"] = TIER_HTTP
+    snap["escalate"] = needs_javascript(html, snap)
+    return snap
+
+
+async def fetch_browser(page, url: str, timeout_ms: int = 15000) -> Optional[Dict]:
+    """Niveau 2: navigation Playwright puis extraction du DOM rendu en un evaluate"""
+    try:
+        with span("goto"):
+            resp = await page.goto(url, wait_until="domcontentloaded", timeout=timeout_ms)
+        if not resp or (resp.status < 200 or resp.status >= 400):
+            return None
+    except Exception:
+        return None
+
+    try:
+        snap = await extract_dom(page)
+    except Exception:
+        snap = {"title": "", "h1": "", "description": "", "anchors": []}
+
+    snap.update({
+        "url": url,
+        "status": resp.status,
+        "final_url": page.url,
+        "tier": TIER_BROWSER,
+    })
+    return snap
+
+
+async def fetch_page(url: str, page=None, timeout_ms: int = 15000, stats: TierStats = tier_stats) -> Optional[Dict]:
+    """
+    HTTP d'abord, Playwright seulement si nécessaire (et si une page est fournie).
+    Retourne None si la page est inaccessible.
+    """
+    snap = await fetch_http(url, timeout_ms)
+    reason = snap.get("escalate")
+    if snap.get("tier") == TIER_HTTP and not reason:
+        stats.record(url, TIER_HTTP)
+        return snap
+    if not reason or page is None:
+        # 404, contenu non HTML... ou pas de navigateur disponible
+        if snap.get("tier") == TIER_HTTP:
+            stats.record(url, TIER_HTTP)
+            return snap
+        stats.record(url, TIER_FAILED)
+        return None
+
+    print(f"🌐 Escalade navigateur ({reason}): {url}")
+    result = await fetch_browser(page, url, timeout_ms)
+    stats.record(url, TIER_BROWSER if result else TIER_FAILED)
+    return result
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+"""
+Client HTTP asynchrone partagé (keep-alive + compression) pour tout le bot.
+"""
+from typing import Optional
+
+import httpx
+
+from .browser_pool import DEFAULT_USER_AGENT
+
+DEFAULT_HEADERS = {
+    "User-Agent": DEFAULT_USER_AGENT,
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "fr-FR,fr;q=0.9,en;q=0.8",
+}
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Retourne le client partagé (créé à la première utilisation)"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            headers=DEFAULT_HEADERS,
+            follow_redirects=True,
+            timeout=httpx.Timeout(15.0, connect=5.0),
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=20, keepalive_expiry=30.0),
+        )
+    return _client
+
+
+async def close_http_client():
+    """Ferme le pool de connexions (arrêt de l'application)"""
+    global _client
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
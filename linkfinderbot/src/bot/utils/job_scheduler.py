@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+"""
+Ordonnanceur de tâches de scraping.
+
+Les handlers Telegram soumettent un job et rendent la main tout de suite.
+File bornée, priorités (/fast avant link avant find), plafond global
+(nombre de workers) et par utilisateur, annulation du job précédent quand
+l'utilisateur envoie une nouvelle commande. La position dans la file et la
+progression sont renvoyées via des callbacks (édition du message de chargement).
+"""
+import asyncio
+import itertools
+from collections import defaultdict
+from typing import Awaitable, Callable, Dict, List, Optional
+
+PRIORITY_FAST = 0
+PRIORITY_LINK = 1
+PRIORITY_FIND = 2
+
+
+class QueueFullError(Exception):
+    """La file d'attente a atteint sa taille maximale"""
+
+
+class Job:
+    """Un travail soumis par un utilisateur"""
+
+    def __init__(
+        self,
+        job_id: int,
+        user_id: Optional[int],
+        priority: int,
+        run: Callable[["Job"], Awaitable],
+        on_position: Optional[Callable[[int], Awaitable]] = None,
+        on_progress: Optional[Callable[[str], Awaitable]] = None,
+        on_cancel: Optional[Callable[[], Awaitable]] = None,
+    ):
+        self.id = job_id
+        self.user_id = user_id
+        self.priority = priority
+        self.run = run
+        self.on_position = on_position
+        self.on_progress = on_progress
+        self.on_cancel = on_cancel
+        self.cancelled = False
+        self.position: Optional[int] = None
+        self.task: Optional[asyncio.Task] = None
+        self.done = asyncio.Event()
+
+    @property
+    def sort_key(self):
+        return (self.priority, self.id)
+
+    async def report(self, text: str):
+        """Progression poussée vers l'utilisateur (jamais bloquante pour le job)"""
+        if self.on_progress and not self.cancelled:
+            try:
+                await self.on_progress(text)
+            except Exception:
+                pass
+
+
+class JobScheduler:
+    def __init__(self, workers: int = 4, per_user: int = 1, max_queue: int = 50, cancel_previous: bool = True):
+        self.configure(workers=workers, per_user=per_user, max_queue=max_queue, cancel_previous=cancel_previous)
+        self._pending: List[Job] = []
+        self._running: Dict[int, Job] = {}
+        self._running_by_user: Dict[Optional[int], int] = defaultdict(int)
+        self._ids = itertools.count(1)
+        self._cond: Optional[asyncio.Condition] = None
+        self._workers: List[asyncio.Task] = []
+
+    def configure(self, workers: Optional[int] = None, per_user: Optional[int] = None,
+                  max_queue: Optional[int] = None, cancel_previous: Optional[bool] = None):
+        if workers is not None:
+            self.workers = max(1, workers)
+        if per_user is not None:
+            self.per_user = max(1, per_user)
+        if max_queue is not None:
+            self.max_queue = max(1, max_queue)
+        if cancel_previous is not None:
+            self.cancel_previous = cancel_previous
+
+    @property
+    def started(self) -> bool:
+        return bool(self._workers)
+
+    async def start(self):
+        if self.started:
+            return
+        self._cond = asyncio.Condition()
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        print(f"🧵 Ordonnanceur démarré ({self.workers} workers, {self.per_user}/utilisateur)")
+
+    async def stop(self):
+        # Les workers annulés annulent eux-mêmes le job en cours
+        for job in self._pending:
+            job.cancelled = True
+        self._pending.clear()
+        for w in self._workers:
+            w.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    # --- soumission / annulation -------------------------------------------
+
+    async def submit(self, user_id: Optional[int], priority: int, run, *,
+                     on_position=None, on_progress=None, on_cancel=None) -> Job:
+        """Met un job en file. Lève QueueFullError si la file est pleine."""
+        if not self.started:
+            await self.start()
+        if self.cancel_previous and user_id is not None:
+            await self.cancel_user(user_id)
+        async with self._cond:
+            if len(self._pending) >= self.max_queue:
+                raise QueueFullError("File d'attente pleine")
+            job = Job(next(self._ids), user_id, priority, run, on_position, on_progress, on_cancel)
+            self._pending.append(job)
+            self._pending.sort(key=lambda j: j.sort_key)
+            self._cond.notify_all()
+        self._announce_positions()
+        return job
+
+    async def cancel_user(self, user_id: int):
+        """Annule les jobs (en file ou en cours) d'un utilisateur"""
+        victims = []
+        async with self._cond:
+            for job in list(self._pending):
+                if job.user_id == user_id:
+                    self._pending.remove(job)
+                    victims.append(job)
+            for job in self._running.values():
+                if job.user_id == user_id:
+                    victims.append(job)
+        for job in victims:
+            await self._cancel(job)
+        if victims:
+            self._announce_positions()
+
+    async def _cancel(self, job: Job):
+        job.cancelled = True
+        if job.task and not job.task.done():
+            job.task.cancel()
+        else:
+            job.done.set()
+        if job.on_cancel:
+            try:
+                await job.on_cancel()
+            except Exception:
+                pass
+
+    def queue_position(self, job: Job) -> Optional[int]:
+        try:
+            return self._pending.index(job) + 1
+        except ValueError:
+            return None
+
+    def _announce_positions(self):
+        """Pousse la nouvelle position aux jobs en attente dont le rang a changé"""
+        idle = self.workers - len(self._running)
+        for pos, job in enumerate(self._pending, 1):
+            if pos <= idle and self._running_by_user.get(job.user_id, 0) < self.per_user:
+                # Sera pris tout de suite par un worker libre
+                continue
+            if job.position != pos and job.on_position:
+                job.position = pos
+                asyncio.create_task(self._safe(job.on_position(pos)))
+
+    @staticmethod
+    async def _safe(coro):
+        try:
+            await coro
+        except Exception:
+            pass
+
+    # --- exécution ------------------------------------------------------------
+
+    def _next_eligible(self) -> Optional[Job]:
+        for job in self._pending:
+            if self._running_by_user.get(job.user_id, 0) < self.per_user:
+                return job
+        return None
+
+    async def _worker(self):
+        while True:
+            async with self._cond:
+                job = self._next_eligible()
+                while job is None:
+                    await self._cond.wait()
+                    job = self._next_eligible()
+                self._pending.remove(job)
+                self._running[job.id] = job
+                self._running_by_user[job.user_id] += 1
+            self._announce_positions()
+
+            job.task = asyncio.create_task(job.run(job))
+            try:
+                await job.task
+            except asyncio.CancelledError:
+                if not job.cancelled:
+                    # Arrêt du worker lui-même
+                    job.task.cancel()
+                    raise
+            except Exception as e:
+                print(f"❌ Job {job.id} en erreur: {e}")
+            finally:
+                job.done.set()
+                async with self._cond:
+                    self._running.pop(job.id, None)
+                    self._running_by_user[job.user_id] -= 1
+                    if self._running_by_user[job.user_id] <= 0:
+                        self._running_by_user.pop(job.user_id, None)
+                    self._cond.notify_all()
+
+
+# Ordonnanceur partagé par les handlers
+job_scheduler = JobScheduler()
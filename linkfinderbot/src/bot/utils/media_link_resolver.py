@@ -1,5 +1,9 @@
 # -*- coding: utf-8 -*-
 from typing import Optional
+from .metrics import set_source, span
+from .result_cache import make_key
+from .sibnet_resolver import format_duration, sibnet_resolver, sibnet_video_id
+from .single_flight import single_flight
 from .sibnet_simple import get_sibnet_share_link, normalize_sibnet_url
 
 # Optionnel: importe ton extractor Anime-Sama si tu l'as gardé
@@ -14,6 +18,40 @@ async def resolve_media_link(
     site_or_url: str,
     keyword: str,
     episode: Optional[int] = None,
+):
+    """
+    Voir _resolve_media_link. Les appels concurrents identiques (site,
+    mot-clé et épisode normalisés) partagent une seule résolution.
+    """
+    return await single_flight.run(
+        make_key("link", site_or_url, keyword, episode),
+        lambda: _resolve_media_link(site_or_url, keyword, episode),
+    )
+
+async def _checked_sibnet(res: dict) -> dict:
+    """
+    Vérifie un résultat Sibnet en HTTP: vidéo morte → résultat vide
+    (jamais mis en cache longtemps), sinon titre et durée réels ajoutés.
+    """
+    info = await sibnet_resolver.resolve(res["link"])
+    if not info or info["available"] is None:
+        return res
+    if not info["available"]:
+        print(f"💀 Vidéo Sibnet indisponible: {res['link']}")
+        return {"source": "sibnet-dead", "link": "", "page": res["page"], "title": "Vidéo Sibnet supprimée ou introuvable"}
+    res = dict(res)
+    if info["title"]:
+        res["title"] = info["title"]
+    if info["duration"]:
+        res["duration"] = format_duration(info["duration"])
+    if info["source"]:
+        res["video"] = info["source"]
+    return res
+
+async def _resolve_media_link(
+    site_or_url: str,
+    keyword: str,
+    episode: Optional[int] = None,
 ):
     """
     Stratégie intelligente mise à jour:
@@ -27,15 +65,17 @@ async def resolve_media_link(
     # A) Utilisateur demande explicitement Sibnet
     if site_or_url.lower() == "sibnet":
         print(f"[DEBUG] Recherche Sibnet explicite pour: {keyword}")
-        sib = get_sibnet_share_link(keyword)
+        set_source("sibnet-search")
+        with span("sibnet_search"):
+            sib = get_sibnet_share_link(keyword)
         print(f"[DEBUG] Résultat Sibnet: {sib}")
         if sib:
-            return {
+            return await _checked_sibnet({
                 "source": "sibnet-search", 
                 "link": sib, 
                 "page": "https://video.sibnet.ru/",
                 "title": f"Trouvé sur Sibnet: {keyword}"
-            }
+            })
         else:
             return {
                 "source": "sibnet-failed",
@@ -51,19 +91,26 @@ async def resolve_media_link(
     if not sib and keyword.startswith("http") and "sibnet" in keyword.lower():
         sib = normalize_sibnet_url(keyword)
     if sib:
-        return {
+        set_source("sibnet-direct")
+        return await _checked_sibnet({
             "source": "sibnet-direct", 
             "link": sib, 
             "page": site_or_url,
             "title": f"Lien Sibnet normalisé"
-        }
+        })
 
     # C) Site spécifique demandé (pas Sibnet) - utiliser precise_playwright_adapter
     if precise_site_search and site_or_url and site_or_url.lower() != "sibnet":
         print(f"[DEBUG] Recherche sur site spécifique: {site_or_url}")
+        set_source("site-search")
         # Aller directement au site demandé sans passer par Sibnet
         try:
-            results = await precise_site_search(site_or_url, keyword, top_k=1)
+            results = await precise_site_search(site_or_url, keyword, top_k=3)
+            # Les vidéos Sibnet mortes sont écartées (vérifiées en un lot)
+            sibnet_links = [r["url"] for r in results if sibnet_video_id(r["url"])]
+            if sibnet_links:
+                infos = await sibnet_resolver.validate_many(sibnet_links)
+                results = [r for r in results if not infos.get(r["url"]) or infos[r["url"]]["available"] is not False]
             if results:
                 best = results[0]
                 return {
@@ -79,15 +126,17 @@ async def resolve_media_link(
     # D) Pas de site spécifique - essayer Sibnet puis fallback générique
     if not site_or_url or site_or_url.lower() == "general":
         print(f"[DEBUG] Recherche générale, tentative Sibnet pour: {keyword}")
-        sib = get_sibnet_share_link(keyword)
+        set_source("sibnet-search")
+        with span("sibnet_search"):
+            sib = get_sibnet_share_link(keyword)
         print(f"[DEBUG] Résultat Sibnet: {sib}")
         if sib:
-            return {
+            return await _checked_sibnet({
                 "source": "sibnet-search", 
                 "link": sib, 
                 "page": "https://video.sibnet.ru/",
                 "title": f"Trouvé sur Sibnet: {keyword}"
-            }
+            })
     
     # Rien trouvé
     return {"source": "none", "link": "", "page": "", "title": ""}
\ No newline at end of file
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""
+Mesure des étapes du bot (recherche DuckDuckGo, navigateur, goto,
+extraction DOM, scoring, dédoublonnage, épisode, lecteurs, réponse
+Telegram…) exportée en histogrammes au format texte Prometheus sur un
+petit endpoint HTTP local (/metrics).
+
+Les étiquettes `command` (fast, link, find…) et `source` (sibnet-search,
+site-search, anime-sama…) suivent la tâche asyncio courante via des
+contextvars: le handler les pose une fois, les utilitaires n'ont qu'à
+ouvrir un `span("étape")`.
+"""
+import asyncio
+import contextvars
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+
+# Bornes des histogrammes (secondes): de l'appel lxml au crawl complet
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 9108
+
+STAGE_METRIC = "linkfinder_stage_duration_seconds"
+ERROR_METRIC = "linkfinder_stage_errors_total"
+LABELS = ("stage", "command", "source")
+
+_command: contextvars.ContextVar = contextvars.ContextVar("metrics_command", default="none")
+_source: contextvars.ContextVar = contextvars.ContextVar("metrics_source", default="none")
+
+
+def set_command(command: str):
+    """Commande en cours (étiquette `command` des étapes de cette tâche)"""
+    _command.set(command)
+
+
+def set_source(source: str):
+    """Source de résultat en cours (étiquette `source`)"""
+    _source.set(source)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}"
+
+
+class _Histogram:
+    """Compteurs cumulables par jeu d'étiquettes"""
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, labels: Tuple[str, ...], value: float):
+        entry = self.series.get(labels)
+        if entry is None:
+            # [compteurs par borne (+Inf en dernier), somme, total]
+            entry = self.series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        entry[0][bisect_left(self.buckets, value)] += 1
+        entry[1] += value
+        entry[2] += 1
+
+    def render(self, name: str):
+        for labels, (counts, total, count) in sorted(self.series.items()):
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound!r}"'
+                yield f"{name}_bucket{_labels(LABELS, labels, le)} {cumulative}"
+            yield f"{name}_sum{_labels(LABELS, labels)} {total}"
+            yield f"{name}_count{_labels(LABELS, labels)} {count}"
+
+
+class Metrics:
+    """Histogrammes des étapes + endpoint HTTP /metrics"""
+
+    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, enabled: bool = True):
+        self.host = host
+        self.port = port
+        self.enabled = enabled
+        self._stages = _Histogram(DEFAULT_BUCKETS)
+        self._errors: Dict[Tuple[str, ...], int] = {}
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    def configure(self, enabled: Optional[bool] = None, host: Optional[str] = None, port: Optional[int] = None):
+        if enabled is not None:
+            self.enabled = enabled
+        if host:
+            self.host = host
+        if port is not None:
+            self.port = port
+
+    def observe(self, stage: str, seconds: float, error: bool = False):
+        labels = (stage, _command.get(), _source.get())
+        self._stages.observe(labels, seconds)
+        if error:
+            self._errors[labels] = self._errors.get(labels, 0) + 1
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {STAGE_METRIC} Durée de chaque étape d'une commande",
+            f"# TYPE {STAGE_METRIC} histogram",
+            *self._stages.render(STAGE_METRIC),
+            f"# HELP {ERROR_METRIC} Étapes terminées par une exception",
+            f"# TYPE {ERROR_METRIC} counter",
+        ]
+        for labels, n in sorted(self._errors.items()):
+            lines.append(f"{ERROR_METRIC}{_labels(LABELS, labels)} {n}")
+        return "\n".join(lines) + "\n"
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request = await asyncio.wait_for(reader.readline(), timeout=5)
+            # En-têtes ignorés, mais lus jusqu'à la ligne vide
+            while (await asyncio.wait_for(reader.readline(), timeout=5)) not in (b"\r\n", b"\n", b""):
+                pass
+            parts = request.decode("latin-1").split()
+            if len(parts) >= 2 and parts[0] == "GET" and parts[1].split("?")[0] == "/metrics":
+                status, body = "200 OK", self.render().encode("utf-8")
+            else:
+                status, body = "404 Not Found", b"not found\n"
+            writer.write(
+                f"HTTP/1.1 {status}\r\n"
+                f"Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: close\r\n\r\n".encode("latin-1") + body
+            )
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self):
+        if not self.enabled or self._server is not None:
+            return
+        try:
+            self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        except OSError as e:
+            print(f"⚠️ Endpoint métriques indisponible ({self.host}:{self.port}): {e}")
+            return
+        print(f"📈 Métriques: http://{self.host}:{self.port}/metrics")
+
+    async def stop(self):
+        if self._server is None:
+            return
+        self._server.close()
+        await self._server.wait_closed()
+        self._server = None
+
+
+# Instance unique partagée par tout le process
+metrics = Metrics()
+
+
+@contextmanager
+def span(stage: str):
+    """
+    Chronomètre le bloc (synchrone ou contenant des await) et l'enregistre
+    sous `stage`, avec la commande et la source de la tâche courante.
+    """
+    start = time.perf_counter()
+    error = False
+    try:
+        yield
+    except BaseException as e:
+        # Une annulation (nouvelle commande, lecteur préféré trouvé) n'est pas une erreur
+        error = not isinstance(e, asyncio.CancelledError)
+        raise
+    finally:
+        metrics.observe(stage, time.perf_counter() - start, error)
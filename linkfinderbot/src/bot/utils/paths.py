@@ -0,0 +1,15 @@
+# -*- coding: utf-8 -*-
+"""
+Emplacements des fichiers persistants du bot (caches, index, registres).
+"""
+import os
+from pathlib import Path
+
+# linkfinderbot/data par défaut, surchargeable via LINKFINDER_DATA_DIR
+DATA_DIR = Path(os.getenv("LINKFINDER_DATA_DIR", Path(__file__).resolve().parents[3] / "data"))
+
+
+def data_path(name: str) -> Path:
+    """Chemin d'un fichier de données (le dossier est créé au besoin)"""
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    return DATA_DIR / name
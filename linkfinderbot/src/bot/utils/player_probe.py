@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+Sondage concurrent des lecteurs vidéo d'un épisode.
+
+Chaque candidat (option de lecteur, URL d'iframe…) est sondé en parallèle;
+le gagnant est choisi selon un ordre de préférence d'hébergeurs (Sibnet
+d'abord par défaut). Dès qu'un sondage renvoie l'hébergeur préféré, les
+sondages restants sont annulés.
+"""
+import asyncio
+from typing import Awaitable, Callable, Iterable, List, Optional, Sequence, Tuple, TypeVar
+
+from .http_client import get_http_client
+from .sibnet_resolver import sibnet_resolver, sibnet_video_id
+
+T = TypeVar("T")
+
+DEFAULT_PREFERENCE = ("sibnet", "sendvid", "vidmoly", "myvi")
+DEFAULT_CONCURRENCY = 4
+
+_preference: Tuple[str, ...] = DEFAULT_PREFERENCE
+_concurrency = DEFAULT_CONCURRENCY
+
+
+def configure_players(preference: Optional[Iterable[str]] = None, concurrency: Optional[int] = None):
+    """Ordre de préférence des hébergeurs et nombre de sondages simultanés"""
+    global _preference, _concurrency
+    if preference:
+        cleaned = tuple(p.strip().lower() for p in preference if p.strip())
+        if cleaned:
+            _preference = cleaned
+    if concurrency is not None:
+        _concurrency = max(1, concurrency)
+
+
+def player_preference() -> Tuple[str, ...]:
+    return _preference
+
+
+def host_rank(url: str, preference: Optional[Sequence[str]] = None) -> Optional[int]:
+    """Rang de l'hébergeur (0 = préféré), len(preference) s'il est inconnu, None sans URL"""
+    if not url:
+        return None
+    preference = preference or _preference
+    low = url.lower()
+    return next((i for i, hint in enumerate(preference) if hint in low), len(preference))
+
+
+def rank_players(options: List[Tuple[str, str]], preference: Optional[Sequence[str]] = None) -> List[Tuple[str, str]]:
+    """(label, URL) triés par préférence d'hébergeur, ordre d'origine à rang égal"""
+    usable = [o for o in options if o[1]]
+    return sorted(usable, key=lambda o: host_rank(o[1], preference))
+
+
+async def first_preferred(
+    candidates: List[T],
+    probe: Callable[[T], Awaitable[str]],
+    preference: Optional[Sequence[str]] = None,
+    concurrency: Optional[int] = None,
+) -> Tuple[Optional[T], str]:
+    """
+    Sonde les candidats en parallèle (`probe` renvoie une URL ou ""),
+    retourne (candidat, URL) du meilleur rang; à rang égal, le premier
+    candidat de la liste. Un résultat de rang 0 annule les sondages restants.
+    """
+    preference = preference or _preference
+    sem = asyncio.Semaphore(concurrency or _concurrency)
+
+    async def run(i: int, candidate: T):
+        async with sem:
+            try:
+                return i, await probe(candidate)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠️ Sondage lecteur échoué: {e}")
+                return i, ""
+
+    tasks = [asyncio.create_task(run(i, c)) for i, c in enumerate(candidates)]
+    best: Optional[Tuple[int, int, str]] = None
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            i, url = await next_done
+            rank = host_rank(url, preference)
+            if rank is None:
+                continue
+            if best is None or (rank, i) < best[:2]:
+                best = (rank, i, url)
+            if rank == 0:
+                break
+    finally:
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    if best is None:
+        return None, ""
+    return candidates[best[1]], best[2]
+
+
+async def check_player_url(url: str, timeout: float = 8) -> str:
+    """
+    L'URL si l'iframe du lecteur répond (statut < 400), sinon une chaîne
+    vide. Une iframe Sibnet répond même pour une vidéo supprimée: c'est la
+    page de la vidéo qui est vérifiée (écartée seulement si Sibnet la dit
+    indisponible).
+    """
+    if sibnet_video_id(url):
+        return url if await sibnet_resolver.is_alive(url, timeout) else ""
+    try:
+        resp = await get_http_client().get(url, timeout=timeout)
+    except Exception:
+        return ""
+    return url if resp.status_code < 400 else ""
@@ -1,12 +1,34 @@
 # -*- coding: utf-8 -*-
 import asyncio
-import re
 import urllib.parse
-from collections import deque
 
-from rapidfuzz import fuzz
-from bs4 import BeautifulSoup
-from playwright.async_api import async_playwright
+from .browser_pool import browser_pool
+from .scoring import (
+    SEARCH_HIT_ESTIMATE,
+    boundary_pattern,
+    link_estimates,
+    page_match_mask,
+    relevance_scores,
+    strong_candidate_mask,
+)
+from .dedupe import dedupe_results
+from .dom_extract import extract_dom
+from .fetch_tier import fetch_page, tier_stats
+from .metrics import span
+from .result_cache import make_key
+from .single_flight import single_flight
+from .sitemap_discovery import sitemap_candidates, slug_label
+from .search_registry import KIND_TEMPLATE, fill_template, search_registry
+from .crawler import (
+    CrawlEngine,
+    HostLimiter,
+    PriorityFrontier,
+    TopKStop,
+    MODE_FAST,
+    DEFAULT_WORKERS,
+    DEFAULT_PER_HOST_CONCURRENCY,
+    DEFAULT_PER_HOST_DELAY,
+)
 
 STOP_PARAMS = {"utm_source","utm_medium","utm_campaign","utm_term","utm_content","gclid","fbclid"}
 
@@ -35,177 +57,254 @@ def same_domain(url: str, base_domain: str) -> bool:
         return False
 
 def word_boundary_present(text: str, phrase: str) -> bool:
-    pattern = r"\b" + re.escape(phrase) + r"\b"
-    return re.search(pattern, text or "", flags=re.IGNORECASE) is not None
+    return boundary_pattern(phrase).search(text or "") is not None
 
 def relevance_score(title: str, snippet: str, url: str, query: str) -> float:
-    t = title or ""
-    s = snippet or ""
-    u = url or ""
-    t_score = fuzz.token_set_ratio(t, query)
-    s_score = fuzz.token_set_ratio(s, query) if s else 0
-    u_score = fuzz.partial_ratio(u, query)
-    bonus = 0
-    if word_boundary_present(t, query): bonus += 8
-    if s and word_boundary_present(s, query): bonus += 4
-    return round(0.6*t_score + 0.3*s_score + 0.1*u_score + bonus, 2)
+    return float(relevance_scores([title], [snippet], [url], query)[0])
 
 def is_strong_candidate(title: str, snippet: str, query: str) -> bool:
-    if not (word_boundary_present(title, query) or word_boundary_present(snippet, query)):
-        return False
-    if fuzz.token_set_ratio(title or "", query) < 85:
-        return False
-    if snippet and fuzz.token_set_ratio(snippet, query) < 70:
-        return False
-    return True
+    return bool(strong_candidate_mask([title], [snippet], query)[0])
 
 def dedupe(results):
-    kept = []
-    seen_urls = set()
-    for r in results:
-        key = normalize_url(r["url"])
-        if not key or key in seen_urls:
-            continue
-        is_dup = False
-        for k in kept:
-            if fuzz.token_set_ratio(k["title"], r["title"]) >= 95:
-                is_dup = True
-                break
-        if is_dup:
-            continue
-        seen_urls.add(key)
-        kept.append(r)
-    return kept
+    with span("dedupe"):
+        return dedupe_results(results, normalize_url)
+
+# Score à partir duquel un résultat compte comme « sûr » pour l'arrêt anticipé
+CONFIDENT_SCORE = 95
+
+# Priorité de la frontière: estimation du lien - profondeur - chemin suspect
+DEPTH_PENALTY = 5.0
+BAD_PATH_PENALTY = 50.0
 
 def looks_bad_path(url: str) -> bool:
     low = url.lower()
     return any(b in low for b in BAD_PATH_HINTS)
 
-async def extract_page_info(page):
-    title = (await page.title()) or ""
-    h1 = ""
-    try:
-        h1_el = page.locator("h1")
-        if await h1_el.count() > 0:
-            h1 = (await h1_el.first.text_content()) or ""
-    except Exception:
-        pass
+def anchor_label(anchor: dict, url: str) -> str:
+    """Texte représentant un lien: texte visible, title/alt, sinon mots du chemin"""
+    label = (anchor.get("text") or anchor.get("title") or anchor.get("alt") or "").strip()
+    if label:
+        return label
+    return slug_label(url)
 
-    desc = ""
-    try:
-        desc = await page.locator("meta[name='description']").get_attribute("content") or ""
-    except Exception:
-        try:
-            html = await page.content()
-            soup = BeautifulSoup(html, "lxml")
-            if soup.find("meta", attrs={"name":"description"}):
-                desc = soup.find("meta", attrs={"name":"description"}).get("content", "")
-            elif soup.find("p"):
-                desc = soup.find("p").get_text(" ", strip=True)[:300]
-        except Exception:
-            desc = ""
-    return title.strip(), h1.strip(), desc.strip()
+def link_priority(url: str, depth: int, estimate) -> float:
+    """Clé du tas de la frontière (plus grand = visité plus tôt)"""
+    if estimate is None:
+        return float("inf")
+    penalty = DEPTH_PENALTY * depth + (BAD_PATH_PENALTY if looks_bad_path(url) else 0.0)
+    return estimate - penalty
+
+async def extract_page_info(page):
+    info = await extract_dom(page, selectors=())
+    return info["title"], info["h1"].strip(), info["description"].strip()
 
 def page_is_relevant(title: str, h1: str, url: str, query: str) -> bool:
-    t = f"{title or ''} {h1 or ''}"
-    if not re.search(r"\b" + re.escape(query) + r"\b", t, flags=re.I):
-        return False
-    if fuzz.token_set_ratio(t, query) < 85:
-        return False
-    if looks_bad_path(url):
-        return False
-    return True
+    return bool(page_match_mask([title], [h1], query)[0]) and not looks_bad_path(url)
+
+def score_pages(pages, query: str):
+    """Filtre et score un lot de pages visitées en un seul passage vectorisé"""
+    if not pages:
+        return []
+    titles = [p["title"] for p in pages]
+    urls = [p["url"] for p in pages]
+    relevant = page_match_mask(titles, [p["h1"] for p in pages], query)
+    scores = relevance_scores(titles, [p["snippet"] for p in pages], urls, query)
+    return [
+        {
+            "title": p["title"] or p["h1"] or p["url"],
+            "url": p["url"],
+            "snippet": p["snippet"],
+            "score": float(score),
+        }
+        for p, ok, score in zip(pages, relevant, scores)
+        if ok and not looks_bad_path(p["url"])
+    ]
+
+def search_entrypoints(base: str, query: str):
+    """{URL de recherche: gabarit}, dans l'ordre du registre (appris d'abord)"""
+    return {
+        normalize_url(fill_template(base, template, query)): template
+        for template in search_registry.search_templates(base)
+    }
 
 def build_entrypoints(base: str, query: str):
     u = urllib.parse.urlsplit(base)
-    base_root = f"{u.scheme}://{u.netloc}"
-    q = urllib.parse.quote_plus(query)
-    candidates = {
-        base_root,
-        f"{base_root}/?s={q}",
-        f"{base_root}/search?q={q}",
-        f"{base_root}/recherche?q={q}",
-        f"{base_root}/search/{q}",
-    }
-    return [normalize_url(x) for x in candidates]
+    base_root = normalize_url(f"{u.scheme}://{u.netloc}")
+    return [base_root] + [url for url in search_entrypoints(base, query) if url != base_root]
+
+def make_visitor(fetch, query: str, base_domain: str, results: list, stopper: TopKStop, search_pages: dict = None):
+    """
+    visit(page, url, depth) du crawl: `fetch(page, url)` renvoie l'instantané
+    de la page; les pages pertinentes vont dans `results`, les liens sortants
+    repartent avec leur estimation d'après le texte d'ancre. `search_pages`
+    ({URL: gabarit}) désigne les pages de recherche dont le résultat est
+    noté dans le registre: réussite si elle ramène un résultat, échec
+    seulement si elle est inaccessible ou sans aucun lien du site (une
+    requête absente du site ne compte pas contre le gabarit).
+    """
+    search_pages = search_pages or {}
+
+    async def visit(page, url, depth):
+        snap = await fetch(page, url)
+        if not snap or snap.get("status", 200) >= 400:
+            if url in search_pages:
+                search_registry.record(base_domain, KIND_TEMPLATE, search_pages[url], False)
+            return None
+
+        base_url = snap.get("final_url") or url
+        labels = {}
+        for a in snap.get("anchors", []):
+            if not a.get("href"):
+                continue
+            abs_url = normalize_url(urllib.parse.urljoin(base_url, a["href"]))
+            if abs_url and same_domain(abs_url, base_domain) and not looks_bad_path(abs_url):
+                if not labels.get(abs_url):
+                    labels[abs_url] = anchor_label(a, abs_url)
+
+        with span("scoring"):
+            relevant = score_pages([{
+                "title": snap.get("title", ""),
+                "h1": snap.get("h1", ""),
+                "snippet": snap.get("description", ""),
+                "url": url,
+            }], query)
+            # Estimation de chaque lien sortant d'après son texte (un seul lot par page)
+            urls = list(labels)
+            estimates = link_estimates([labels[u] for u in urls], urls, query)
+        for r in relevant:
+            results.append(r)
+            stopper.offer(r["title"].lower().strip(), r["score"])
+
+        if url in search_pages:
+            found = bool(relevant) or bool(len(estimates) and estimates.max() >= SEARCH_HIT_ESTIMATE)
+            if found or not labels:
+                search_registry.record(base_domain, KIND_TEMPLATE, search_pages[url], found)
+        return list(zip(urls, estimates.tolist()))
+
+    return visit
 
-async def crawl_site(base: str, query: str, max_pages: int = 40, max_depth: int = 2, timeout_ms: int = 15000):
+async def crawl_site(
+    base: str,
+    query: str,
+    max_pages: int = 40,
+    max_depth: int = 2,
+    timeout_ms: int = 15000,
+    workers: int = DEFAULT_WORKERS,
+    per_host_concurrency: int = DEFAULT_PER_HOST_CONCURRENCY,
+    per_host_delay: float = DEFAULT_PER_HOST_DELAY,
+    top_k: int = 3,
+    mode: str = MODE_FAST,
+    report: dict = None,
+    use_sitemap: bool = True,
+    progress=None,
+):
+    """
+    Crawl « meilleur d'abord » (liens dont l'ancre ressemble à la requête en
+    premier) et classement des pages pertinentes. Les pages du sitemap dont
+    le slug ressemble à la requête amorcent la frontière. En mode "fast", le
+    crawl s'arrête dès que `top_k` résultats sûrs ne peuvent plus être battus
+    par les liens restants; "exhaustive" consomme tout le budget. `report`
+    reçoit pages visitées / économisées; `progress(info)` (async) reçoit
+    l'étape en cours, les pages visitées et les candidats trouvés.
+    """
     base = normalize_url(base)
     if not base:
         raise ValueError("Base URL invalide.")
 
     base_domain = urllib.parse.urlsplit(base).netloc
-    queue = deque([(url, 0) for url in build_entrypoints(base, query)])
-    seen = set()
     results = []
+    stopper = TopKStop(top_k, CONFIDENT_SCORE, mode)
+    search_pages = search_entrypoints(base, query)
 
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        context = await browser.new_context(ignore_https_errors=True)
-        page = await context.new_page()
+    async def fetch(page, url):
+        return await fetch_page(url, page=page, timeout_ms=timeout_ms, stats=tier_stats)
 
-        while queue and len(seen) < max_pages:
-            url, depth = queue.popleft()
-            if not url or url in seen:
-                continue
-            seen.add(url)
-            if not same_domain(url, base_domain):
-                continue
+    async def notify(stage, engine=None):
+        if progress:
+            await progress({
+                "stage": stage,
+                "pages": engine.pages_fetched if engine else 0,
+                "max_pages": max_pages,
+                "candidates": len(results),
+            })
 
-            try:
-                resp = await page.goto(url, wait_until="domcontentloaded", timeout=timeout_ms)
-                if not resp or (resp.status < 200 or resp.status >= 400):
-                    continue
-            except Exception:
-                continue
+    engine = CrawlEngine(
+        make_visitor(fetch, query, base_domain, results, stopper, search_pages),
+        max_pages=max_pages,
+        max_depth=max_depth,
+        accept=lambda url: same_domain(url, base_domain),
+        workers=workers,
+        limiter=HostLimiter(per_host_concurrency, per_host_delay),
+        frontier=PriorityFrontier(link_priority),
+        should_stop=stopper,
+        on_page=lambda engine: notify("crawl", engine),
+    )
+    engine.add_seeds(build_entrypoints(base, query))
+
+    # Découverte par sitemap: pages candidates au niveau 1, à leur estimation
+    sitemap_seeds = []
+    if use_sitemap:
+        await notify("sitemap")
+        try:
+            with span("sitemap"):
+                sitemap_seeds = await sitemap_candidates(
+                    base, query, accept=lambda url: same_domain(url, base_domain) and not looks_bad_path(url)
+                )
+        except Exception as e:
+            print(f"⚠️ Découverte sitemap échouée: {e}")
+        if sitemap_seeds:
+            print(f"🗺️ {len(sitemap_seeds)} pages candidates via sitemap")
+            engine.add_seeds([(normalize_url(url), est) for url, est in sitemap_seeds], depth=1)
 
-            try:
-                anchors = await page.locator("a[href]").all()
-                hrefs = set()
-                for a in anchors:
-                    try:
-                        href = await a.get_attribute("href")
-                        if not href:
-                            continue
-                        abs_url = urllib.parse.urljoin(url, href)
-                        abs_url = normalize_url(abs_url)
-                        if abs_url:
-                            hrefs.add(abs_url)
-                    except Exception:
-                        pass
-            except Exception:
-                hrefs = set()
-
-            try:
-                title, h1, desc = await extract_page_info(page)
-            except Exception:
-                title, h1, desc = "", "", ""
-
-            if page_is_relevant(title, h1, url, query):
-                score = relevance_score(title, desc, url, query)
-                results.append({
-                    "title": title or h1 or url,
-                    "url": url,
-                    "snippet": desc,
-                    "score": score
-                })
-
-            if depth < max_depth:
-                for link in hrefs:
-                    if link not in seen and same_domain(link, base_domain) and not looks_bad_path(link):
-                        queue.append((link, depth + 1))
-
-        await context.close()
-        await browser.close()
+    await notify("crawl", engine)
+    async with browser_pool.context(ignore_https_errors=True) as context:
+        with span("crawl"):
+            await engine.run(context)
+    await notify("rank", engine)
+    print(f"📊 Niveaux de récupération: {tier_stats.summary(base_domain)}")
+    if engine.stopped_early:
+        print(f"⏱️ Arrêt anticipé après {engine.pages_fetched} pages ({engine.pages_saved} économisées)")
+    if report is not None:
+        report.update(
+            mode=mode,
+            pages_fetched=engine.pages_fetched,
+            pages_saved=engine.pages_saved,
+            stopped_early=engine.stopped_early,
+            sitemap_seeds=len(sitemap_seeds),
+        )
 
     results.sort(key=lambda x: x["score"], reverse=True)
     results = dedupe(results)
     return results[:10]
 
-async def precise_site_search(site_or_url: str, query: str, top_k: int = 3):
+async def precise_site_search(
+    site_or_url: str,
+    query: str,
+    top_k: int = 3,
+    workers: int = DEFAULT_WORKERS,
+    mode: str = MODE_FAST,
+    report: dict = None,
+    progress=None,
+):
+    """
+    Recherche précise sur un site. Les appels concurrents identiques (même
+    site, requête, top_k et mode normalisés) partagent un seul crawl; seul
+    le premier appelant reçoit la progression, tous reçoivent `report`.
+    """
     site = site_or_url
     if not site.startswith("http"):
         site = "https://" + site.strip("/")
-    results = await crawl_site(site, query, max_pages=60, max_depth=2)
-    results.sort(key=lambda x: x["score"], reverse=True)
-    return results[:top_k]
\ No newline at end of file
+
+    async def compute():
+        crawl_report = {}
+        results = await crawl_site(
+            site, query, max_pages=60, max_depth=2, workers=workers, top_k=top_k, mode=mode, report=crawl_report,
+            progress=progress,
+        )
+        return results, crawl_report
+
+    results, crawl_report = await single_flight.run(make_key(f"site-search|{mode}|{top_k}", site, query), compute)
+    if report is not None:
+        report.update(crawl_report)
+    results = sorted(results, key=lambda x: x["score"], reverse=True)
+    return results[:top_k]
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""
+Attentes pilotées par des événements au lieu de wait_for_timeout fixes.
+
+Chaque attente s'arrête dès que le signal concret arrive (requête média,
+changement de src d'iframe, sélecteur présent, réseau calme) et au plus
+tard à sa deadline. first_ready() fait la course entre plusieurs signaux.
+"""
+import asyncio
+import time
+from typing import Any, Awaitable, Dict, Iterable, Optional, Tuple
+
+VIDEO_EXTENSIONS = (".mp4", ".m3u8", ".mpd", ".avi", ".mkv", ".webm")
+
+
+def is_media_url(url: str, extensions: Iterable[str] = VIDEO_EXTENSIONS) -> bool:
+    low = (url or "").lower()
+    return any(ext in low for ext in extensions)
+
+
+class NetworkWatcher:
+    """Compte les requêtes en vol (hors flux média qui ne se terminent jamais)"""
+
+    def __init__(self, page):
+        self.page = page
+        self.inflight = set()
+        self.last_activity = time.monotonic()
+        page.on("request", self._on_start)
+        page.on("requestfinished", self._on_end)
+        page.on("requestfailed", self._on_end)
+
+    def _on_start(self, request):
+        if is_media_url(request.url):
+            return
+        self.inflight.add(request)
+        self.last_activity = time.monotonic()
+
+    def _on_end(self, request):
+        self.inflight.discard(request)
+        self.last_activity = time.monotonic()
+
+    async def wait_quiet(self, quiet_ms: int = 500, timeout_ms: int = 5000) -> bool:
+        """True dès que le réseau est calme depuis quiet_ms, False à la deadline"""
+        deadline = time.monotonic() + timeout_ms / 1000
+        quiet = quiet_ms / 1000
+        while True:
+            now = time.monotonic()
+            if not self.inflight and now - self.last_activity >= quiet:
+                return True
+            if now >= deadline:
+                return False
+            await asyncio.sleep(min(0.05, max(0.0, deadline - now)))
+
+    def close(self):
+        for event, cb in (("request", self._on_start), ("requestfinished", self._on_end), ("requestfailed", self._on_end)):
+            try:
+                self.page.remove_listener(event, cb)
+            except Exception:
+                pass
+
+
+async def wait_for_selector(page, selector: str, timeout_ms: int) -> bool:
+    """True si le sélecteur apparaît (attaché au DOM) avant la deadline"""
+    try:
+        await page.wait_for_selector(selector, state="attached", timeout=timeout_ms)
+        return True
+    except Exception:
+        return False
+
+
+async def current_iframe_src(page, selector: str = "iframe") -> str:
+    try:
+        return await page.evaluate(
+            "(sel) => { const f = document.querySelector(sel); return f ? (f.getAttribute('src') || '') : ''; }",
+            selector,
+        )
+    except Exception:
+        return ""
+
+
+async def wait_for_iframe_src_change(page, previous: str, timeout_ms: int, selector: str = "iframe") -> Optional[str]:
+    """Nouveau src de l'iframe dès qu'il diffère de `previous`, None à la deadline"""
+    try:
+        handle = await page.wait_for_function(
+            """([sel, prev]) => {
+                for (const f of document.querySelectorAll(sel)) {
+                    const src = f.getAttribute('src') || '';
+                    if (src && src !== prev) return src;
+                }
+                return null;
+            }""",
+            arg=[selector, previous or ""],
+            timeout=timeout_ms,
+        )
+        return await handle.json_value()
+    except Exception:
+        return None
+
+
+async def first_ready(waiters: Dict[str, Awaitable], timeout_ms: int) -> Tuple[Optional[str], Any]:
+    """
+    Lance les attentes en parallèle et renvoie (nom, valeur) de la première
+    qui aboutit avec une valeur non vide. (None, None) si aucune avant la deadline.
+    """
+    tasks = {asyncio.ensure_future(w): name for name, w in waiters.items()}
+    deadline = time.monotonic() + timeout_ms / 1000
+    try:
+        while tasks:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            done, _ = await asyncio.wait(tasks, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                break
+            for task in done:
+                name = tasks.pop(task)
+                if task.cancelled() or task.exception() is not None:
+                    continue
+                value = task.result()
+                if value:
+                    return name, value
+        return None, None
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+Profils de blocage de requêtes pour les contextes de scraping.
+
+On coupe images, polices, CSS (et médias pour le crawl) ainsi que les hôtes
+pub/trackers. Le profil "stream" laisse passer iframes et médias dont
+extract_stream_links_from_page a besoin pour observer les flux vidéo.
+"""
+import urllib.parse
+from collections import Counter
+from typing import Dict, Iterable, Optional
+
+# Profils: types de ressources Playwright à couper + blocklist de domaines
+BLOCK_PROFILES: Dict[str, Dict] = {
+    "crawl": {
+        "resource_types": {"image", "font", "stylesheet", "media", "texttrack", "manifest"},
+        "block_domains": True,
+    },
+    "stream": {
+        "resource_types": {"image", "font", "stylesheet"},
+        "block_domains": True,
+    },
+    "none": {
+        "resource_types": set(),
+        "block_domains": False,
+    },
+}
+
+AD_TRACKER_DOMAINS = {
+    "doubleclick.net", "googlesyndication.com", "googleadservices.com",
+    "google-analytics.com", "googletagmanager.com", "googletagservices.com",
+    "adservice.google.com", "facebook.net", "connect.facebook.net",
+    "scorecardresearch.com", "quantserve.com", "criteo.com", "criteo.net",
+    "taboola.com", "outbrain.com", "adnxs.com", "amazon-adsystem.com",
+    "hotjar.com", "yandex.ru/metrika", "mc.yandex.ru", "top-fwz1.mail.ru",
+    "popads.net", "propellerads.com", "exoclick.com", "juicyads.com",
+    "adsterra.com", "hilltopads.net", "onclickads.net",
+}
+
+# Tailles moyennes (octets) utilisées pour estimer ce qui n'a pas été téléchargé
+ESTIMATED_BYTES = {
+    "image": 45_000,
+    "font": 35_000,
+    "stylesheet": 25_000,
+    "media": 400_000,
+    "texttrack": 5_000,
+    "manifest": 2_000,
+    "script": 30_000,
+    "tracker": 30_000,
+    "document": 20_000,
+    "other": 10_000,
+}
+
+_enabled = True
+
+
+def configure_blocking(enabled: Optional[bool] = None, extra_block_domains: Iterable[str] = ()):
+    """Active/désactive le blocage et ajoute des domaines à la blocklist"""
+    global _enabled
+    if enabled is not None:
+        _enabled = enabled
+    for d in extra_block_domains:
+        d = d.strip().lower()
+        if d:
+            AD_TRACKER_DOMAINS.add(d)
+
+
+def is_blocked_host(url: str) -> bool:
+    parts = urllib.parse.urlsplit(url)
+    host = parts.netloc.lower().split(":")[0]
+    for d in AD_TRACKER_DOMAINS:
+        if "/" in d:
+            if f"{host}{parts.path}".startswith(d):
+                return True
+        elif host == d or host.endswith("." + d):
+            return True
+    return False
+
+
+class BlockStats:
+    """Requêtes coupées et octets économisés (estimés) pour une requête utilisateur"""
+
+    def __init__(self, profile: str):
+        self.profile = profile
+        self.blocked = Counter()
+        self.allowed = 0
+
+    @property
+    def bytes_saved(self) -> int:
+        return sum(ESTIMATED_BYTES.get(t, ESTIMATED_BYTES["other"]) * n for t, n in self.blocked.items())
+
+    def summary(self) -> str:
+        total = sum(self.blocked.values())
+        detail = ", ".join(f"{t}={n}" for t, n in self.blocked.most_common())
+        return (f"profil {self.profile}: {total} requêtes bloquées ({detail or 'aucune'}), "
+                f"~{self.bytes_saved // 1024} Ko économisés, {self.allowed} autorisées")
+
+
+async def apply_blocking(context, profile: str = "crawl") -> Optional[BlockStats]:
+    """Installe le routage du profil sur le contexte et retourne ses compteurs"""
+    if not _enabled or profile not in BLOCK_PROFILES or profile == "none":
+        return None
+    conf = BLOCK_PROFILES[profile]
+    stats = BlockStats(profile)
+
+    async def handler(route):
+        request = route.request
+        rtype = request.resource_type
+        if rtype in conf["resource_types"]:
+            stats.blocked[rtype] += 1
+            await route.abort()
+            return
+        if conf["block_domains"] and is_blocked_host(request.url):
+            stats.blocked["tracker" if rtype in ("script", "xhr", "fetch", "ping") else rtype] += 1
+            await route.abort()
+            return
+        stats.allowed += 1
+        await route.continue_()
+
+    await context.route("**/*", handler)
+    return stats
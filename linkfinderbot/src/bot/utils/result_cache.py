@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+"""
+Cache persistant requête → résultat pour les commandes find / link / fast.
+
+Front mémoire LRU, back SQLite, TTL par source (court pour les résultats
+négatifs, long pour les liens Sibnet résolus) et stale-while-revalidate:
+une entrée expirée mais encore dans la fenêtre de grâce est servie tout de
+suite pendant qu'un rafraîchissement tourne en tâche de fond.
+"""
+import asyncio
+import json
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from .paths import data_path
+from .single_flight import SingleFlight
+
+# Durées de vie (secondes) par source de résultat
+TTL_BY_SOURCE = {
+    "negative": 10 * 60,
+    "sibnet-direct": 30 * 24 * 3600,
+    "sibnet-share": 7 * 24 * 3600,
+    "sibnet-search": 7 * 24 * 3600,
+    "anime-sama": 24 * 3600,
+    "site-search": 6 * 3600,
+    "default": 3600,
+}
+
+# Fenêtre pendant laquelle une entrée expirée peut encore être servie (stale)
+DEFAULT_STALE_WINDOW = 24 * 3600
+
+STATUS_FRESH = "fresh"
+STATUS_STALE = "stale"
+STATUS_MISS = "miss"
+
+
+def _norm(text: Any) -> str:
+    text = unicodedata.normalize("NFKD", str(text or "")).encode("ascii", "ignore").decode()
+    return re.sub(r"\s+", " ", text.lower()).strip()
+
+
+def normalize_site(site: str) -> str:
+    site = _norm(site)
+    site = re.sub(r"^https?://", "", site)
+    site = re.sub(r"^www\.", "", site)
+    return site.rstrip("/")
+
+
+def make_key(command: str, site: str, query: str, episode: Optional[int] = None) -> str:
+    """Clé normalisée (commande, site, requête, épisode)"""
+    return "|".join([_norm(command), normalize_site(site), _norm(query), str(episode or "")])
+
+
+class ResultCache:
+    """LRU mémoire devant une table SQLite"""
+
+    def __init__(self, path=None, memory_entries: int = 512, stale_window: float = DEFAULT_STALE_WINDOW):
+        self._path = path
+        self.memory_entries = memory_entries
+        self.stale_window = stale_window
+        self._memory: "OrderedDict[str, Tuple[Any, float, float]]" = OrderedDict()
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self._refreshing: Dict[str, asyncio.Task] = {}
+        # Calculs en cours: une même clé manquante n'est calculée qu'une fois
+        self._flights = SingleFlight()
+
+    def configure(self, path=None, memory_entries: Optional[int] = None, stale_window: Optional[float] = None):
+        if path is not None and str(path) != str(self._path):
+            self.close()
+            self._path = path
+        if memory_entries is not None:
+            self.memory_entries = memory_entries
+        if stale_window is not None:
+            self.stale_window = stale_window
+
+    # --- SQLite -----------------------------------------------------------
+
+    def _conn(self) -> sqlite3.Connection:
+        if self._db is None:
+            path = self._path or data_path("result_cache.sqlite3")
+            self._db = sqlite3.connect(str(path), check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+                " stored_at REAL NOT NULL, ttl REAL NOT NULL)"
+            )
+            self._db.commit()
+        return self._db
+
+    def _db_get(self, key: str) -> Optional[Tuple[Any, float, float]]:
+        with self._db_lock:
+            row = self._conn().execute(
+                "SELECT value, stored_at, ttl FROM results WHERE key = ?", (key,)
+            ).fetchone()
+        if not row:
+            return None
+        return json.loads(row[0]), row[1], row[2]
+
+    def _db_put(self, key: str, value: Any, stored_at: float, ttl: float):
+        with self._db_lock:
+            conn = self._conn()
+            conn.execute(
+                "INSERT OR REPLACE INTO results (key, value, stored_at, ttl) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), stored_at, ttl),
+            )
+            # Purge des entrées mortes (au-delà de la fenêtre stale)
+            conn.execute("DELETE FROM results WHERE stored_at + ttl + ? < ?", (self.stale_window, stored_at))
+            conn.commit()
+
+    def close(self):
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    # --- API ----------------------------------------------------------------
+
+    def _remember(self, key: str, entry: Tuple[Any, float, float]):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    async def lookup(self, key: str) -> Tuple[str, Any]:
+        """Retourne (statut, valeur) avec statut fresh / stale / miss"""
+        entry = self._memory.get(key)
+        if entry is None:
+            entry = await asyncio.to_thread(self._db_get, key)
+            if entry is None:
+                return STATUS_MISS, None
+            self._remember(key, entry)
+        else:
+            self._memory.move_to_end(key)
+        value, stored_at, ttl = entry
+        age = time.time() - stored_at
+        if age <= ttl:
+            return STATUS_FRESH, value
+        if age <= ttl + self.stale_window:
+            return STATUS_STALE, value
+        return STATUS_MISS, None
+
+    async def store(self, key: str, value: Any, ttl: float):
+        entry = (value, time.time(), float(ttl))
+        self._remember(key, entry)
+        try:
+            await asyncio.to_thread(self._db_put, key, value, entry[1], entry[2])
+        except Exception as e:
+            print(f"⚠️ Cache SQLite indisponible: {e}")
+
+    def _refresh_in_background(self, key: str, compute: Callable[[], Awaitable[Any]], ttl_for: Callable[[Any], float]):
+        if key in self._refreshing:
+            return
+
+        async def refresh():
+            try:
+                value = await compute()
+                await self.store(key, value, ttl_for(value))
+            except Exception as e:
+                print(f"⚠️ Rafraîchissement cache échoué ({key}): {e}")
+            finally:
+                self._refreshing.pop(key, None)
+
+        self._refreshing[key] = asyncio.create_task(refresh())
+
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        ttl_for: Callable[[Any], float],
+        refresh: Optional[Callable[[], Awaitable[Any]]] = None,
+    ) -> Tuple[Any, str]:
+        """
+        Valeur depuis le cache si possible, sinon calculée et stockée.
+        Une valeur stale est servie immédiatement et recalculée en fond
+        (via `refresh`, par défaut `compute`). Les appels concurrents sur
+        une même clé absente partagent un seul calcul. Retourne (valeur, statut).
+        """
+        status, value = await self.lookup(key)
+        if status == STATUS_FRESH:
+            return value, status
+        if status == STATUS_STALE:
+            self._refresh_in_background(key, refresh or compute, ttl_for)
+            return value, status
+
+        async def compute_and_store():
+            value = await compute()
+            await self.store(key, value, ttl_for(value))
+            return value
+
+        return await self._flights.run(key, compute_and_store), STATUS_MISS
+
+
+def ttl_for_source(source: Optional[str], negative: bool = False) -> float:
+    if negative:
+        return TTL_BY_SOURCE["negative"]
+    return TTL_BY_SOURCE.get(source or "default", TTL_BY_SOURCE["default"])
+
+
+# Instance partagée par les handlers
+result_cache = ResultCache()
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+Scoring vectorisé des candidats (titres, snippets, URLs) contre une requête.
+
+Toutes les composantes d'un lot sont calculées en une fois avec
+rapidfuzz.process.cdist (multi-thread sur les gros lots) et combinées avec
+NumPy. Mêmes formules que les anciennes fonctions unitaires; les versions
+unitaires restent disponibles comme simples enveloppes d'un lot de taille 1.
+"""
+import re
+from functools import lru_cache
+from typing import Sequence
+
+import numpy as np
+from rapidfuzz import fuzz, process
+
+# En dessous de cette taille, le pool de threads de cdist coûte plus qu'il ne rapporte
+PARALLEL_MIN_BATCH = 256
+
+_PUNCT_RE = re.compile(r"[^\w\s]")
+_SPACES_RE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=256)
+def boundary_pattern(phrase: str) -> "re.Pattern":
+    """Regex « mot entier » compilée une seule fois par requête"""
+    return re.compile(r"\b" + re.escape(phrase) + r"\b", re.IGNORECASE)
+
+
+def _texts(values: Sequence) -> list:
+    return [v or "" for v in values]
+
+
+def _workers(n: int, workers: int) -> int:
+    return workers if n >= PARALLEL_MIN_BATCH else 1
+
+
+def fuzz_column(scorer, texts: Sequence[str], query: str, workers: int = -1) -> np.ndarray:
+    """Score de chaque texte contre la requête (tableau float64 de 0 à 100)"""
+    texts = _texts(texts)
+    if not texts:
+        return np.zeros(0)
+    return process.cdist(
+        texts, [query], scorer=scorer, dtype=np.float64, workers=_workers(len(texts), workers)
+    )[:, 0]
+
+
+def boundary_mask(texts: Sequence[str], phrase: str) -> np.ndarray:
+    """True là où la requête apparaît en mots entiers"""
+    search = boundary_pattern(phrase).search
+    return np.fromiter((search(t) is not None for t in _texts(texts)), dtype=bool, count=len(texts))
+
+
+def nonempty_mask(texts: Sequence[str]) -> np.ndarray:
+    return np.fromiter((bool(t) for t in texts), dtype=bool, count=len(texts))
+
+
+# --- Candidats de recherche (titre / snippet / URL) -------------------------
+
+def relevance_scores(titles, snippets, urls, query: str, workers: int = -1) -> np.ndarray:
+    """0.6·titre + 0.3·snippet + 0.1·URL (+8/+4 si mot entier), arrondi à 2 décimales"""
+    has_snippet = nonempty_mask(snippets)
+    t_score = fuzz_column(fuzz.token_set_ratio, titles, query, workers)
+    s_score = np.where(has_snippet, fuzz_column(fuzz.token_set_ratio, snippets, query, workers), 0.0)
+    u_score = fuzz_column(fuzz.partial_ratio, urls, query, workers)
+    bonus = 8.0 * boundary_mask(titles, query) + 4.0 * (has_snippet & boundary_mask(snippets, query))
+    return np.round(0.6 * t_score + 0.3 * s_score + 0.1 * u_score + bonus, 2)
+
+
+def strong_candidate_mask(titles, snippets, query: str, workers: int = -1) -> np.ndarray:
+    """Mot entier dans titre ou snippet, titre ≥ 85, snippet (s'il existe) ≥ 70"""
+    has_snippet = nonempty_mask(snippets)
+    present = boundary_mask(titles, query) | boundary_mask(snippets, query)
+    t_ok = fuzz_column(fuzz.token_set_ratio, titles, query, workers) >= 85
+    s_ok = ~has_snippet | (fuzz_column(fuzz.token_set_ratio, snippets, query, workers) >= 70)
+    return present & t_ok & s_ok
+
+
+def page_match_mask(titles, h1s, query: str, workers: int = -1) -> np.ndarray:
+    """Page dont « titre + h1 » contient la requête en mots entiers et score ≥ 85"""
+    texts = [f"{t or ''} {h or ''}" for t, h in zip(titles, h1s)]
+    return boundary_mask(texts, query) & (fuzz_column(fuzz.token_set_ratio, texts, query, workers) >= 85)
+
+
+# Estimation de lien à partir de laquelle une page de recherche a « trouvé » quelque chose
+SEARCH_HIT_ESTIMATE = 80
+
+
+def link_estimates(labels, urls, query: str, workers: int = -1) -> np.ndarray:
+    """
+    Score estimé d'une page encore non visitée, d'après le texte de son
+    lien: le texte tient lieu de titre et de snippet (même échelle que
+    relevance_scores).
+    """
+    return relevance_scores(labels, labels, urls, query, workers)
+
+
+# --- Similarité mot-clé / titre de lien -------------------------------------
+
+def normalize_text(text: str) -> str:
+    """Minuscules, ponctuation → espaces, espaces compactés"""
+    return _SPACES_RE.sub(" ", _PUNCT_RE.sub(" ", (text or "").lower())).strip()
+
+
+def similarity_scores(keyword: str, titles: Sequence[str], workers: int = -1) -> np.ndarray:
+    """
+    0.6·similarité de caractères + 0.3·Jaccard des mots + 0.1 si le titre
+    commence par le mot-clé. La similarité de caractères est le ratio Indel
+    de rapidfuzz (remplace difflib.SequenceMatcher, écarts de quelques points).
+    """
+    kw = normalize_text(keyword)
+    norm = [normalize_text(t) for t in titles]
+    if not norm:
+        return np.zeros(0)
+    if not kw:
+        return np.zeros(len(norm))
+
+    char_sim = fuzz_column(fuzz.ratio, norm, kw, workers) / 100.0
+    kw_tokens = set(kw.split())
+    token_sim = np.fromiter(
+        (len(kw_tokens & s) / len(kw_tokens | s) if s else 0.0 for s in (set(t.split()) for t in norm)),
+        dtype=np.float64,
+        count=len(norm),
+    )
+    prefix = np.fromiter((t.startswith(kw) for t in norm), dtype=bool, count=len(norm))
+    scores = 0.6 * char_sim + 0.3 * token_sim + 0.1 * prefix
+    return np.where(nonempty_mask(norm), scores, 0.0)
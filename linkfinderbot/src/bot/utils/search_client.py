@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+Client moteur de recherche asynchrone (DuckDuckGo HTML).
+
+Remplace les requests.get bloquants appelés depuis les handlers: pool de
+connexions partagé, limite de concurrence par hôte, retries avec backoff
+à jitter et cache des réponses. Expose la version async de ddg_first_site
+(repli DuckDuckGo de /fast et de l'extracteur anime-sama).
+"""
+import asyncio
+import random
+import time
+import urllib.parse
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import httpx
+
+from .fast_jump import first_site_result
+from .http_client import get_http_client
+from .metrics import span
+
+DDG_HTML_URL = "https://duckduckgo.com/html/"
+
+# Statuts qui valent un nouvel essai (202 = page "anomaly"/rate-limit de DuckDuckGo)
+RETRY_STATUSES = {202, 429, 500, 502, 503, 504}
+
+
+class SearchClient:
+    """GET avec limite par hôte, retries jitterés et cache TTL des réponses 200"""
+
+    def __init__(
+        self,
+        per_host_limit: int = 2,
+        retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+        cache_ttl: float = 15 * 60,
+        cache_entries: int = 256,
+    ):
+        self.per_host_limit = per_host_limit
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.cache_ttl = cache_ttl
+        self.cache_entries = cache_entries
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+        self._cache: "OrderedDict[Tuple, Tuple[float, str]]" = OrderedDict()
+
+    def _semaphore(self, url: str) -> asyncio.Semaphore:
+        host = urllib.parse.urlsplit(url).netloc.lower()
+        if host not in self._host_limits:
+            self._host_limits[host] = asyncio.Semaphore(self.per_host_limit)
+        return self._host_limits[host]
+
+    def _backoff(self, attempt: int) -> float:
+        # "Full jitter": aléatoire entre 0 et le plafond exponentiel
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _cache_get(self, key) -> Optional[str]:
+        entry = self._cache.get(key)
+        if not entry:
+            return None
+        expires, text = entry
+        if expires < time.monotonic():
+            self._cache.pop(key, None)
+            return None
+        self._cache.move_to_end(key)
+        return text
+
+    def _cache_put(self, key, text: str):
+        self._cache[key] = (time.monotonic() + self.cache_ttl, text)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_entries:
+            self._cache.popitem(last=False)
+
+    async def get_text(self, url: str, params: Optional[Dict] = None, timeout: float = 15) -> Optional[str]:
+        """Corps de la réponse 200, None après épuisement des essais"""
+        key = (url, tuple(sorted((params or {}).items())))
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+
+        client = get_http_client()
+        for attempt in range(self.retries + 1):
+            status = None
+            try:
+                async with self._semaphore(url):
+                    resp = await client.get(url, params=params, timeout=timeout)
+                status = resp.status_code
+                if status == 200:
+                    self._cache_put(key, resp.text)
+                    return resp.text
+                if status not in RETRY_STATUSES:
+                    print(f"❌ Moteur de recherche: HTTP {status}")
+                    return None
+            except httpx.HTTPError as e:
+                print(f"⚠️ Moteur de recherche: {type(e).__name__} (essai {attempt + 1})")
+            if attempt < self.retries:
+                delay = self._backoff(attempt)
+                print(f"🔁 Nouvel essai dans {delay:.1f}s (statut {status})")
+                await asyncio.sleep(delay)
+        return None
+
+    async def ddg_html(self, query: str, timeout: float = 15, **params) -> Optional[str]:
+        with span("ddg_lookup"):
+            return await self.get_text(DDG_HTML_URL, params={"q": query, **params}, timeout=timeout)
+
+
+# Client partagé par tout le bot
+search_client = SearchClient()
+
+
+async def ddg_first_site(domain: str, query: str, timeout: int = 15) -> Optional[str]:
+    """Version async de fast_jump.ddg_first_site"""
+    q = f'site:{domain} {query}'
+    print(f"🦆 DuckDuckGo: {q}")
+    html = await search_client.ddg_html(q, timeout=timeout)
+    if html is None:
+        return None
+    return first_site_result(html, domain)
+
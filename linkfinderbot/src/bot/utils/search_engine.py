@@ -1,8 +1,11 @@
-from rapidfuzz import fuzz
 import re
 import urllib.parse
 import requests
 
+from .dedupe import dedupe_results
+from .metrics import span
+from .scoring import boundary_pattern, relevance_scores, strong_candidate_mask
+
 STOP_PARAMS = {"utm_source", "utm_medium", "utm_campaign", "utm_term", "utm_content", "gclid", "fbclid"}
 
 def normalize_url(url: str) -> str:
@@ -17,52 +20,26 @@ def normalize_url(url: str) -> str:
         return url.lower().rstrip("/")
 
 def word_boundary_present(text: str, phrase: str) -> bool:
-    pattern = r"\b" + re.escape(phrase) + r"\b"
-    return re.search(pattern, text, flags=re.IGNORECASE) is not None
+    return boundary_pattern(phrase).search(text or "") is not None
 
 def relevance_score(title: str, snippet: str, url: str, query: str) -> float:
-    t = title or ""
-    s = snippet or ""
-    u = url or ""
-    t_score = fuzz.token_set_ratio(t, query)
-    s_score = fuzz.token_set_ratio(s, query)
-    u_score = fuzz.partial_ratio(u, query)
-    bonus = 0
-    if word_boundary_present(t, query): bonus += 8
-    if word_boundary_present(s, query): bonus += 4
-    return round(0.6 * t_score + 0.3 * s_score + 0.1 * u_score + bonus, 2)
+    return float(relevance_scores([title], [snippet], [url], query)[0])
 
 def is_strong_candidate(title: str, snippet: str, url: str, query: str) -> bool:
-    if not (word_boundary_present(title, query) or word_boundary_present(snippet, query)):
-        return False
-    if fuzz.token_set_ratio(title, query) < 85:
-        return False
-    if snippet and fuzz.token_set_ratio(snippet, query) < 70:
-        return False
-    return True
+    return bool(strong_candidate_mask([title], [snippet], query)[0])
 
 def dedupe(results):
-    seen_urls = set()
-    kept = []
-    for r in results:
-        key = normalize_url(r["url"])
-        if key in seen_urls:
-            continue
-        duplicate = False
-        for k in kept:
-            if fuzz.token_set_ratio(k["title"], r["title"]) >= 95:
-                duplicate = True
-                break
-        if duplicate:
-            continue
-        seen_urls.add(key)
-        kept.append(r)
-    return kept
+    with span("dedupe"):
+        return dedupe_results(results, normalize_url, skip_empty_keys=False)
 
 def fetch_candidates_duckduckgo(query: str, lang: str = "fr"):
     url = "https://duckduckgo.com/html/"
     params = {"q": query, "kl": f"{lang}-{lang.upper()}"}
     html = requests.get(url, params=params, timeout=15).text
+    return parse_duckduckgo_candidates(html)
+
+def parse_duckduckgo_candidates(html: str):
+    """Résultats (titre, url, snippet) d'une page DuckDuckGo HTML"""
     out = []
     for res in re.findall(r'<a class="result__a" href="(.*?)">(.*?)</a>', html):
         title = res[1]
@@ -72,15 +49,28 @@ def fetch_candidates_duckduckgo(query: str, lang: str = "fr"):
         out.append({"title": title, "url": link, "snippet": snippet})
     return out
 
-def precise_search(user_query: str, site: str = None, k: int = 3, lang: str = "fr"):
+def build_precise_query(user_query: str, site: str = None) -> str:
     base_q = f'"{user_query}"'
-    q = f'site:{site} {base_q}' if site else base_q
-    cands = fetch_candidates_duckduckgo(q, lang=lang)
+    return f'site:{site} {base_q}' if site else base_q
+
+def rank_candidates(cands, user_query: str, k: int = 3):
+    """Filtre les candidats forts, les score, trie et déduplique"""
+    if not cands:
+        return []
+    titles = [c["title"] for c in cands]
+    snippets = [c["snippet"] for c in cands]
+    with span("scoring"):
+        strong = strong_candidate_mask(titles, snippets, user_query)
+        scores = relevance_scores(titles, snippets, [c["url"] for c in cands], user_query)
     filtered = []
-    for c in cands:
-        if is_strong_candidate(c["title"], c["snippet"], c["url"], user_query):
-            c["score"] = relevance_score(c["title"], c["snippet"], c["url"], user_query)
+    for c, ok, score in zip(cands, strong, scores):
+        if ok:
+            c["score"] = float(score)
             filtered.append(c)
     filtered.sort(key=lambda x: x["score"], reverse=True)
     filtered = dedupe(filtered)
-    return filtered[:k]
\ No newline at end of file
+    return filtered[:k]
+
+def precise_search(user_query: str, site: str = None, k: int = 3, lang: str = "fr"):
+    cands = fetch_candidates_duckduckgo(build_precise_query(user_query, site), lang=lang)
+    return rank_candidates(cands, user_query, k)
\ No newline at end of file
@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+"""
+Registre persistant, par domaine, des points d'entrée de recherche qui
+marchent: gabarits d'URL de recherche (crawl_site) et sélecteurs du champ
+de recherche (find_links_on_page).
+
+Une entrée qui a ramené des résultats est essayée en premier la fois
+suivante; après MAX_FAILURES échecs consécutifs elle est mise de côté
+(DEAD_TTL) puis retentée avec un compteur d'échecs remis à zéro, et une
+réussite trop ancienne (ENTRY_TTL) ne compte plus. Le registre est un
+petit fichier JSON dans le dossier de données, réécrit au plus une fois
+par SAVE_DELAY dans un thread; SEEDED_ENTRIES fournit les entrées connues
+d'avance.
+"""
+import asyncio
+import json
+import os
+import threading
+import time
+import urllib.parse
+from typing import Dict, List, Optional
+
+from .paths import data_path
+
+KIND_TEMPLATE = "templates"
+KIND_SELECTOR = "selectors"
+
+# Gabarits essayés quand le domaine n'a rien d'appris ({q} = requête encodée)
+DEFAULT_SEARCH_TEMPLATES = [
+    "/?s={q}",
+    "/search?q={q}",
+    "/recherche?q={q}",
+    "/search/{q}",
+]
+
+# Entrées connues d'avance (comptent comme une réussite à la première lecture)
+SEEDED_ENTRIES = {
+    "anime-sama.fr": {
+        KIND_TEMPLATE: ["/catalogue/?search={q}"],
+        KIND_SELECTOR: ["#search-anime"],
+    },
+    "video.sibnet.ru": {
+        KIND_TEMPLATE: ["/search.php?text={q}"],
+        KIND_SELECTOR: ["input[name='text']"],
+    },
+}
+
+MAX_FAILURES = 3
+ENTRY_TTL = 30 * 24 * 3600
+DEAD_TTL = 7 * 24 * 3600
+# Écritures regroupées (secondes)
+SAVE_DELAY = 2.0
+
+
+def domain_key(site: str) -> str:
+    """Hôte en minuscules sans www (accepte une URL ou un domaine nu)"""
+    site = (site or "").strip().lower()
+    if "://" not in site:
+        site = "http://" + site
+    host = urllib.parse.urlsplit(site).netloc
+    return host[4:] if host.startswith("www.") else host
+
+
+def fill_template(base: str, template: str, query: str) -> str:
+    """URL absolue d'un gabarit pour la racine `base`"""
+    u = urllib.parse.urlsplit(base)
+    return f"{u.scheme}://{u.netloc}" + template.replace("{q}", urllib.parse.quote_plus(query))
+
+
+class SearchRegistry:
+    """Statistiques de réussite par (domaine, type, entrée), persistées en JSON"""
+
+    def __init__(self, path=None, seeds: Optional[dict] = None):
+        self._path = path
+        self.seeds = SEEDED_ENTRIES if seeds is None else seeds
+        self._data: Optional[Dict[str, dict]] = None
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._save_handle: Optional[asyncio.TimerHandle] = None
+
+    def configure(self, path=None):
+        if path is not None and str(path) != str(self._path):
+            self.close()
+            self._path = path
+            self._data = None
+
+    # --- Fichier ------------------------------------------------------------
+
+    def _file(self):
+        return self._path or data_path("search_registry.json")
+
+    def _load(self) -> Dict[str, dict]:
+        if self._data is None:
+            try:
+                with open(self._file(), encoding="utf-8") as f:
+                    self._data = json.load(f)
+            except FileNotFoundError:
+                self._data = {}
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Registre de recherche illisible, on repart de zéro: {e}")
+                self._data = {}
+        return self._data
+
+    def _save(self):
+        """
+        Marque le registre modifié. Dans la boucle asyncio, l'écriture part
+        dans un thread après SAVE_DELAY (une seule pour toute une rafale);
+        hors boucle (scripts), elle est immédiate.
+        """
+        self._dirty = True
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush()
+            return
+        if self._save_handle is None:
+            self._save_handle = loop.call_later(SAVE_DELAY, self._flush_in_thread)
+
+    def _flush_in_thread(self):
+        self._save_handle = None
+        asyncio.ensure_future(asyncio.to_thread(self.flush))
+
+    def flush(self):
+        """Écrit le fichier s'il y a des changements en attente"""
+        with self._lock:
+            if not self._dirty or self._data is None:
+                return
+            payload = json.dumps(self._data, ensure_ascii=False, indent=1)
+            self._dirty = False
+        path = str(self._file())
+        tmp = path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(payload)
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"⚠️ Registre de recherche non sauvegardé: {e}")
+
+    def close(self):
+        """Écrit tout de suite ce qui attendait (arrêt de l'application)"""
+        if self._save_handle is not None:
+            self._save_handle.cancel()
+            self._save_handle = None
+        self.flush()
+
+    def _entries(self, domain: str, kind: str) -> Dict[str, dict]:
+        """Entrées d'un domaine, complétées par les graines encore inconnues"""
+        entries = self._load().setdefault(domain, {}).setdefault(kind, {})
+        for value in self.seeds.get(domain, {}).get(kind, ()):
+            entries.setdefault(value, {"ok": 1, "fails": 0, "last_ok": time.time(), "last_try": 0})
+        return entries
+
+    def _classify(self, site: str, kind: str):
+        """
+        (connues, à retenter, écartées). Une entrée écartée depuis plus de
+        DEAD_TTL revient à retenter, avec ses échecs remis à zéro.
+        """
+        now = time.time()
+        with self._lock:
+            entries = self._entries(domain_key(site), kind)
+            known, retry, dead = [], [], set()
+            revived = False
+            for value, e in entries.items():
+                if e["fails"] >= MAX_FAILURES:
+                    if now - e["last_try"] < DEAD_TTL:
+                        dead.add(value)
+                        continue
+                    e["fails"] = 0
+                    e["retry"] = True
+                    revived = True
+                if e["ok"] and now - e["last_ok"] < ENTRY_TTL:
+                    known.append(value)
+                elif e.get("retry"):
+                    retry.append(value)
+            known.sort(key=lambda v: (-entries[v]["ok"], -entries[v]["last_ok"]))
+            retry.sort(key=lambda v: entries[v]["fails"])
+        if revived:
+            self._save()
+        return known, retry, dead
+
+    # --- API ----------------------------------------------------------------
+
+    def ordered(self, site: str, kind: str, defaults: List[str]) -> List[str]:
+        """
+        Entrées à essayer, dans l'ordre: celles qui ont marché (les plus
+        fiables d'abord), celles revenues de DEAD_TTL, puis les valeurs par
+        défaut pas encore écartées.
+        """
+        known, retry, dead = self._classify(site, kind)
+        candidates = known + retry
+        return candidates + [d for d in defaults if d not in dead and d not in candidates]
+
+    def known(self, site: str, kind: str) -> List[str]:
+        """Seulement les entrées qui ont déjà marché (sans valeurs par défaut)"""
+        return self._classify(site, kind)[0]
+
+    def record(self, site: str, kind: str, value: str, ok: bool):
+        now = time.time()
+        with self._lock:
+            e = self._entries(domain_key(site), kind).setdefault(
+                value, {"ok": 0, "fails": 0, "last_ok": 0, "last_try": 0}
+            )
+            e["last_try"] = now
+            if ok:
+                e["ok"] += 1
+                e["fails"] = 0
+                e["last_ok"] = now
+                e.pop("retry", None)
+            else:
+                e["fails"] += 1
+                if e["fails"] >= MAX_FAILURES:
+                    # Écartée: retentée (sans ses succès passés) après DEAD_TTL
+                    e["ok"] = 0
+        self._save()
+
+    # --- Raccourcis -----------------------------------------------------------
+
+    def search_templates(self, site: str) -> List[str]:
+        """Gabarits appris s'il y en a (pas de devinettes), sinon les gabarits par défaut"""
+        return self.known(site, KIND_TEMPLATE) or self.ordered(site, KIND_TEMPLATE, DEFAULT_SEARCH_TEMPLATES)
+
+    def search_selectors(self, site: str, defaults: List[str]) -> List[str]:
+        return self.ordered(site, KIND_SELECTOR, defaults)
+
+
+# Instance partagée
+search_registry = SearchRegistry()
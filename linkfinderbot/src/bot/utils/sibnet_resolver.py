@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+"""
+Résolution des vidéos Sibnet en HTTP simple (sans navigateur).
+
+À partir d'un lien /videoNNN, shell.php?videoid=NNN ou frame.php?videoid=NNN,
+lit la page de la vidéo: titre, durée, disponibilité (vidéo supprimée,
+bloquée ou introuvable) et source du lecteur (mp4). Les réponses sont
+gardées en cache (plus court pour une vidéo morte, rien pour une erreur
+réseau) et la validation d'un lot d'ID se fait en parallèle, bornée.
+"""
+import asyncio
+import re
+import time
+import urllib.parse
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+
+import lxml.html
+
+from .http_client import get_http_client
+from .single_flight import SingleFlight
+
+SIBNET_BASE = "https://video.sibnet.ru"
+
+_ID_RE = re.compile(r"(?:videoid=|/video)(\d+)", re.IGNORECASE)
+# player.src([{src: "/v/…/123.mp4", type: "video/mp4"}])
+_PLAYER_SRC_RE = re.compile(r"""player\.src\(\s*\[\s*\{\s*src\s*:\s*["']([^"']+)["']""")
+_ISO_DURATION_RE = re.compile(r"^PT(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?$", re.IGNORECASE)
+_TITLE_SUFFIX_RE = re.compile(r"\s*[-–—|]\s*(?:видео\s*)?(?:@\s*)?sibnet.*$", re.IGNORECASE)
+
+# Messages de Sibnet pour une vidéo indisponible
+DEAD_MARKERS = (
+    "видео не найдено",
+    "видеозапись удалена",
+    "видео удалено",
+    "видео заблокировано",
+    "доступ к видео ограничен",
+    "video not found",
+)
+
+DEFAULT_CONCURRENCY = 8
+ALIVE_TTL = 6 * 3600
+DEAD_TTL = 3600
+CACHE_ENTRIES = 2048
+
+
+def sibnet_video_id(url: str) -> Optional[str]:
+    """ID numérique d'un lien Sibnet (partage, shell ou frame), sinon None"""
+    if not url or "sibnet" not in url.lower():
+        return None
+    m = _ID_RE.search(url)
+    return m.group(1) if m else None
+
+
+def share_url(video_id: str) -> str:
+    return f"{SIBNET_BASE}/video{video_id}"
+
+
+def shell_url(video_id: str) -> str:
+    return f"{SIBNET_BASE}/shell.php?videoid={video_id}"
+
+
+def parse_duration(value: str) -> Optional[int]:
+    """Secondes depuis « 1420 », « PT23M40S » ou « 00:23:40 »"""
+    value = (value or "").strip()
+    if not value:
+        return None
+    if value.isdigit():
+        return int(value)
+    m = _ISO_DURATION_RE.match(value)
+    if m and any(m.groups()):
+        h, mnt, s = (int(g or 0) for g in m.groups())
+        return h * 3600 + mnt * 60 + s
+    parts = value.split(":")
+    if 2 <= len(parts) <= 3 and all(p.isdigit() for p in parts):
+        total = 0
+        for p in parts:
+            total = total * 60 + int(p)
+        return total
+    return None
+
+
+def format_duration(seconds: Optional[int]) -> str:
+    """« 23:40 » ou « 1:02:03 », vide si inconnue"""
+    if not seconds:
+        return ""
+    h, rest = divmod(int(seconds), 3600)
+    m, s = divmod(rest, 60)
+    return f"{h}:{m:02d}:{s:02d}" if h else f"{m}:{s:02d}"
+
+
+def parse_video_page(html: str, page_url: str) -> Dict:
+    """{title, duration, source, dead} d'une page vidéo ou shell Sibnet"""
+    info = {"title": "", "duration": None, "source": "", "dead": False}
+    if not html or not html.strip():
+        return info
+    low = html.lower()
+    info["dead"] = any(marker in low for marker in DEAD_MARKERS)
+
+    m = _PLAYER_SRC_RE.search(html)
+    if m:
+        info["source"] = urllib.parse.urljoin(page_url, m.group(1))
+
+    try:
+        tree = lxml.html.fromstring(html)
+    except Exception:
+        return info
+
+    def meta(*names):
+        for name in names:
+            values = tree.xpath(f"//meta[@property='{name}' or @name='{name}' or @itemprop='{name}']/@content")
+            if values and values[0].strip():
+                return values[0].strip()
+        return ""
+
+    title = meta("og:title", "name")
+    if not title:
+        h1 = tree.find(".//h1")
+        title = " ".join(h1.text_content().split()) if h1 is not None else ""
+    if not title:
+        el = tree.find(".//title")
+        title = _TITLE_SUFFIX_RE.sub("", " ".join(el.text_content().split())) if el is not None else ""
+    info["title"] = title
+    info["duration"] = parse_duration(meta("og:video:duration", "video:duration", "duration"))
+    return info
+
+
+class SibnetResolver:
+    """Métadonnées des vidéos Sibnet, avec cache TTL et lots concurrents"""
+
+    def __init__(self, concurrency: int = DEFAULT_CONCURRENCY, alive_ttl: float = ALIVE_TTL, dead_ttl: float = DEAD_TTL):
+        self.alive_ttl = alive_ttl
+        self.dead_ttl = dead_ttl
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._cache: "OrderedDict[str, tuple]" = OrderedDict()
+        self._flights = SingleFlight()
+
+    def configure(self, concurrency: Optional[int] = None):
+        if concurrency is not None:
+            self._semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    def _cache_get(self, video_id: str) -> Optional[Dict]:
+        entry = self._cache.get(video_id)
+        if not entry:
+            return None
+        expires, info = entry
+        if expires < time.monotonic():
+            self._cache.pop(video_id, None)
+            return None
+        self._cache.move_to_end(video_id)
+        return info
+
+    def _cache_put(self, video_id: str, info: Dict):
+        ttl = self.alive_ttl if info["available"] else self.dead_ttl
+        self._cache[video_id] = (time.monotonic() + ttl, info)
+        self._cache.move_to_end(video_id)
+        while len(self._cache) > CACHE_ENTRIES:
+            self._cache.popitem(last=False)
+
+    async def _get(self, url: str, timeout: float):
+        async with self._semaphore:
+            return await get_http_client().get(url, timeout=timeout)
+
+    async def _fetch(self, video_id: str, timeout: float) -> Dict:
+        info = {"id": video_id, "url": share_url(video_id), "title": "", "duration": None, "source": "", "available": None}
+        try:
+            resp = await self._get(share_url(video_id), timeout)
+        except Exception as e:
+            print(f"⚠️ Sibnet video{video_id}: {type(e).__name__}")
+            return info
+        info["status"] = resp.status_code
+        if resp.status_code in (404, 410):
+            info["available"] = False
+            self._cache_put(video_id, info)
+            return info
+        if resp.status_code != 200:
+            # 403/429/5xx: on ne sait pas, rien en cache
+            return info
+
+        page = parse_video_page(resp.text, str(resp.url))
+        if not page["dead"] and not page["source"]:
+            # La source du lecteur n'est parfois que dans le shell
+            try:
+                shell = await self._get(shell_url(video_id), timeout)
+                if shell.status_code == 200:
+                    embedded = parse_video_page(shell.text, str(shell.url))
+                    page["source"] = embedded["source"]
+                    page["dead"] = embedded["dead"]
+            except Exception:
+                pass
+
+        # Ni marqueur de vidéo morte ni titre/source reconnus (balisage changé,
+        # page intermédiaire): on ne sait pas, le lien est gardé et rien en cache
+        if page["dead"]:
+            available = False
+        elif page["title"] or page["source"]:
+            available = True
+        else:
+            available = None
+        info.update(
+            title="" if page["dead"] else page["title"],
+            duration=page["duration"],
+            source=page["source"],
+            available=available,
+        )
+        if available is not None:
+            self._cache_put(video_id, info)
+        return info
+
+    async def resolve(self, url_or_id: str, timeout: float = 10) -> Optional[Dict]:
+        """
+        {id, url, title, duration, source, available} d'une vidéo; `available`
+        vaut None si Sibnet n'a pas répondu ou si la page n'a pas pu être lue.
+        None si ce n'est pas un lien Sibnet.
+        """
+        video_id = url_or_id if str(url_or_id).isdigit() else sibnet_video_id(url_or_id)
+        if not video_id:
+            return None
+        cached = self._cache_get(video_id)
+        if cached is not None:
+            return cached
+        return await self._flights.run(video_id, lambda: self._fetch(video_id, timeout))
+
+    async def validate_many(self, urls: Iterable[str], timeout: float = 10) -> Dict[str, Optional[Dict]]:
+        """{lien: métadonnées} pour un lot de liens, résolus en parallèle"""
+        urls = list(dict.fromkeys(urls))
+        infos = await asyncio.gather(*(self.resolve(u, timeout) for u in urls), return_exceptions=True)
+        return {u: (None if isinstance(i, BaseException) else i) for u, i in zip(urls, infos)}
+
+    async def is_alive(self, url: str, timeout: float = 10) -> bool:
+        """Faux seulement si Sibnet dit la vidéo indisponible (doute = vivante)"""
+        info = await self.resolve(url, timeout)
+        return not info or info["available"] is not False
+
+
+# Instance unique partagée par tout le process
+sibnet_resolver = SibnetResolver()
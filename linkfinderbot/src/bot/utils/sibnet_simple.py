@@ -1,7 +1,8 @@
 # -*- coding: utf-8 -*-
 import re
 import urllib.parse
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeout
+from typing import List, Optional, Tuple
 import requests
 from bs4 import BeautifulSoup
 
@@ -44,83 +45,141 @@ def normalize_sibnet_url(url: str) -> Optional[str]:
     # Cas 3: autre format Sibnet -> renvoyer brut
     return url
 
-def ddg_first_sibnet(query: str, timeout: int = 15) -> Optional[str]:
+def sibnet_results_from_html(html: str, query: str) -> List[Tuple[str, str, int]]:
+    """Liens /videoXXXX d'une page de résultats DuckDuckGo: [(url, titre, pertinence)]"""
+    soup = BeautifulSoup(html, "lxml")
+
+    results_found = []
+
+    # Chercher les résultats avec différents sélecteurs
+    selectors = [".result", ".web-result", ".results_links"]
+
+    for selector in selectors:
+        for res in soup.select(selector):
+            # Chercher le lien principal
+            link_selectors = [".result__a", "h2 a", ".result-link", "a"]
+
+            for link_sel in link_selectors:
+                a = res.select_one(link_sel)
+                if not a:
+                    continue
+
+                href = a.get("href", "")
+                title = a.get_text().strip()
+
+                # Vérifier si c'est un lien Sibnet vidéo (direct ou via redirect DuckDuckGo)
+                actual_url = href
+
+                # Gérer les redirects DuckDuckGo
+                if "duckduckgo.com/l/" in href and "uddg=" in href:
+                    # Extraire l'URL réelle du paramètre uddg
+                    parsed = urllib.parse.parse_qs(urllib.parse.urlparse(href).query)
+                    if "uddg" in parsed:
+                        actual_url = urllib.parse.unquote(parsed["uddg"][0])
+                        print(f"🔗 URL extraite du redirect: {actual_url}")
+
+                if ("video.sibnet.ru" in actual_url or "sibnet" in actual_url) and re.search(r"video\d+", actual_url):
+                    # Prioriser les liens avec des titres pertinents
+                    relevance_score = 0
+                    query_words = query.lower().split()
+
+                    for word in query_words:
+                        if word in title.lower() or word in actual_url.lower():
+                            relevance_score += 1
+
+                    results_found.append((actual_url, title, relevance_score))
+
+    return results_found
+
+def best_sibnet_result(results_found: List[Tuple[str, str, int]]) -> Optional[str]:
+    """Meilleur résultat (pertinence max) normalisé en lien de partage"""
+    # Trier par pertinence et retourner le meilleur
+    if results_found:
+        results_found.sort(key=lambda x: x[2], reverse=True)
+        best_url = results_found[0][0]
+        best_title = results_found[0][1]
+
+        print(f"✅ DDG trouvé: {best_url}")
+        print(f"   Titre: {best_title[:60]}...")
+
+        # Normaliser et retourner
+        normalized = normalize_sibnet_url(best_url)
+        return normalized if normalized else best_url
+
+    return None
+
+# Variantes de requête DuckDuckGo, lancées en parallèle ({query} = requête utilisateur)
+SIBNET_QUERY_VARIANTS = [
+    'site:video.sibnet.ru "{query}"',  # Recherche exacte
+    'site:video.sibnet.ru {query}',     # Recherche normale
+    '{query} site:video.sibnet.ru',     # Ordre différent
+]
+
+def sibnet_query_variants(query: str, templates: Optional[List[str]] = None) -> List[str]:
+    """Variantes de requête DuckDuckGo pour Sibnet"""
+    return [t.format(query=query) for t in (templates or SIBNET_QUERY_VARIANTS)]
+
+def is_confident_sibnet_result(results_found: List[Tuple[str, str, int]], query: str) -> bool:
+    """Un résultat contient-il tous les mots de la requête ? (arrêt anticipé du fan-out)"""
+    needed = len(query.split())
+    return any(score >= needed for _, _, score in results_found)
+
+def merge_sibnet_results(result_lists: List[List[Tuple[str, str, int]]]) -> List[Tuple[str, str, int]]:
+    """
+    Fusionne les résultats de plusieurs variantes: dédupliqués par lien
+    normalisé, classés par pertinence puis par nombre de variantes d'accord.
+    """
+    merged = {}
+    for results_found in result_lists:
+        seen_here = set()
+        for url, title, score in results_found:
+            key = normalize_sibnet_url(url) or url
+            entry = merged.setdefault(key, {"url": url, "title": title, "score": score, "votes": 0, "order": len(merged)})
+            if score > entry["score"]:
+                entry.update(url=url, title=title, score=score)
+            if key not in seen_here:
+                entry["votes"] += 1
+                seen_here.add(key)
+    ranked = sorted(merged.values(), key=lambda e: (-e["score"], -e["votes"], e["order"]))
+    return [(e["url"], e["title"], e["score"]) for e in ranked]
+
+def ddg_first_sibnet(query: str, timeout: int = 15, variants: Optional[List[str]] = None) -> Optional[str]:
     """
     Fait 'site:video.sibnet.ru "query"' sur DuckDuckGo HTML et renvoie le 1er lien
     qui ressemble à /videoXXXX avec titre complet.
+    Les variantes partent en parallèle; dès qu'une donne un résultat sûr les
+    autres sont abandonnées, et tout ce qui est arrivé est classé ensemble.
     """
-    # Essayer plusieurs variantes de recherche pour améliorer les résultats
-    search_queries = [
-        f'site:video.sibnet.ru "{query}"',  # Recherche exacte
-        f'site:video.sibnet.ru {query}',     # Recherche normale
-        f'{query} site:video.sibnet.ru'      # Ordre différent
-    ]
-    
     url = "https://duckduckgo.com/html/"
     
-    for q in search_queries:
+    def run(q):
+        print(f"🦆 DuckDuckGo: {q}")
+        html = requests.get(url, params={"q": q}, headers=HEADERS, timeout=timeout).text
+        return sibnet_results_from_html(html, query)
+    
+    search_queries = sibnet_query_variants(query, variants)
+    collected = []
+    executor = ThreadPoolExecutor(max_workers=len(search_queries))
+    try:
+        futures = [executor.submit(run, q) for q in search_queries]
         try:
-            print(f"🦆 DuckDuckGo: {q}")
-            html = requests.get(url, params={"q": q}, headers=HEADERS, timeout=timeout).text
-            soup = BeautifulSoup(html, "lxml")
-            
-            results_found = []
-            
-            # Chercher les résultats avec différents sélecteurs
-            selectors = [".result", ".web-result", ".results_links"]
-            
-            for selector in selectors:
-                for res in soup.select(selector):
-                    # Chercher le lien principal
-                    link_selectors = [".result__a", "h2 a", ".result-link", "a"]
-                    
-                    for link_sel in link_selectors:
-                        a = res.select_one(link_sel)
-                        if not a:
-                            continue
-                            
-                        href = a.get("href", "")
-                        title = a.get_text().strip()
-                        
-                        # Vérifier si c'est un lien Sibnet vidéo (direct ou via redirect DuckDuckGo)
-                        actual_url = href
-                        
-                        # Gérer les redirects DuckDuckGo
-                        if "duckduckgo.com/l/" in href and "uddg=" in href:
-                            import urllib.parse
-                            # Extraire l'URL réelle du paramètre uddg
-                            parsed = urllib.parse.parse_qs(urllib.parse.urlparse(href).query)
-                            if "uddg" in parsed:
-                                actual_url = urllib.parse.unquote(parsed["uddg"][0])
-                                print(f"🔗 URL extraite du redirect: {actual_url}")
-                        
-                        if ("video.sibnet.ru" in actual_url or "sibnet" in actual_url) and re.search(r"video\d+", actual_url):
-                            # Prioriser les liens avec des titres pertinents
-                            relevance_score = 0
-                            query_words = query.lower().split()
-                            
-                            for word in query_words:
-                                if word in title.lower() or word in actual_url.lower():
-                                    relevance_score += 1
-                            
-                            results_found.append((actual_url, title, relevance_score))
-            
-            # Trier par pertinence et retourner le meilleur
-            if results_found:
-                results_found.sort(key=lambda x: x[2], reverse=True)
-                best_url = results_found[0][0]
-                best_title = results_found[0][1]
-                
-                print(f"✅ DDG trouvé: {best_url}")
-                print(f"   Titre: {best_title[:60]}...")
-                
-                # Normaliser et retourner
-                normalized = normalize_sibnet_url(best_url)
-                return normalized if normalized else best_url
-                
-        except Exception as e:
-            print(f"❌ Erreur DDG: {e}")
-            continue
+            for fut in as_completed(futures, timeout=timeout):
+                try:
+                    results_found = fut.result()
+                except Exception as e:
+                    print(f"❌ Erreur DDG: {e}")
+                    continue
+                collected.append(results_found)
+                if is_confident_sibnet_result(results_found, query):
+                    break
+        except FuturesTimeout:
+            print("⏱️ DDG: délai dépassé, fusion des réponses reçues")
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    
+    best = best_sibnet_result(merge_sibnet_results(collected))
+    if best:
+        return best
     
     print("❌ DDG: aucun résultat trouvé")
     return None
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""
+Coalescence des requêtes identiques (single-flight).
+
+Quand plusieurs utilisateurs lancent la même recherche au même moment
+(nouvel épisode de One Piece…), un seul calcul tourne: les appels suivants
+attendent la tâche en cours et reçoivent le même résultat (ou la même
+exception). Un appelant annulé ne fait que se détacher; la tâche partagée
+n'est annulée que lorsque plus personne ne l'attend.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+
+class _Flight:
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Calculs en cours indexés par clé normalisée"""
+
+    def __init__(self):
+        self._flights: Dict[str, _Flight] = {}
+        self.coalesced = 0
+
+    def in_flight(self, key: str) -> bool:
+        return key in self._flights
+
+    async def run(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """Résultat de `compute()`, partagé avec les appels concurrents de même clé"""
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.create_task(compute()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _t, k=key, f=flight: self._forget(k, f))
+        else:
+            self.coalesced += 1
+            print(f"🔗 Requête identique en cours, résultat partagé ({key})")
+
+        flight.waiters += 1
+        try:
+            # shield: l'annulation d'un appelant ne se propage pas à la tâche partagée
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not flight.task.done():
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+
+    def _forget(self, key: str, flight: _Flight):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        # Évite « Task exception was never retrieved » si tous les appelants sont partis
+        if not flight.task.cancelled():
+            flight.task.exception()
+
+
+# Instance unique partagée par tout le process
+single_flight = SingleFlight()
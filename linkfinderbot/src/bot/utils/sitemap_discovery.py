@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+Découverte par sitemap avant le crawl: robots.txt → directives Sitemap,
+index de sitemaps imbriqués, fichiers .gz. Les sitemaps sont lus en flux
+(XMLPullParser alimenté morceau par morceau, décompression incrémentale)
+sans jamais tenir le fichier entier en mémoire. Les URL d'un domaine sont
+mises en cache (result_cache), puis leurs slugs sont scorés contre la
+requête pour amorcer la frontière du crawl.
+"""
+import re
+import urllib.parse
+import xml.etree.ElementTree as ET
+import zlib
+from typing import List, Tuple
+
+import numpy as np
+
+from .http_client import get_http_client
+from .result_cache import make_key, result_cache, ttl_for_source
+from .scoring import link_estimates
+
+# Bornes (le protocole sitemap plafonne à 50 000 URL / 50 Mo par fichier)
+MAX_SITEMAP_FILES = 20
+MAX_SITEMAP_URLS = 50000
+MAX_SITEMAP_BYTES = 50 * 1024 * 1024
+
+SITEMAP_TTL = 24 * 3600
+FALLBACK_SITEMAPS = ("/sitemap.xml", "/sitemap_index.xml")
+
+# Candidats gardés pour amorcer le crawl
+SITEMAP_SEEDS = 10
+SITEMAP_MIN_ESTIMATE = 70
+
+_GZIP_MAGIC = b"\x1f\x8b"
+_SITEMAP_LINE_RE = re.compile(r"^\s*sitemap\s*:\s*(\S+)", re.IGNORECASE | re.MULTILINE)
+_SLUG_SPLIT_RE = re.compile(r"[/\-_.+]+")
+
+
+def slug_label(url: str) -> str:
+    """Mots du chemin d'une URL (« /anime/one-piece/ » → « anime one piece »)"""
+    path = urllib.parse.unquote(urllib.parse.urlsplit(url).path)
+    return " ".join(w for w in _SLUG_SPLIT_RE.split(path) if w)
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def _root_url(base: str) -> str:
+    u = urllib.parse.urlsplit(base)
+    return f"{u.scheme}://{u.netloc}"
+
+
+async def robots_sitemaps(base: str) -> List[str]:
+    """Sitemaps annoncés dans robots.txt, sinon les emplacements usuels"""
+    root = _root_url(base)
+    try:
+        resp = await get_http_client().get(root + "/robots.txt", timeout=10)
+        found = _SITEMAP_LINE_RE.findall(resp.text) if resp.status_code == 200 else []
+    except Exception as e:
+        print(f"⚠️ robots.txt indisponible ({root}): {type(e).__name__}")
+        found = []
+    return found or [root + path for path in FALLBACK_SITEMAPS]
+
+
+async def stream_sitemap(url: str, pages: List[str], nested: List[str], max_urls: int = MAX_SITEMAP_URLS):
+    """
+    Lit un sitemap (ou un index de sitemaps) en flux: les <loc> d'un
+    <urlset> vont dans `pages`, ceux d'un <sitemapindex> dans `nested`.
+    """
+    parser = ET.XMLPullParser(events=("start", "end"))
+    inflate = None
+    root = None
+    received = 0
+    async with get_http_client().stream("GET", url, timeout=20) as resp:
+        if resp.status_code != 200:
+            return
+        async for chunk in resp.aiter_bytes():
+            if inflate is None:
+                # .gz servi tel quel (pas en Content-Encoding): décompression à la main
+                inflate = zlib.decompressobj(zlib.MAX_WBITS | 32) if chunk[:2] == _GZIP_MAGIC else False
+            data = inflate.decompress(chunk) if inflate else chunk
+            received += len(data)
+            parser.feed(data)
+            for event, elem in parser.read_events():
+                if event == "start":
+                    if root is None:
+                        root = elem
+                    continue
+                tag = _local(elem.tag)
+                if tag == "loc" and elem.text:
+                    target = nested if _local(root.tag) == "sitemapindex" else pages
+                    target.append(elem.text.strip())
+                elif tag in ("url", "sitemap"):
+                    # Rien ne reste accroché à la racine: mémoire constante
+                    root.clear()
+            if len(pages) >= max_urls or received >= MAX_SITEMAP_BYTES:
+                break
+
+
+async def collect_sitemap_urls(base: str) -> List[str]:
+    """Toutes les URL de pages des sitemaps du site (index suivis, bornés)"""
+    queue = await robots_sitemaps(base)
+    seen, pages = set(), []
+    while queue and len(seen) < MAX_SITEMAP_FILES and len(pages) < MAX_SITEMAP_URLS:
+        url = queue.pop(0)
+        if url in seen:
+            continue
+        seen.add(url)
+        nested = []
+        try:
+            await stream_sitemap(url, pages, nested, MAX_SITEMAP_URLS - len(pages))
+        except ET.ParseError as e:
+            print(f"⚠️ Sitemap invalide {url}: {e}")
+        except Exception as e:
+            print(f"⚠️ Sitemap indisponible {url}: {type(e).__name__}")
+        queue.extend(nested)
+    return pages[:MAX_SITEMAP_URLS]
+
+
+async def sitemap_urls(base: str) -> List[str]:
+    """URL du sitemap d'un domaine, via le cache (une lecture par jour au plus)"""
+    key = make_key("sitemap", _root_url(base), "")
+    urls, _ = await result_cache.get_or_compute(
+        key,
+        lambda: collect_sitemap_urls(base),
+        ttl_for=lambda found: SITEMAP_TTL if found else ttl_for_source(None, negative=True),
+    )
+    return urls
+
+
+def rank_sitemap_urls(
+    urls: List[str], query: str, limit: int = SITEMAP_SEEDS, min_estimate: float = SITEMAP_MIN_ESTIMATE
+) -> List[Tuple[str, float]]:
+    """Meilleures URL d'après leur slug, sous forme (url, estimation)"""
+    if not urls:
+        return []
+    # Les slugs sont en minuscules: la requête aussi (le score est sensible à la casse)
+    estimates = link_estimates([slug_label(u).lower() for u in urls], urls, query.lower())
+    top = np.argsort(-estimates, kind="stable")[:limit]
+    return [(urls[i], float(estimates[i])) for i in top if estimates[i] >= min_estimate]
+
+
+async def sitemap_candidates(base: str, query: str, accept=None, limit: int = SITEMAP_SEEDS) -> List[Tuple[str, float]]:
+    """Graines de crawl issues du sitemap (filtrées par `accept` si fourni)"""
+    urls = await sitemap_urls(base)
+    if accept:
+        urls = [u for u in urls if accept(u)]
+    return rank_sitemap_urls(urls, query, limit)
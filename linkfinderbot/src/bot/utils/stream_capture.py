@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+"""
+Capture des flux vidéo d'une page à partir des réponses réseau.
+
+Au lieu de chercher « .mp4 » dans chaque URL de requête, on écoute les
+réponses du contexte (context.on("response"), qui couvre aussi les iframes
+de lecteurs cross-origin chargées hors process) et on classe par type
+MIME: playlist HLS, manifeste DASH, fichier vidéo. Les segments (.ts,
+.m4s) sont ignorés. Une playlist HLS maître est lue pour lister ses
+variantes (débit, résolution), rendues avec le flux par results().
+wait() rend la main dès qu'un flux sûr est vu.
+"""
+import asyncio
+import re
+import urllib.parse
+from typing import Dict, List, Optional
+
+KIND_HLS = "hls"
+KIND_DASH = "dash"
+KIND_VIDEO = "video"
+
+HLS_MIME_TYPES = {"application/vnd.apple.mpegurl", "application/x-mpegurl", "audio/mpegurl", "audio/x-mpegurl"}
+DASH_MIME_TYPES = {"application/dash+xml"}
+# Segments de flux: jamais rendus à l'utilisateur
+SEGMENT_MIME_TYPES = {"video/mp2t", "video/iso.segment", "audio/aac"}
+SEGMENT_EXTENSIONS = (".ts", ".m4s", ".aac")
+
+# Repli sur l'extension quand le serveur envoie un type générique
+GENERIC_MIME_TYPES = {"", "application/octet-stream", "binary/octet-stream", "text/plain"}
+EXTENSION_KINDS = (
+    (".m3u8", KIND_HLS),
+    (".mpd", KIND_DASH),
+    (".mp4", KIND_VIDEO),
+    (".webm", KIND_VIDEO),
+    (".mkv", KIND_VIDEO),
+    (".avi", KIND_VIDEO),
+)
+
+_STREAM_INF_RE = re.compile(r"#EXT-X-STREAM-INF:(.*)", re.IGNORECASE)
+_ATTR_RE = re.compile(r'([A-Z0-9-]+)=("[^"]*"|[^,]*)')
+
+
+def _path(url: str) -> str:
+    return urllib.parse.urlsplit(url).path.lower()
+
+
+def classify_media(url: str, mime_type: str = "") -> Optional[str]:
+    """KIND_HLS / KIND_DASH / KIND_VIDEO, ou None (pas un flux, ou segment)"""
+    mime = (mime_type or "").split(";")[0].strip().lower()
+    path = _path(url)
+    if mime in SEGMENT_MIME_TYPES or path.endswith(SEGMENT_EXTENSIONS):
+        return None
+    if mime in HLS_MIME_TYPES:
+        return KIND_HLS
+    if mime in DASH_MIME_TYPES:
+        return KIND_DASH
+    if mime.startswith("video/"):
+        return KIND_VIDEO
+    if mime in GENERIC_MIME_TYPES:
+        for ext, kind in EXTENSION_KINDS:
+            if path.endswith(ext):
+                return kind
+    return None
+
+
+def parse_hls_variants(text: str, base_url: str) -> List[Dict]:
+    """Variantes d'une playlist maître: [{url, bandwidth, resolution}], meilleur débit d'abord"""
+    variants = []
+    lines = [line.strip() for line in (text or "").splitlines()]
+    for i, line in enumerate(lines):
+        m = _STREAM_INF_RE.match(line)
+        if not m:
+            continue
+        attrs = {k.upper(): v.strip('"') for k, v in _ATTR_RE.findall(m.group(1))}
+        uri = next((l for l in lines[i + 1:] if l and not l.startswith("#")), None)
+        if not uri:
+            continue
+        bandwidth = attrs.get("BANDWIDTH", "")
+        variants.append({
+            "url": urllib.parse.urljoin(base_url, uri),
+            "bandwidth": int(bandwidth) if bandwidth.isdigit() else None,
+            "resolution": attrs.get("RESOLUTION", ""),
+        })
+    variants.sort(key=lambda v: v["bandwidth"] or 0, reverse=True)
+    return variants
+
+
+class StreamCapture:
+    """
+    Flux vus par une page, dédoublonnés par URL dans l'ordre d'arrivée.
+    À créer avant page.goto(); close() détache les écouteurs.
+    """
+
+    def __init__(self, page, follow_manifests: bool = True):
+        self.page = page
+        self.follow_manifests = follow_manifests
+        self.streams: Dict[str, Dict] = {}
+        self._variants = set()
+        self._confident = asyncio.Event()
+        self._context = None
+        self._tasks = set()
+
+    async def start(self):
+        """
+        Écoute au niveau du contexte: une session CDP de la page ne voit pas
+        les iframes hors process (Sibnet, vidmoly, sendvid…).
+        """
+        self._context = self.page.context
+        self._context.on("response", self._on_response)
+        return self
+
+    def _on_response(self, response):
+        try:
+            page = response.frame.page
+        except Exception:
+            # Réponse d'un service worker: pas de frame, on la garde
+            page = self.page
+        if page is not self.page:
+            # Le contexte peut porter d'autres pages (collecte de liens)
+            return
+        try:
+            mime = response.headers.get("content-type", "")
+        except Exception:
+            mime = ""
+        self._record(response.url, mime, response.status)
+
+    def _record(self, url: str, mime_type: str, status: int):
+        if not url or url.startswith(("data:", "blob:")) or url in self.streams or url in self._variants:
+            return
+        if status and status >= 400:
+            return
+        kind = classify_media(url, mime_type)
+        if kind is None:
+            return
+        self.streams[url] = {"url": url, "kind": kind, "mime": (mime_type or "").split(";")[0].strip(), "variants": []}
+        print(f"📡 Flux {kind}: {url}")
+        if kind == KIND_HLS and self.follow_manifests:
+            task = asyncio.ensure_future(self._follow_hls(url))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        else:
+            self._confident.set()
+
+    def add_dom_source(self, url: str):
+        """Source trouvée dans le DOM (video[src], lien .mp4…), classée par extension"""
+        url = urllib.parse.urljoin(self.page.url, url or "")
+        if url.startswith(("http://", "https://")) and url not in self.streams:
+            kind = classify_media(url) or KIND_VIDEO
+            self.streams[url] = {"url": url, "kind": kind, "mime": "", "variants": []}
+
+    async def _follow_hls(self, url: str):
+        """Lit la playlist; une maître fait connaître ses variantes (qui ne sont pas des flux en plus)"""
+        try:
+            resp = await self.page.request.get(url, headers={"Referer": self.page.url}, timeout=5000)
+            text = await resp.text() if resp.ok else ""
+        except Exception:
+            text = ""
+        variants = parse_hls_variants(text, url)
+        entry = self.streams.get(url)
+        if entry is None:
+            # Devenue variante d'une autre maître pendant la lecture
+            self._confident.set()
+            return
+        if variants:
+            entry["variants"] = variants
+            for v in variants:
+                # Les variantes chargées par le lecteur restent rattachées à la maître
+                self._variants.add(v["url"])
+                self.streams.pop(v["url"], None)
+            best = variants[0]
+            print(f"🎚️ {len(variants)} variantes HLS (max {best['resolution'] or '?'} @ {best['bandwidth'] or '?'} b/s)")
+        self._confident.set()
+
+    async def wait(self, timeout_ms: int) -> Optional[str]:
+        """URL du premier flux sûr, ou None à la deadline"""
+        try:
+            await asyncio.wait_for(self._confident.wait(), timeout_ms / 1000)
+        except asyncio.TimeoutError:
+            return None
+        return next(iter(self.streams), None)
+
+    def urls(self) -> List[str]:
+        return list(self.streams)
+
+    def results(self) -> List[Dict]:
+        """Flux {url, kind, mime, variants}; variants d'une maître HLS: [{url, bandwidth, resolution}]"""
+        return [dict(stream) for stream in self.streams.values()]
+
+    async def close(self):
+        for task in list(self._tasks):
+            task.cancel()
+        if self._context is not None:
+            try:
+                self._context.remove_listener("response", self._on_response)
+            except Exception:
+                pass
+            self._context = None
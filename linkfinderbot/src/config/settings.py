@@ -17,6 +17,63 @@ CRAWLER_CONFIG = {
     "headless": True
 }
 
+# Pool de navigateurs partagé (un seul Chromium pour tout le bot)
+BROWSER_POOL_CONFIG = {
+    "headless": True,
+    "max_concurrency": int(os.getenv("BROWSER_MAX_CONCURRENCY", 4)),
+    "max_memory_mb": int(os.getenv("BROWSER_MAX_MEMORY_MB", 1500)),
+}
+
+# Blocage des ressources inutiles (images, polices, CSS, pubs/trackers)
+RESOURCE_BLOCKING_CONFIG = {
+    "enabled": os.getenv("BLOCK_RESOURCES", "True").lower() == "true",
+    "extra_block_domains": [d for d in os.getenv("BLOCK_DOMAINS", "").split(",") if d.strip()],
+}
+
+# Cache des résultats (LRU mémoire + SQLite)
+CACHE_CONFIG = {
+    "path": os.getenv("CACHE_PATH") or None,
+    "memory_entries": int(os.getenv("CACHE_MEMORY_ENTRIES", 512)),
+}
+
+# Registre des URL / champs de recherche appris par domaine (JSON)
+SEARCH_REGISTRY_CONFIG = {
+    "path": os.getenv("SEARCH_REGISTRY_PATH") or None,
+}
+
+# Index local du catalogue anime-sama (rafraîchi en tâche de fond)
+CATALOGUE_CONFIG = {
+    "enabled": os.getenv("CATALOGUE_INDEX", "True").lower() == "true",
+    "interval": float(os.getenv("CATALOGUE_REFRESH_HOURS", 24)) * 3600,
+    "path": os.getenv("CATALOGUE_PATH") or None,
+}
+
+# Lecteurs vidéo: hébergeurs préférés (dans l'ordre) et sondages simultanés
+PLAYER_CONFIG = {
+    "preference": [p for p in os.getenv("PLAYER_PREFERENCE", "sibnet,sendvid,vidmoly,myvi").split(",") if p.strip()],
+    "concurrency": int(os.getenv("PLAYER_PROBE_CONCURRENCY", 4)),
+}
+
+# Éditions du message de statut (Telegram limite les éditions par chat)
+STATUS_EDIT_CONFIG = {
+    "min_interval": float(os.getenv("STATUS_EDIT_INTERVAL", 1.5)),
+}
+
+# Endpoint /metrics (histogrammes des étapes au format Prometheus)
+METRICS_CONFIG = {
+    "enabled": os.getenv("METRICS_ENABLED", "True").lower() == "true",
+    "host": os.getenv("METRICS_HOST", "127.0.0.1"),
+    "port": int(os.getenv("METRICS_PORT", 9108)),
+}
+
+# Ordonnanceur des commandes (workers globaux, plafond par utilisateur, file bornée)
+SCHEDULER_CONFIG = {
+    "workers": int(os.getenv("JOB_WORKERS", 4)),
+    "per_user": int(os.getenv("JOB_PER_USER", 1)),
+    "max_queue": int(os.getenv("JOB_MAX_QUEUE", 50)),
+    "cancel_previous": os.getenv("JOB_CANCEL_PREVIOUS", "True").lower() == "true",
+}
+
 # Configuration de la recherche
 SEARCH_CONFIG = {
     "top_k_results": int(os.getenv("MAX_RESULTS", 3)),
@@ -1,10 +1,20 @@
 import logging
 from telegram.ext import ApplicationBuilder, CommandHandler, MessageHandler, filters
 
-from config.settings import BOT_TOKEN
+from config.settings import BOT_TOKEN, BROWSER_POOL_CONFIG, RESOURCE_BLOCKING_CONFIG, CACHE_CONFIG, SCHEDULER_CONFIG, SEARCH_REGISTRY_CONFIG, CATALOGUE_CONFIG, PLAYER_CONFIG, STATUS_EDIT_CONFIG, METRICS_CONFIG
 from bot.handlers.commands import start_command, help_command, link_command
 from bot.handlers.messages import handle_other_messages
 from bot.handlers.fast import handle_fast_command, handle_fast_message
+from bot.handlers.status_editor import configure_status_edits
+from bot.utils.browser_pool import browser_pool
+from bot.utils.catalogue_index import catalogue_index
+from bot.utils.http_client import close_http_client
+from bot.utils.job_scheduler import job_scheduler
+from bot.utils.metrics import metrics
+from bot.utils.player_probe import configure_players
+from bot.utils.resource_blocking import configure_blocking
+from bot.utils.result_cache import result_cache
+from bot.utils.search_registry import search_registry
 
 # Configuration des logs
 logging.basicConfig(
@@ -13,6 +23,32 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+async def on_startup(app):
+    """Démarre les ressources partagées avant le polling"""
+    configure_blocking(**RESOURCE_BLOCKING_CONFIG)
+    configure_players(**PLAYER_CONFIG)
+    configure_status_edits(**STATUS_EDIT_CONFIG)
+    metrics.configure(**METRICS_CONFIG)
+    await metrics.start()
+    result_cache.configure(**CACHE_CONFIG)
+    search_registry.configure(**SEARCH_REGISTRY_CONFIG)
+    browser_pool.configure(**BROWSER_POOL_CONFIG)
+    await browser_pool.start()
+    job_scheduler.configure(**SCHEDULER_CONFIG)
+    await job_scheduler.start()
+    catalogue_index.configure(**CATALOGUE_CONFIG)
+    await catalogue_index.start()
+
+async def on_shutdown(app):
+    """Libère les ressources partagées à l'arrêt de l'application"""
+    await job_scheduler.stop()
+    await catalogue_index.stop()
+    await browser_pool.stop()
+    await close_http_client()
+    result_cache.close()
+    search_registry.close()
+    await metrics.stop()
+
 def main():
     """Fonction principale du bot"""
     
@@ -22,7 +58,13 @@ def main():
         return
     
     # Créer l'application
-    app = ApplicationBuilder().token(BOT_TOKEN).build()
+    app = (
+        ApplicationBuilder()
+        .token(BOT_TOKEN)
+        .post_init(on_startup)
+        .post_shutdown(on_shutdown)
+        .build()
+    )
     
     # Ajouter les handlers
     app.add_handler(CommandHandler("start", start_command))
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Résolution directe des épisodes anime-sama à partir d'une page saison et
+de son episodes.js enregistrés (anime_sama_saison1.html,
+anime_sama_episodes.js): tableaux par lecteur, numérotation avec films et
+spéciaux, choix du lecteur. Transport httpx simulé, pas de réseau.
+"""
+import asyncio
+import os
+import sys
+
+import httpx
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(HERE, "linkfinderbot", "src"))
+
+from bot.utils import http_client
+from bot.utils.anime_sama_episodes import (
+    episode_index,
+    episode_numbers,
+    episodes_script_url,
+    parse_episode_arrays,
+    players_for_episode,
+    resolve_episode_direct,
+)
+
+PAGE_URL = "https://anime-sama.fr/catalogue/one-piece/saison1/vostfr/"
+
+
+def _fixture(name):
+    with open(os.path.join(HERE, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def test_script_url():
+    html = _fixture("anime_sama_saison1.html")
+    # Le <script> commenté est ignoré, le filever est conservé
+    assert episodes_script_url(html, PAGE_URL) == PAGE_URL + "episodes.js?filever=2174"
+    assert episodes_script_url("", PAGE_URL.rstrip("/")) == PAGE_URL + "episodes.js"
+    print("✅ URL du episodes.js")
+
+
+def test_parse_arrays():
+    players = parse_episode_arrays(_fixture("anime_sama_episodes.js"))
+    assert sorted(players) == [1, 2, 3]  # eps9 est en commentaire
+    assert len(players[1]) == 15 and players[1][0] == "https://video.sibnet.ru/shell.php?videoid=4660001"
+    assert len(players[2]) == 13 and players[2][-1] == "https://vidmoly.to/embed-13ab.html"
+    # Ligne commentée ignorée, emplacement vide conservé (position gardée)
+    assert len(players[3]) == 15 and players[3][4] == ""
+    print("✅ Tableaux eps1 / eps2 / eps3")
+
+
+def test_numbering_and_players():
+    numbers = episode_numbers(_fixture("anime_sama_saison1.html"))
+    assert numbers == list(range(1, 13)) + [None, 13, 14, None]
+    players = parse_episode_arrays(_fixture("anime_sama_episodes.js"))
+
+    assert episode_index(numbers, None) == 0
+    assert episode_index(numbers, 99) is None
+    # Épisode 13 après le film: position 13, absente du lecteur 2 (incomplet)
+    index = episode_index(numbers, 13)
+    assert index == 13
+    assert players_for_episode(players, index) == [
+        ("Lecteur 1", "https://video.sibnet.ru/shell.php?videoid=4660014"),
+        ("Lecteur 3", "https://sendvid.com/embed/x14"),
+    ]
+    # Emplacement vide du lecteur 3 écarté
+    assert [label for label, _ in players_for_episode(players, 4)] == ["Lecteur 1", "Lecteur 2"]
+    print("✅ Numérotation films / spéciaux et lecteurs de l'épisode")
+
+
+def _resolve(episode, dead_video_ids=()):
+    requested = []
+
+    def handler(request):
+        url = str(request.url)
+        requested.append(url)
+        if url.startswith(PAGE_URL + "episodes.js"):
+            return httpx.Response(200, text=_fixture("anime_sama_episodes.js"))
+        if url == PAGE_URL:
+            return httpx.Response(200, text=_fixture("anime_sama_saison1.html"))
+        if "sibnet.ru" in url and any(v in url for v in dead_video_ids):
+            return httpx.Response(404)
+        return httpx.Response(200, text="<html><title>Lecteur</title></html>")
+
+    async def main():
+        http_client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        try:
+            return await resolve_episode_direct(PAGE_URL, episode)
+        finally:
+            await http_client.close_http_client()
+
+    return asyncio.run(main()), requested
+
+
+def test_resolve_prefers_sibnet():
+    result, requested = _resolve(2)
+    assert requested[1] == PAGE_URL + "episodes.js?filever=2174"
+    assert result["title"] == "One Piece - Saison 1 VOSTFR | Anime-Sama"
+    assert result["episode_label"] == "Episode 2"
+    assert (result["lecteur_label"], result["iframe"]) == (
+        "Lecteur 1", "https://video.sibnet.ru/shell.php?videoid=4660002")
+    assert len(result["players"]) == 3
+    print("✅ Résolution directe: Sibnet d'abord")
+
+
+def test_resolve_skips_dead_sibnet():
+    result, _ = _resolve(13, dead_video_ids=("4660014",))
+    assert result["episode_label"] == "Episode 13"
+    assert (result["lecteur_label"], result["iframe"]) == ("Lecteur 3", "https://sendvid.com/embed/x14")
+    assert _resolve(99)[0] is None
+    print("✅ Sibnet supprimé: lecteur suivant; épisode absent: None")
+
+
+if __name__ == "__main__":
+    test_script_url()
+    test_parse_arrays()
+    test_numbering_and_players()
+    test_resolve_prefers_sibnet()
+    test_resolve_skips_dead_sibnet()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Frontière « meilleur d'abord » et arrêt anticipé du crawl: ordre de sortie,
+best_estimate() identique à un balayage complet, seuil de TopKStop.
+"""
+import os
+import random
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "linkfinderbot", "src"))
+
+from bot.utils.crawler import (
+    DEFAULT_DEPTH_PENALTY,
+    MODE_EXHAUSTIVE,
+    MODE_FAST,
+    PriorityFrontier,
+    TopKStop,
+)
+
+
+def _drain(frontier):
+    out = []
+    while len(frontier):
+        out.append(frontier.pop())
+    return out
+
+
+def test_frontier_order():
+    frontier = PriorityFrontier(seeds=[("https://a.org/", 0)])
+    frontier.push("https://a.org/low", 1, 40.0)
+    frontier.push("https://a.org/high", 1, 90.0)
+    frontier.push("https://a.org/tie-1", 1, 60.0)
+    frontier.push("https://a.org/tie-2", 1, 60.0)
+    # 70 - 2 niveaux de pénalité passe derrière 60 au niveau 1
+    frontier.push("https://a.org/deep", 3, 70.0 - DEFAULT_DEPTH_PENALTY)
+    order = [url for url, _ in _drain(frontier)]
+    assert order == [
+        "https://a.org/",        # point d'entrée (estimation inconnue) d'abord
+        "https://a.org/high",
+        "https://a.org/tie-1",   # FIFO entre priorités égales
+        "https://a.org/tie-2",
+        "https://a.org/deep",
+        "https://a.org/low",
+    ], order
+    print("✅ Ordre de la frontière")
+
+
+def test_best_estimate_matches_scan():
+    """Le sommet du tas des estimations = maximum d'un balayage des liens restants"""
+    rng = random.Random(5)
+    frontier = PriorityFrontier(priority=lambda url, depth, est: -depth if est is None else est - 30 * depth)
+    seen = set()
+    for step in range(2000):
+        roll = rng.random()
+        if roll < 0.55 or not len(frontier):
+            url = f"https://a.org/{rng.randint(0, 400)}"
+            estimate = None if rng.random() < 0.02 else rng.uniform(0, 110)
+            depth = rng.randint(0, 3)
+            frontier.push(url, depth, estimate)
+        elif roll < 0.9:
+            url, _ = frontier.pop()
+            seen.add(url)
+        else:
+            seen.add(f"https://a.org/{rng.randint(0, 400)}")
+        live = [e for _, _, u, _, e in frontier._heap if u not in seen]
+        expected = float("-inf") if not live else (float("inf") if None in live else max(live))
+        assert frontier.best_estimate(seen) == expected, step
+    print("✅ best_estimate = balayage complet")
+
+
+def test_topk_stop():
+    frontier = PriorityFrontier()
+    frontier.push("https://a.org/a", 1, 96.0)
+    frontier.push("https://a.org/b", 1, 50.0)
+    stop = TopKStop(k=2, min_score=95, mode=MODE_FAST)
+
+    stop.offer("one piece 1", 99.0)
+    assert not stop(frontier)            # top-k pas encore rempli
+    stop.offer("one piece 1", 80.0)      # même clé: le meilleur score reste
+    stop.offer("one piece 2", 97.0)
+    assert stop.kth_score() == 97.0
+    assert stop(frontier)                # meilleur lien restant: 96 ≤ 97
+    frontier.push("https://a.org/c", 1, 98.0)
+    assert not stop(frontier)            # 98 peut encore entrer dans le top-2
+    assert stop(frontier, seen={"https://a.org/c"})
+    print("✅ Seuil de TopKStop")
+
+
+def test_topk_stop_needs_confident_results():
+    frontier = PriorityFrontier()
+    frontier.push("https://a.org/a", 1, 10.0)
+    stop = TopKStop(k=1, min_score=95)
+    stop.offer("vague", 90.0)
+    assert not stop(frontier)            # k-ième sous min_score
+    stop.offer("sûr", 99.0)
+    assert stop(frontier)
+    assert not TopKStop(k=1, min_score=95, mode=MODE_EXHAUSTIVE)(frontier)
+    print("✅ TopKStop: résultats sûrs et mode exhaustif")
+
+
+if __name__ == "__main__":
+    test_frontier_order()
+    test_best_estimate_matches_scan()
+    test_topk_stop()
+    test_topk_stop_needs_confident_results()
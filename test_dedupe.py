@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Déduplication indexée: mêmes résultats gardés que l'ancienne boucle O(n²),
+sous et au-dessus du seuil INDEX_MIN_RESULTS.
+"""
+import os
+import random
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "linkfinderbot", "src"))
+
+from rapidfuzz import fuzz
+
+from bot.utils.dedupe import INDEX_MIN_RESULTS, dedupe_results
+from bot.utils.precise_playwright_adapter import normalize_url
+
+TITLES = [
+    "One Piece", "Naruto Shippuden", "Attack on Titan", "Jujutsu Kaisen",
+    "Demon Slayer Kimetsu no Yaiba", "Chainsaw Man", "Spy x Family",
+]
+FILLER = "alpha beta gamma delta epsilon zeta eta theta iota kappa lambda".split()
+
+
+def legacy_dedupe(results):
+    """Ancienne boucle (référence)"""
+    kept = []
+    seen_urls = set()
+    for r in results:
+        key = normalize_url(r["url"])
+        if not key or key in seen_urls:
+            continue
+        if any(fuzz.token_set_ratio(k["title"], r["title"]) >= 95 for k in kept):
+            continue
+        seen_urls.add(key)
+        kept.append(r)
+    return kept
+
+
+def synthetic_results(n, seed):
+    """Épisodes, casse, coquilles, titres sans rapport; URLs qui se répètent"""
+    rng = random.Random(seed)
+    out = []
+    for _ in range(n):
+        name = rng.choice(TITLES)
+        roll = rng.random()
+        if roll < 0.3:
+            title = f"{name} Episode {rng.randint(1, n)} VOSTFR"
+        elif roll < 0.45:
+            i = rng.randrange(len(name))
+            title = name[:i] + rng.choice("aeiou") + name[i + 1:]
+        elif roll < 0.6:
+            title = name.upper()
+        elif roll < 0.7:
+            title = f"Regarder {name} {rng.randint(1, n)} en streaming VF"
+        else:
+            title = " ".join(rng.sample(FILLER, rng.randint(1, 5))) + f" {rng.randint(1, n * 3)}"
+        out.append({"title": title, "url": f"https://example.org/{rng.randint(1, n * 2)}?utm_source=x"})
+    return out
+
+
+def test_small_batch_matches_legacy():
+    results = synthetic_results(INDEX_MIN_RESULTS // 2, seed=1)
+    assert dedupe_results(results, normalize_url) == legacy_dedupe(results)
+    print("✅ Petit lot identique à l'ancienne boucle")
+
+
+def test_indexed_batch_matches_legacy():
+    for seed in (2, 3):
+        results = synthetic_results(INDEX_MIN_RESULTS * 4, seed=seed)
+        stats = {}
+        assert dedupe_results(results, normalize_url, stats=stats) == legacy_dedupe(results)
+        # L'index évite de comparer chaque titre à tous les titres retenus
+        assert stats["comparisons"] < len(results) ** 2 / 4
+    print("✅ Lot indexé identique à l'ancienne boucle")
+
+
+def test_rules():
+    results = [
+        {"title": "One Piece Episode 1", "url": "https://a.org/1"},
+        {"title": "One Piece Episode 1", "url": "https://a.org/2"},    # même titre
+        {"title": "Naruto", "url": "https://a.org/1/?utm_source=x"},   # même URL normalisée
+        {"title": "Bleach", "url": "javascript:void(0)"},              # clé vide
+        {"title": "Bleach", "url": "https://a.org/3"},
+    ]
+    kept = dedupe_results(results, normalize_url)
+    assert [r["url"] for r in kept] == ["https://a.org/1", "https://a.org/3"]
+    print("✅ Règles URL / titre / clé vide")
+
+
+if __name__ == "__main__":
+    test_small_batch_matches_legacy()
+    test_indexed_batch_matches_legacy()
+    test_rules()
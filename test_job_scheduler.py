@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Ordonnanceur de jobs: ordre de priorité (/fast avant link avant find, FIFO
+à priorité égale), annulation d'un job en file ou en cours, remplacement du
+job précédent d'un même utilisateur, file bornée.
+"""
+import asyncio
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "linkfinderbot", "src"))
+
+from bot.utils.job_scheduler import (
+    PRIORITY_FAST,
+    PRIORITY_FIND,
+    PRIORITY_LINK,
+    JobScheduler,
+    QueueFullError,
+)
+
+
+async def _blocked_scheduler(**options):
+    """Ordonnanceur à un worker occupé par un job qu'on libère à la main"""
+    scheduler = JobScheduler(workers=1, per_user=1, **options)
+    gate = asyncio.Event()
+    started = asyncio.Event()
+
+    async def blocker(job):
+        started.set()
+        await gate.wait()
+
+    await scheduler.submit(None, PRIORITY_FIND, blocker)
+    await started.wait()
+    return scheduler, gate
+
+
+def test_priority_order():
+    async def run():
+        scheduler, gate = await _blocked_scheduler()
+        order = []
+
+        def job_named(name):
+            async def job(_job):
+                order.append(name)
+            return job
+
+        jobs = [
+            await scheduler.submit(1, PRIORITY_FIND, job_named("find")),
+            await scheduler.submit(2, PRIORITY_LINK, job_named("link-1")),
+            await scheduler.submit(3, PRIORITY_FAST, job_named("fast")),
+            await scheduler.submit(4, PRIORITY_LINK, job_named("link-2")),
+        ]
+        assert [scheduler.queue_position(j) for j in jobs] == [4, 2, 1, 3]
+        gate.set()
+        await asyncio.wait_for(asyncio.gather(*(j.done.wait() for j in jobs)), 2)
+        await scheduler.stop()
+        return order
+
+    assert asyncio.run(run()) == ["fast", "link-1", "link-2", "find"]
+    print("✅ Ordre de priorité")
+
+
+def test_cancel_pending_and_running():
+    async def run():
+        scheduler = JobScheduler(workers=1, per_user=1, cancel_previous=False)
+        started = asyncio.Event()
+        cancelled = []
+        ran = []
+
+        async def long_job(job):
+            started.set()
+            try:
+                await asyncio.sleep(60)
+            except asyncio.CancelledError:
+                cancelled.append(job.id)
+                raise
+
+        async def queued(job):
+            ran.append(job.id)
+
+        async def on_cancel():
+            cancelled.append("callback")
+
+        running = await scheduler.submit(7, PRIORITY_LINK, long_job, on_cancel=on_cancel)
+        await started.wait()
+        waiting = await scheduler.submit(7, PRIORITY_FAST, queued, on_cancel=on_cancel)
+        other = await scheduler.submit(8, PRIORITY_FIND, queued)
+
+        await scheduler.cancel_user(7)
+        assert running.cancelled and waiting.cancelled
+        assert scheduler.queue_position(waiting) is None
+        await asyncio.wait_for(asyncio.gather(running.done.wait(), waiting.done.wait(), other.done.wait()), 2)
+        await scheduler.stop()
+        return running, other, cancelled, ran
+
+    running, other, cancelled, ran = asyncio.run(run())
+    assert running.id in cancelled and cancelled.count("callback") == 2
+    # Le job en file annulé ne tourne jamais; l'autre utilisateur passe
+    assert ran == [other.id]
+    print("✅ Annulation en file et en cours")
+
+
+def test_new_command_replaces_previous():
+    async def run():
+        scheduler, gate = await _blocked_scheduler()
+        ran = []
+
+        async def job(j):
+            ran.append(j.id)
+
+        first = await scheduler.submit(5, PRIORITY_LINK, job)
+        second = await scheduler.submit(5, PRIORITY_LINK, job)
+        assert first.cancelled and not second.cancelled
+        gate.set()
+        await asyncio.wait_for(second.done.wait(), 2)
+        await scheduler.stop()
+        return ran, second
+
+    ran, second = asyncio.run(run())
+    assert ran == [second.id]
+    print("✅ Nouvelle commande: la précédente est annulée")
+
+
+def test_queue_full():
+    async def run():
+        scheduler, gate = await _blocked_scheduler(max_queue=2)
+
+        async def job(_job):
+            pass
+
+        await scheduler.submit(1, PRIORITY_LINK, job)
+        await scheduler.submit(2, PRIORITY_LINK, job)
+        try:
+            await scheduler.submit(3, PRIORITY_FAST, job)
+        except QueueFullError:
+            return True
+        finally:
+            gate.set()
+            await scheduler.stop()
+        return False
+
+    assert asyncio.run(run())
+    print("✅ File pleine refusée")
+
+
+if __name__ == "__main__":
+    test_priority_order()
+    test_cancel_pending_and_running()
+    test_new_command_replaces_previous()
+    test_queue_full()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cache de résultats: fraîcheur selon le TTL, service d'une valeur expirée
+dans la fenêtre stale avec rafraîchissement en fond, expiration au-delà,
+relecture depuis SQLite, clés et TTL par source. Base SQLite temporaire.
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "linkfinderbot", "src"))
+
+from bot.utils.result_cache import (
+    STATUS_FRESH,
+    STATUS_MISS,
+    STATUS_STALE,
+    TTL_BY_SOURCE,
+    ResultCache,
+    make_key,
+    ttl_for_source,
+)
+
+
+def _with_cache(test, stale_window=100):
+    """Lance `test(cache)` sur un cache neuf dans un dossier temporaire"""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ResultCache(path=os.path.join(tmp, "cache.sqlite3"), stale_window=stale_window)
+        try:
+            return asyncio.run(test(cache))
+        finally:
+            cache.close()
+
+
+def _backdate(cache, key, value, age, ttl):
+    """Entrée stockée il y a `age` secondes, en mémoire et dans SQLite"""
+    stored_at = time.time() - age
+    cache._db_put(key, value, stored_at, ttl)
+    cache._remember(key, (value, stored_at, ttl))
+
+
+def test_ttl_statuses():
+    async def run(cache):
+        _backdate(cache, "fresh", ["a"], age=5, ttl=10)
+        _backdate(cache, "stale", ["b"], age=50, ttl=10)
+        _backdate(cache, "dead", ["c"], age=500, ttl=10)
+        return [await cache.lookup(k) for k in ("fresh", "stale", "dead", "absent")]
+
+    assert _with_cache(run) == [
+        (STATUS_FRESH, ["a"]),
+        (STATUS_STALE, ["b"]),
+        (STATUS_MISS, None),
+        (STATUS_MISS, None),
+    ]
+    print("✅ Frais / stale / expiré selon le TTL")
+
+
+def test_stale_while_revalidate():
+    async def run(cache):
+        _backdate(cache, "k", "ancien", age=50, ttl=10)
+        refreshed = asyncio.Event()
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            refreshed.set()
+            return "nouveau"
+
+        value, status = await cache.get_or_compute("k", compute, lambda v: 60)
+        # Valeur stale servie tout de suite, calcul relancé en fond (une seule fois)
+        assert (value, status) == ("ancien", STATUS_STALE)
+        assert await cache.get_or_compute("k", compute, lambda v: 60) == ("ancien", STATUS_STALE)
+        await asyncio.wait_for(refreshed.wait(), 2)
+        while cache._refreshing:
+            await asyncio.sleep(0)
+        after = await cache.get_or_compute("k", compute, lambda v: 60)
+        return calls, after
+
+    calls, after = _with_cache(run)
+    assert len(calls) == 1
+    assert after == ("nouveau", STATUS_FRESH)
+    print("✅ Stale-while-revalidate")
+
+
+def test_miss_computes_once_and_persists():
+    async def run(cache):
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {"links": ["https://video.sibnet.ru/shell.php?videoid=1"]}
+
+        results = await asyncio.gather(*(cache.get_or_compute("k", compute, lambda v: 60) for _ in range(3)))
+        assert all(status == STATUS_MISS for _, status in results) and len(calls) == 1
+        # Nouveau cache sur le même fichier: relu depuis SQLite
+        reopened = ResultCache(path=cache._path)
+        try:
+            return await reopened.lookup("k")
+        finally:
+            reopened.close()
+
+    status, value = _with_cache(run)
+    assert status == STATUS_FRESH and value["links"]
+    print("✅ Calcul unique puis relecture SQLite")
+
+
+def test_keys_and_ttls():
+    assert make_key("find", "https://www.Anime-Sama.fr/", "  One   Piéce ", 3) == make_key(
+        "FIND", "anime-sama.fr", "one piece", 3)
+    assert make_key("find", "a.org", "x") != make_key("link", "a.org", "x")
+    assert ttl_for_source("sibnet-direct", negative=True) == TTL_BY_SOURCE["negative"]
+    assert ttl_for_source("inconnue") == ttl_for_source(None) == TTL_BY_SOURCE["default"]
+    assert ttl_for_source("sibnet-direct") > ttl_for_source("site-search")
+    print("✅ Clés normalisées et TTL par source")
+
+
+if __name__ == "__main__":
+    test_ttl_statuses()
+    test_stale_while_revalidate()
+    test_miss_computes_once_and_persists()
+    test_keys_and_ttls()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Scoring vectorisé: mêmes valeurs que les anciennes formules unitaires
+(relevance_score, is_strong_candidate, page_is_relevant), sur des lots
+petits et assez gros pour passer par les threads de cdist.
+"""
+import os
+import random
+import re
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "linkfinderbot", "src"))
+
+import numpy as np
+from rapidfuzz import fuzz
+
+from bot.utils.scoring import PARALLEL_MIN_BATCH, page_match_mask, relevance_scores, strong_candidate_mask
+
+WORDS = "one piece naruto episode saison vostfr vf streaming regarder 1089 film bleach titan".split()
+QUERIES = ["One Piece", "naruto 500", "Attack on Titan", "bleach"]
+
+
+def _boundary(text, phrase):
+    return re.search(r"\b" + re.escape(phrase) + r"\b", text or "", flags=re.IGNORECASE) is not None
+
+
+def legacy_relevance(title, snippet, url, query):
+    """Ancienne formule (référence)"""
+    t, s, u = title or "", snippet or "", url or ""
+    t_score = fuzz.token_set_ratio(t, query)
+    s_score = fuzz.token_set_ratio(s, query) if s else 0
+    u_score = fuzz.partial_ratio(u, query)
+    bonus = 0
+    if _boundary(t, query):
+        bonus += 8
+    if s and _boundary(s, query):
+        bonus += 4
+    return round(0.6 * t_score + 0.3 * s_score + 0.1 * u_score + bonus, 2)
+
+
+def legacy_strong(title, snippet, query):
+    if not (_boundary(title, query) or _boundary(snippet, query)):
+        return False
+    if fuzz.token_set_ratio(title or "", query) < 85:
+        return False
+    if snippet and fuzz.token_set_ratio(snippet, query) < 70:
+        return False
+    return True
+
+
+def legacy_page_match(title, h1, query):
+    t = f"{title or ''} {h1 or ''}"
+    return _boundary(t, query) and fuzz.token_set_ratio(t, query) >= 85
+
+
+def random_batch(n, seed):
+    rng = random.Random(seed)
+
+    def text(k):
+        return " ".join(rng.choice(WORDS) for _ in range(rng.randint(0, k))).title()
+
+    titles = [text(6) for _ in range(n)]
+    snippets = [text(12) if rng.random() < 0.7 else "" for _ in range(n)]
+    urls = [f"https://example.org/{text(3).replace(' ', '-').lower()}" for _ in range(n)]
+    return titles, snippets, urls
+
+
+def test_relevance_parity():
+    for n in (20, PARALLEL_MIN_BATCH + 50):
+        titles, snippets, urls = random_batch(n, seed=n)
+        for query in QUERIES:
+            got = relevance_scores(titles, snippets, urls, query)
+            expected = [legacy_relevance(t, s, u, query) for t, s, u in zip(titles, snippets, urls)]
+            # Arrondi à 2 décimales des deux côtés: au plus un centième d'écart
+            assert np.abs(got - np.array(expected)).max() <= 0.01 + 1e-9, query
+    print("✅ relevance_scores = ancienne formule")
+
+
+def test_masks_parity():
+    titles, snippets, urls = random_batch(PARALLEL_MIN_BATCH + 50, seed=7)
+    for query in QUERIES:
+        strong = strong_candidate_mask(titles, snippets, query)
+        assert strong.tolist() == [legacy_strong(t, s, query) for t, s in zip(titles, snippets)]
+        pages = page_match_mask(titles, snippets, query)
+        assert pages.tolist() == [legacy_page_match(t, h, query) for t, h in zip(titles, snippets)]
+    print("✅ Masques candidat sûr / page pertinente = anciennes règles")
+
+
+def test_empty_batch():
+    assert len(relevance_scores([], [], [], "one piece")) == 0
+    print("✅ Lot vide")
+
+
+if __name__ == "__main__":
+    test_relevance_parity()
+    test_masks_parity()
+    test_empty_batch()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Client DuckDuckGo asynchrone: nouvel essai sur 202/5xx, abandon sur les
+autres erreurs, cache des réponses 200. Transport httpx simulé, pas de
+réseau.
+"""
+import asyncio
+import os
+import sys
+
+import httpx
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "linkfinderbot", "src"))
+
+from bot.utils import http_client
+from bot.utils.search_client import SearchClient
+
+
+def _client_with(statuses):
+    """SearchClient dont les réponses suivent `statuses`, et la liste des appels"""
+    calls = []
+
+    def handler(request):
+        calls.append(str(request.url))
+        status = statuses[min(len(calls), len(statuses)) - 1]
+        return httpx.Response(status, text=f"<html>{status}</html>")
+
+    http_client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    client = SearchClient(retries=3)
+    client._backoff = lambda attempt: 0
+    return client, calls
+
+
+def _run(coro):
+    async def main():
+        try:
+            return await coro
+        finally:
+            await http_client.close_http_client()
+    return asyncio.run(main())
+
+
+def test_retry_then_cache():
+    """202 (anomalie DuckDuckGo) puis 503 puis 200: trois appels, puis cache"""
+    client, calls = _client_with([202, 503, 200])
+
+    async def run():
+        first = await client.get_text("https://duckduckgo.com/html/", params={"q": "one piece"})
+        second = await client.get_text("https://duckduckgo.com/html/", params={"q": "one piece"})
+        return first, second
+
+    first, second = _run(run())
+    assert first == second == "<html>200</html>"
+    assert len(calls) == 3, calls
+    print("✅ Nouvel essai puis cache")
+
+
+def test_no_retry_on_client_error():
+    client, calls = _client_with([403])
+    assert _run(client.get_text("https://duckduckgo.com/html/", params={"q": "x"})) is None
+    assert len(calls) == 1
+    print("✅ Pas de nouvel essai sur 403")
+
+
+def test_gives_up_after_retries():
+    client, calls = _client_with([429])
+    assert _run(client.get_text("https://duckduckgo.com/html/", params={"q": "x"})) is None
+    assert len(calls) == client.retries + 1
+    print("✅ Abandon après les essais")
+
+
+def test_backoff_is_capped():
+    client = SearchClient(backoff_base=0.5, backoff_max=8.0)
+    assert all(0 <= client._backoff(a) <= min(8.0, 0.5 * 2 ** a) for a in range(10) for _ in range(20))
+    print("✅ Backoff borné")
+
+
+if __name__ == "__main__":
+    test_retry_then_cache()
+    test_no_retry_on_client_error()
+    test_gives_up_after_retries()
+    test_backoff_is_capped()
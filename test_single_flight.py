@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Single-flight: appels concurrents de même clé coalescés en un seul calcul,
+même résultat ou même exception pour tous, annulation d'un appelant sans
+effet sur les autres.
+"""
+import asyncio
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "linkfinderbot", "src"))
+
+from bot.utils.single_flight import SingleFlight
+
+
+def _counting(result=None, error=None, delay=0.05):
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+        return result
+
+    return compute, calls
+
+
+def test_coalescing():
+    async def run():
+        flights = SingleFlight()
+        compute, calls = _counting(result={"links": ["https://a.org/1"]})
+        results = await asyncio.gather(*(flights.run("one piece", compute) for _ in range(5)))
+        other, other_calls = _counting(result="autre")
+        assert await flights.run("naruto", other) == "autre"
+        assert not flights.in_flight("one piece")
+        return flights, calls, other_calls, results
+
+    flights, calls, other_calls, results = asyncio.run(run())
+    assert len(calls) == 1 and len(other_calls) == 1
+    assert flights.coalesced == 4
+    assert all(r is results[0] for r in results)
+    print("✅ Un seul calcul pour cinq appels")
+
+
+def test_exception_propagates_to_all():
+    async def run():
+        flights = SingleFlight()
+        compute, calls = _counting(error=RuntimeError("site HS"))
+        outcomes = await asyncio.gather(*(flights.run("k", compute) for _ in range(3)), return_exceptions=True)
+        # Clé libérée: l'appel suivant relance le calcul
+        retry, retry_calls = _counting(result="ok")
+        assert await flights.run("k", retry) == "ok"
+        return calls, retry_calls, outcomes
+
+    calls, retry_calls, outcomes = asyncio.run(run())
+    assert len(calls) == 1 and len(retry_calls) == 1
+    assert all(isinstance(o, RuntimeError) and str(o) == "site HS" for o in outcomes)
+    print("✅ Exception transmise à tous les appelants")
+
+
+def test_cancelled_waiter_detaches():
+    async def run():
+        flights = SingleFlight()
+        compute, calls = _counting(result="ok", delay=0.1)
+        first = asyncio.create_task(flights.run("k", compute))
+        second = asyncio.create_task(flights.run("k", compute))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        result = await second
+        try:
+            await first
+        except asyncio.CancelledError:
+            pass
+        return first, result, calls
+
+    first, result, calls = asyncio.run(run())
+    assert first.cancelled() and result == "ok" and len(calls) == 1
+    print("✅ Appelant annulé: les autres reçoivent le résultat")
+
+
+def test_last_waiter_cancels_task():
+    async def run():
+        flights = SingleFlight()
+        finished = []
+
+        async def compute():
+            await asyncio.sleep(0.1)
+            finished.append(1)
+
+        caller = asyncio.create_task(flights.run("k", compute))
+        await asyncio.sleep(0.01)
+        caller.cancel()
+        await asyncio.sleep(0.15)
+        return flights, finished
+
+    flights, finished = asyncio.run(run())
+    assert not finished and not flights.in_flight("k")
+    print("✅ Plus personne n'attend: calcul annulé")
+
+
+if __name__ == "__main__":
+    test_coalescing()
+    test_exception_propagates_to_all()
+    test_cancelled_waiter_detaches()
+    test_last_waiter_cancels_task()
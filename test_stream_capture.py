@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Capture des flux d'un lecteur dans une iframe cross-origin.
+
+La page est servie sur 127.0.0.1 et le lecteur sur localhost (deux sites,
+donc une iframe hors process sous Chromium). Le lecteur charge une
+playlist HLS maître puis une variante: seule la maître doit ressortir,
+avec ses variantes. Sans Chromium installé, seul le test sur objets
+factices tourne.
+"""
+import asyncio
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "linkfinderbot", "src"))
+
+from bot.utils.stream_capture import KIND_HLS, StreamCapture
+
+MASTER = (
+    "#EXTM3U\n"
+    "#EXT-X-STREAM-INF:BANDWIDTH=800000,RESOLUTION=640x360\n"
+    "360p.m3u8\n"
+    "#EXT-X-STREAM-INF:BANDWIDTH=2500000,RESOLUTION=1280x720\n"
+    "720p.m3u8\n"
+)
+MEDIA = "#EXTM3U\n#EXT-X-TARGETDURATION:10\n#EXTINF:10,\nseg0.ts\n#EXT-X-ENDLIST\n"
+
+
+def _skip(reason: str):
+    if "pytest" not in sys.modules:
+        print(f"⏭️ {reason}")
+        return
+    import pytest
+    pytest.skip(reason)
+
+
+# === Objets factices (sans navigateur) ===
+
+class FakeContext:
+    def __init__(self):
+        self.listeners = []
+
+    def on(self, event, handler):
+        self.listeners.append((event, handler))
+
+    def remove_listener(self, event, handler):
+        self.listeners.remove((event, handler))
+
+    def emit(self, response):
+        for event, handler in list(self.listeners):
+            if event == "response":
+                handler(response)
+
+
+class FakeApiResponse:
+    ok = True
+
+    def __init__(self, text):
+        self._text = text
+
+    async def text(self):
+        return self._text
+
+
+class FakeRequest:
+    async def get(self, url, headers=None, timeout=None):
+        return FakeApiResponse(MASTER if url.endswith("master.m3u8") else MEDIA)
+
+
+class FakePage:
+    def __init__(self, context, url):
+        self.context = context
+        self.url = url
+        self.request = FakeRequest()
+
+
+class FakeFrame:
+    def __init__(self, page, url):
+        self.page = page
+        self.url = url
+
+
+class FakeResponse:
+    def __init__(self, frame, url, content_type, status=200):
+        self.frame = frame
+        self.url = url
+        self.headers = {"content-type": content_type}
+        self.status = status
+
+
+def test_cross_origin_iframe_fake():
+    """Réponses d'une iframe d'un autre site vues via le contexte; autres pages ignorées"""
+
+    async def run():
+        context = FakeContext()
+        page = FakePage(context, "http://127.0.0.1:8000/episode.html")
+        other = FakePage(context, "http://127.0.0.1:8000/catalogue/")
+        capture = await StreamCapture(page).start()
+
+        player = FakeFrame(page, "http://localhost:9000/player.html")
+        master = "http://localhost:9000/hls/master.m3u8"
+        context.emit(FakeResponse(FakeFrame(other, other.url), "http://localhost:9000/other.mp4", "video/mp4"))
+        context.emit(FakeResponse(player, master, "application/vnd.apple.mpegurl"))
+        context.emit(FakeResponse(player, "http://localhost:9000/hls/720p.m3u8", "application/vnd.apple.mpegurl"))
+        context.emit(FakeResponse(player, "http://localhost:9000/hls/seg0.ts", "video/mp2t"))
+
+        assert await capture.wait(2000) == master
+        await asyncio.sleep(0)
+        # Maître retirée (devenue variante d'une autre) avant la fin de sa lecture
+        await capture._follow_hls("http://localhost:9000/old/master.m3u8")
+        results = capture.results()
+        await capture.close()
+        assert not context.listeners
+        return results
+
+    results = asyncio.run(run())
+    assert [r["url"] for r in results] == ["http://localhost:9000/hls/master.m3u8"], results
+    assert results[0]["kind"] == KIND_HLS
+    assert [v["resolution"] for v in results[0]["variants"]] == ["1280x720", "640x360"]
+    print("✅ Iframe cross-origin (factice): maître + variantes")
+
+
+# === Vrai Chromium, deux origines locales ===
+
+class _Handler(BaseHTTPRequestHandler):
+    player_origin = ""
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, body: str, content_type: str):
+        data = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        if path == "/episode.html":
+            self._send(f'<html><body><iframe src="{self.player_origin}/player.html"></iframe></body></html>', "text/html")
+        elif path == "/player.html":
+            self._send(
+                "<html><body><script>"
+                "fetch('/hls/master.m3u8').then(() => fetch('/hls/720p.m3u8'));"
+                "</script></body></html>",
+                "text/html",
+            )
+        elif path == "/hls/master.m3u8":
+            self._send(MASTER, "application/vnd.apple.mpegurl")
+        elif path.endswith(".m3u8"):
+            self._send(MEDIA, "application/vnd.apple.mpegurl")
+        else:
+            self.send_error(404)
+
+
+def _serve(host: str) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def test_cross_origin_iframe_chromium():
+    """Flux chargé par une iframe hors process (localhost dans une page 127.0.0.1)"""
+    try:
+        from playwright.async_api import async_playwright
+    except ImportError:
+        _skip("Playwright non installé")
+        return
+
+    server = _serve("127.0.0.1")
+    port = server.server_address[1]
+    # Même serveur, autre site: localhost ≠ 127.0.0.1
+    _Handler.player_origin = f"http://localhost:{port}"
+    master = f"http://localhost:{port}/hls/master.m3u8"
+
+    async def run():
+        async with async_playwright() as p:
+            try:
+                browser = await p.chromium.launch()
+            except Exception as e:
+                return e
+            try:
+                context = await browser.new_context()
+                page = await context.new_page()
+                capture = await StreamCapture(page).start()
+                await page.goto(f"http://127.0.0.1:{port}/episode.html", wait_until="domcontentloaded")
+                first = await capture.wait(10000)
+                for _ in range(50):
+                    # Laisse la variante arriver et la maître être lue
+                    results = capture.results()
+                    if len(results) == 1 and results[0]["variants"]:
+                        break
+                    await asyncio.sleep(0.1)
+                results = capture.results()
+                await capture.close()
+                return first, results
+            finally:
+                await browser.close()
+
+    try:
+        outcome = asyncio.run(run())
+    finally:
+        server.shutdown()
+    if isinstance(outcome, Exception):
+        _skip(f"Chromium indisponible: {type(outcome).__name__}")
+        return
+    first, results = outcome
+    assert first == master, (first, results)
+    assert [r["url"] for r in results] == [master], results
+    assert [v["resolution"] for v in results[0]["variants"]] == ["1280x720", "640x360"]
+    print("✅ Iframe cross-origin (Chromium): maître + variantes")
+
+
+if __name__ == "__main__":
+    test_cross_origin_iframe_fake()
+    test_cross_origin_iframe_chromium()